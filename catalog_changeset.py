@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+from typing import Dict
+
+SNAPSHOT_FILE = os.path.join("output", ".catalog_snapshot.jsonl")
+CHANGESET_FILE = os.path.join("output", ".catalog_changeset.json")
+SECTIONS = ("trailers", "accessories")
+
+Records = Dict[str, Dict[str, object]]
+
+
+def _encode(payload: object) -> str:
+    return json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def load_snapshot(path: str = SNAPSHOT_FILE) -> Dict[str, Records]:
+    """Previous build as {section: {id: record}}; empty if there is none yet."""
+    snapshot: Dict[str, Records] = {section: {} for section in SECTIONS}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    snapshot.setdefault(row["section"], {})[row["id"]] = row["record"]
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError) as exc:
+        print(f"Error reading catalog snapshot {path}: {exc}")
+        return {section: {} for section in SECTIONS}
+    return snapshot
+
+
+def diff_fields(old: object, new: object, prefix: str = "") -> Dict[str, Dict[str, object]]:
+    """Field-level diff; nested objects (e.g. specs) are compared key by key, lists as a whole."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes: Dict[str, Dict[str, object]] = {}
+        for key in sorted(set(old) | set(new)):
+            path = f"{prefix}.{key}" if prefix else key
+            if key not in new:
+                changes[path] = {"old": old[key], "new": None}
+            elif key not in old:
+                changes[path] = {"old": None, "new": new[key]}
+            else:
+                changes.update(diff_fields(old[key], new[key], path))
+        return changes
+    if old != new:
+        return {prefix: {"old": old, "new": new}}
+    return {}
+
+
+class ChangesetBuilder:
+    """Diff records against the previous build as they stream past.
+
+    Each record is compared with its predecessor and appended to the next
+    snapshot immediately; only the delta itself is held until ``finish()``.
+    """
+
+    def __init__(self, changeset_path: str = CHANGESET_FILE, snapshot_path: str = SNAPSHOT_FILE):
+        self.changeset_path = changeset_path
+        self.snapshot_path = snapshot_path
+        self.previous = load_snapshot(snapshot_path)
+        self.base = _file_digest(snapshot_path)
+        self.delta = {section: {"added": [], "changed": []} for section in SECTIONS}
+        self.target = hashlib.sha256()
+        os.makedirs(os.path.dirname(snapshot_path) or ".", exist_ok=True)
+        self.snapshot = open(f"{snapshot_path}.tmp", "w", encoding="utf-8", newline="\n")
+
+    def add(self, section: str, record: Dict[str, object]) -> None:
+        line = _encode({"section": section, "id": record["id"], "record": record}) + "\n"
+        self.target.update(line.encode("utf-8"))
+        self.snapshot.write(line)
+
+        old = self.previous[section].pop(record["id"], None)
+        if old is None:
+            self.delta[section]["added"].append(record)
+            return
+        fields = diff_fields(old, record)
+        if fields:
+            # Full record alongside the diff so importers can upsert without a lookup
+            self.delta[section]["changed"].append({"id": record["id"], "fields": fields, "record": record})
+
+    def discard(self) -> None:
+        self.snapshot.close()
+        os.remove(f"{self.snapshot_path}.tmp")
+
+    def finish(self) -> Dict[str, object]:
+        self.snapshot.close()
+        changeset: Dict[str, object] = {"base": self.base, "target": self.target.hexdigest()[:16]}
+        for section in SECTIONS:
+            delta = self.delta[section]
+            changeset[section] = {
+                "added": sorted(delta["added"], key=lambda record: record["id"]),
+                # Whatever is left of the previous build did not show up this time
+                "removed": sorted(self.previous[section]),
+                "changed": sorted(delta["changed"], key=lambda change: change["id"]),
+            }
+
+        tmp_path = f"{self.changeset_path}.tmp"
+        os.makedirs(os.path.dirname(self.changeset_path) or ".", exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(changeset, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.changeset_path)
+        os.replace(f"{self.snapshot_path}.tmp", self.snapshot_path)
+        print(f"Catalog changeset ({summary(changeset)}) -> {self.changeset_path}")
+        return changeset
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    except FileNotFoundError:
+        pass
+    return digest.hexdigest()[:16]
+
+
+def summary(changeset: Dict[str, object]) -> str:
+    parts = []
+    for section in SECTIONS:
+        delta = changeset[section]
+        parts.append(f"{section} +{len(delta['added'])} -{len(delta['removed'])} ~{len(delta['changed'])}")
+    return ", ".join(parts)
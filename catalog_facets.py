@@ -0,0 +1,253 @@
+import argparse
+import json
+import os
+import sys
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the catalog still builds without facets.
+    np = None
+
+FACETS_FILE = "frontend/public/catalog/facets.json"
+TRAILERS_SNAPSHOT = os.path.join("output", ".catalog_snapshot.jsonl")
+
+# Numeric columns: facet name -> how to read it from a catalog trailer record
+NUMERIC_FIELDS = {
+    "price": lambda trailer: trailer.get("price"),
+    "capacity": lambda trailer: trailer.get("capacity"),
+    "length": lambda trailer: trailer.get("maxVehicleLength"),
+    "width": lambda trailer: trailer.get("maxVehicleWidth"),
+    "boardHeight": lambda trailer: trailer.get("boardHeight"),
+    "axles": lambda trailer: (trailer.get("specs") or {}).get("axles"),
+}
+# The scraper writes 0 when the site does not publish these (price on request, no board height)
+ZERO_IS_MISSING = ("price", "boardHeight")
+TERM_FIELDS = ("category", "brakes", "suspension")
+# Bucket edges for the range facets shown in the storefront filters
+RANGE_EDGES = {
+    "price": (0, 60000, 80000, 100000, 150000, 200000, 300000),
+    "capacity": (0, 500, 750, 1000, 1500, 2000),
+    "length": (0, 2000, 2500, 3000, 3500, 4000, 5000, 6000),
+    "width": (0, 1200, 1400, 1600, 1800, 2000),
+    "boardHeight": (1, 300, 400, 500),
+    "axles": (1, 2, 3),
+}
+
+
+def is_available() -> bool:
+    return np is not None
+
+
+def _number(value: object) -> float:
+    if isinstance(value, bool):
+        return float("nan")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def facet_row(trailer: Dict[str, object]) -> Dict[str, object]:
+    """The part of a trailer record the facet index needs (kept per trailer during the build)."""
+    row = {"id": trailer["id"]}
+    row.update({name: read(trailer) for name, read in NUMERIC_FIELDS.items()})
+    for name in ZERO_IS_MISSING:
+        if _number(row[name]) == 0:
+            row[name] = None
+    row.update({name: trailer.get(name) for name in TERM_FIELDS})
+    return row
+
+
+class FacetIndex:
+    """Columnar trailer specs with sorted indexes and per-term bitmaps.
+
+    Numeric fields are float64 columns (NaN = not published) with an argsort
+    per column, so a range filter is two ``searchsorted`` calls and sorting a
+    result is a boolean take over the precomputed order. Term fields are
+    dictionary-encoded; each term has a precomputed mask.
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, object]]) -> None:
+        if np is None:
+            raise RuntimeError("NumPy is required for the facet index")
+        rows = sorted(rows, key=lambda row: str(row["id"]))
+        self.ids = [str(row["id"]) for row in rows]
+        self.size = len(rows)
+        self.columns = {name: np.array([_number(row.get(name)) for row in rows], dtype=np.float64) for name in NUMERIC_FIELDS}
+        # Stable sort keeps id order among equal values; NaN sorts last
+        self.order = {name: np.argsort(column, kind="stable") for name, column in self.columns.items()}
+        self.sorted = {name: self.columns[name][order] for name, order in self.order.items()}
+        # Rows with a value for each column; they come first in its order
+        self.valid = {name: int(np.count_nonzero(~np.isnan(column))) for name, column in self.columns.items()}
+        self.labels: Dict[str, List[str]] = {}
+        self.codes: Dict[str, "np.ndarray"] = {}
+        self.term_masks: Dict[str, Dict[str, "np.ndarray"]] = {}
+        for name in TERM_FIELDS:
+            values = [str(row.get(name) or "") for row in rows]
+            labels = sorted(set(values))
+            lookup = {label: code for code, label in enumerate(labels)}
+            codes = np.array([lookup[value] for value in values], dtype=np.int32)
+            self.labels[name] = labels
+            self.codes[name] = codes
+            self.term_masks[name] = {label: codes == code for code, label in enumerate(labels)}
+
+    def range_mask(self, name: str, low: Optional[float] = None, high: Optional[float] = None) -> "np.ndarray":
+        """Rows with ``low <= value <= high``; rows without a value never match."""
+        values = self.sorted[name]
+        valid = self.valid[name]
+        start = 0 if low is None else int(np.searchsorted(values[:valid], low, side="left"))
+        end = valid if high is None else int(np.searchsorted(values[:valid], high, side="right"))
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self.order[name][start:end]] = True
+        return mask
+
+    def term_mask(self, name: str, terms: Sequence[str]) -> "np.ndarray":
+        mask = np.zeros(self.size, dtype=bool)
+        for term in terms:
+            term_mask = self.term_masks[name].get(term)
+            if term_mask is not None:
+                mask |= term_mask
+        return mask
+
+    def mask(
+        self,
+        ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+        terms: Optional[Dict[str, Sequence[str]]] = None,
+    ) -> "np.ndarray":
+        mask = np.ones(self.size, dtype=bool)
+        for name, (low, high) in (ranges or {}).items():
+            mask &= self.range_mask(name, low, high)
+        for name, values in (terms or {}).items():
+            mask &= self.term_mask(name, values)
+        return mask
+
+    def query(
+        self,
+        ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+        terms: Optional[Dict[str, Sequence[str]]] = None,
+        sort: Optional[str] = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+    ) -> List[str]:
+        """Ids of matching trailers, ordered by ``sort`` (rows without a value last)."""
+        mask = self.mask(ranges, terms)
+        if sort is None:
+            positions = np.flatnonzero(mask)
+        else:
+            order = self.order[sort]
+            if descending:
+                valid = self.valid[sort]
+                order = np.concatenate((order[:valid][::-1], order[valid:]))
+            positions = order[mask[order]]
+        if limit is not None:
+            positions = positions[:limit]
+        return [self.ids[pos] for pos in positions]
+
+    def counts(self, mask: Optional["np.ndarray"] = None) -> Dict[str, object]:
+        """Term counts, range-bucket counts and min/max for the rows in ``mask``."""
+        mask = np.ones(self.size, dtype=bool) if mask is None else mask
+        terms = {}
+        for name, labels in self.labels.items():
+            hits = np.bincount(self.codes[name][mask], minlength=len(labels))
+            terms[name] = {label: int(count) for label, count in zip(labels, hits) if count}
+        ranges = {}
+        for name, column in self.columns.items():
+            values = column[mask]
+            values = values[~np.isnan(values)]
+            edges = RANGE_EDGES[name]
+            buckets = np.searchsorted(np.asarray(edges, dtype=np.float64), values, side="right") - 1
+            hits = np.bincount(buckets[buckets >= 0], minlength=len(edges))
+            ranges[name] = {
+                "min": float(values.min()) if values.size else None,
+                "max": float(values.max()) if values.size else None,
+                "buckets": [
+                    {"from": edges[pos], "to": edges[pos + 1] if pos + 1 < len(edges) else None, "count": int(hits[pos])}
+                    for pos in range(len(edges))
+                ],
+            }
+        return {"total": int(mask.sum()), "terms": terms, "ranges": ranges}
+
+    def export(self) -> Dict[str, object]:
+        """Everything the storefront needs to filter and sort without scanning records."""
+
+        def column(values: "np.ndarray") -> List[Optional[float]]:
+            return [None if np.isnan(value) else (int(value) if value.is_integer() else float(value)) for value in values]
+
+        return {
+            "trailers": self.ids,
+            "columns": {name: column(values) for name, values in self.columns.items()},
+            "sorted": {name: order.tolist() for name, order in self.order.items()},
+            "terms": {
+                name: {label: np.flatnonzero(mask).tolist() for label, mask in masks.items()}
+                for name, masks in self.term_masks.items()
+            },
+            "facets": {
+                "all": self.counts(),
+                "byCategory": {label: self.counts(mask) for label, mask in self.term_masks["category"].items()},
+            },
+        }
+
+
+def write_facets(rows: Iterable[Dict[str, object]], path: str = FACETS_FILE) -> Optional[FacetIndex]:
+    if np is None:
+        print("NumPy is not installed, skipping catalog facets.")
+        return None
+    index = FacetIndex(rows)
+    data = json.dumps(index.export(), ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    print(f"Catalog facets: {index.size} trailers -> {path} ({len(data.encode('utf-8')) / 1024:.1f} KB)")
+    return index
+
+
+def _parse_range(text: str) -> Tuple[str, Tuple[Optional[float], Optional[float]]]:
+    # "price=50000:100000", "length=3000:" or "axles=:1"
+    name, _, bounds = text.partition("=")
+    if name not in NUMERIC_FIELDS:
+        raise argparse.ArgumentTypeError(f"unknown field {name!r}, expected one of {', '.join(NUMERIC_FIELDS)}")
+    low, _, high = bounds.partition(":")
+    try:
+        return name, (float(low) if low else None, float(high) if high else None)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"bounds of {name} must be numbers: {bounds!r}") from None
+
+
+def _parse_term(text: str) -> Tuple[str, str]:
+    name, _, value = text.partition("=")
+    if name not in TERM_FIELDS:
+        raise argparse.ArgumentTypeError(f"unknown field {name!r}, expected one of {', '.join(TERM_FIELDS)}")
+    return name, value
+
+
+def main() -> None:
+    import fit_index
+
+    parser = argparse.ArgumentParser(description="Filter and sort catalog trailers by their specs")
+    parser.add_argument("--trailers", default=TRAILERS_SNAPSHOT, help="catalog snapshot (.jsonl) or backend/db.json")
+    parser.add_argument("--range", action="append", default=[], type=_parse_range, metavar="FIELD=LOW:HIGH", help=f"one of {', '.join(NUMERIC_FIELDS)}")
+    parser.add_argument("--term", action="append", default=[], type=_parse_term, metavar="FIELD=VALUE", help=f"one of {', '.join(TERM_FIELDS)}")
+    parser.add_argument("--sort", choices=NUMERIC_FIELDS)
+    parser.add_argument("--desc", action="store_true")
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--export", metavar="PATH", help=f"write precomputed facets (e.g. {FACETS_FILE})")
+    args = parser.parse_args()
+
+    if np is None:
+        print("NumPy is not installed (pip install numpy)")
+        sys.exit(1)
+    rows = [facet_row(trailer) for trailer in fit_index.load_trailers(args.trailers)]
+    index = write_facets(rows, args.export) if args.export else FacetIndex(rows)
+    terms: Dict[str, List[str]] = {}
+    for name, value in args.term:
+        terms.setdefault(name, []).append(value)
+    ranges = dict(args.range)
+    for trailer_id in index.query(ranges, terms, args.sort, args.desc, args.limit):
+        print(trailer_id)
+
+
+if __name__ == "__main__":
+    main()
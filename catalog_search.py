@@ -0,0 +1,220 @@
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scraper"))
+
+from textnorm import transliterate  # noqa: E402
+
+SEARCH_INDEX_FILE = "frontend/public/catalog/search-index.json.gz"
+
+TOKEN_RE = re.compile(r"[0-9a-zа-я]+")
+CYRILLIC_RE = re.compile(r"[а-я]")
+# Light normalization only: no dictionary, just the commonest inflections so
+# "прицепы" / "прицепа" / "прицепов" land on one term. Longest endings first.
+RU_ENDINGS = (
+    "иями", "ями", "ами", "ого", "его", "ому", "ему", "ыми", "ими", "ая", "яя", "ое", "ее", "ые", "ие",
+    "ый", "ий", "ой", "ом", "ем", "ах", "ях", "ов", "ев", "ей", "ам", "ям", "ую", "юю",
+    "а", "я", "о", "е", "ы", "и", "у", "ю", "ь", "й",
+)
+# The same inflections as typed in Latin ("lodochniy", "pritsepy"), for transliterated aliases
+LATIN_ENDINGS = ("yami", "ami", "ogo", "ego", "aya", "yye", "iye", "yy", "iy", "oy", "ye", "ie", "ov", "ev", "a", "y", "i", "e", "o", "u")
+MIN_STEM = 4
+# Genitive plurals whose stem vowel drops out ("лодка" -> "лодок") and so share no ending
+# with the other forms; mapped straight to the stem the other forms reduce to
+RU_STEM_EXCEPTIONS = {
+    "лодок": "лодк",
+    "перевозок": "перевозк",
+    "лебедок": "лебедк",
+    "стоек": "стойк",
+    "накладок": "накладк",
+    "подставок": "подставк",
+}
+STEM_EXCEPTIONS = dict(RU_STEM_EXCEPTIONS)
+STEM_EXCEPTIONS.update({transliterate(word): transliterate(stem) for word, stem in RU_STEM_EXCEPTIONS.items()})
+STOPWORDS = frozenset(
+    "и в во на с со для по из от до к ко без при под над о об а но или же не что это как так мм кг см м шт".split()
+)
+# Field weights: a hit in the name counts more than one in the description
+WEIGHTS = {"name": 8, "model": 8, "code": 8, "options": 2, "description": 1}
+
+
+def _strip_ending(token: str, endings: Tuple[str, ...]) -> str:
+    for ending in endings:
+        if token.endswith(ending) and len(token) - len(ending) >= MIN_STEM:
+            return token[: -len(ending)]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word and number tokens; model numbers like 817701.012 give "817701" and "012"."""
+    return TOKEN_RE.findall(str(text or "").lower().replace("ё", "е"))
+
+
+def normalize(token: str) -> str:
+    if token.isdigit():
+        return token
+    if token in STEM_EXCEPTIONS:
+        return STEM_EXCEPTIONS[token]
+    if CYRILLIC_RE.search(token):
+        return _strip_ending(token, RU_ENDINGS)
+    return _strip_ending(token, LATIN_ENDINGS)
+
+
+def index_terms(text: str) -> List[str]:
+    """Terms for indexing: normalized tokens plus a Latin alias of each Cyrillic one."""
+    terms = []
+    for token in tokenize(text):
+        if token in STOPWORDS or (len(token) < 2 and not token.isdigit()):
+            continue
+        term = normalize(token)
+        terms.append(term)
+        if CYRILLIC_RE.search(term):
+            alias = transliterate(term)
+            if alias and alias != term:
+                terms.append(alias)
+    return terms
+
+
+def query_terms(text: str) -> List[str]:
+    return [normalize(token) for token in tokenize(text) if token not in STOPWORDS]
+
+
+class SearchIndexBuilder:
+    """Collects trailers and accessories during the catalog write and emits the index."""
+
+    def __init__(self) -> None:
+        self.docs: List[Dict[str, object]] = []
+        self.scores: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    def _add(self, doc: Dict[str, object], fields: Dict[str, Iterable[str]]) -> None:
+        pos = len(self.docs)
+        self.docs.append(doc)
+        for field, texts in fields.items():
+            # A term counts once per field, however often it repeats there
+            terms = {term for text in texts for term in index_terms(text)}
+            for term in terms:
+                self.scores[term][pos] += WEIGHTS[field]
+
+    def add_trailer(self, trailer: Dict[str, object], option_names: Iterable[str] = ()) -> None:
+        self._add(
+            {"type": "trailer", "id": trailer["id"], "name": trailer.get("name", ""), "image": trailer.get("image", "")},
+            {
+                "name": [trailer.get("name", "")],
+                "model": [trailer.get("model", "")],
+                "code": [str(trailer["id"])],
+                "options": option_names,
+                "description": [trailer.get("description", "")],
+            },
+        )
+
+    def add_accessory(self, accessory: Dict[str, object]) -> None:
+        self._add(
+            {"type": "accessory", "id": accessory["id"], "name": accessory.get("name", ""), "image": accessory.get("image", "")},
+            {
+                "name": [accessory.get("name", "")],
+                "code": [str(accessory["id"])],
+                "description": [accessory.get("description", "")],
+            },
+        )
+
+    def build(self) -> Dict[str, object]:
+        terms = sorted(self.scores)
+        postings = []
+        for term in terms:
+            # Flat [doc delta, score, doc delta, score, ...] keeps the JSON small before gzip
+            flat: List[int] = []
+            previous = 0
+            for pos, score in sorted(self.scores[term].items()):
+                flat += [pos - previous, score]
+                previous = pos
+            postings.append(flat)
+        return {
+            "docs": self.docs,
+            "terms": terms,
+            "postings": postings,
+            "rules": {
+                "ruEndings": list(RU_ENDINGS),
+                "latinEndings": list(LATIN_ENDINGS),
+                "minStem": MIN_STEM,
+                "stemExceptions": STEM_EXCEPTIONS,
+                "stopwords": sorted(STOPWORDS),
+            },
+        }
+
+    def write(self, path: str = SEARCH_INDEX_FILE) -> Dict[str, object]:
+        index = self.build()
+        data = json.dumps(index, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode("utf-8")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        # mtime=0 keeps the archive byte-identical for identical input
+        with open(tmp_path, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=9, mtime=0) as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        print(
+            f"Search index: {len(index['docs'])} documents, {len(index['terms'])} terms -> {path} "
+            f"({len(data) / 1024:.1f} KB, {os.path.getsize(path) / 1024:.1f} KB gzipped)"
+        )
+        return index
+
+
+def load_index(path: str = SEARCH_INDEX_FILE) -> Dict[str, object]:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _postings(index: Dict[str, object], pos: int) -> Dict[int, int]:
+    flat = index["postings"][pos]
+    result = {}
+    doc = 0
+    for offset in range(0, len(flat), 2):
+        doc += flat[offset]
+        result[doc] = flat[offset + 1]
+    return result
+
+
+def search(index: Dict[str, object], text: str, limit: int = 10) -> List[Tuple[Dict[str, object], int]]:
+    """Documents containing every query term; the last term also matches as a prefix."""
+    terms = query_terms(text)
+    if not terms:
+        return []
+    all_terms = index["terms"]
+    scores = None
+    for number, term in enumerate(terms):
+        matches: Dict[int, int] = {}
+        start = bisect_left(all_terms, term)
+        if number == len(terms) - 1:
+            end = start
+            while end < len(all_terms) and all_terms[end].startswith(term):
+                end += 1
+        else:
+            end = start + 1 if start < len(all_terms) and all_terms[start] == term else start
+        for pos in range(start, end):
+            for doc, score in _postings(index, pos).items():
+                matches[doc] = max(matches.get(doc, 0), score)
+        scores = matches if scores is None else {doc: scores[doc] + score for doc, score in matches.items() if doc in scores}
+        if not scores:
+            return []
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    return [(index["docs"][doc], score) for doc, score in ranked]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query the catalog search index")
+    parser.add_argument("query")
+    parser.add_argument("--index", default=SEARCH_INDEX_FILE)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    for doc, score in search(load_index(args.index), args.query, args.limit):
+        print(f"{score:>4}  {doc['type']:<9} {doc['id']:<20} {doc['name']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import json
+import os
+from typing import Dict, List
+
+from catalog_stream import JsonArrayWriter
+
+CATALOG_DIR = "frontend/public/catalog"
+CATALOG_URL = "/catalog"
+SHARD_MODES = ("category", "trailer")
+DEFAULT_SHARD_BUDGET_KB = 512
+DEFAULT_INDEX_BUDGET_KB = 64
+
+# Fields kept in index.json; everything else is fetched from the detail shard.
+INDEX_FIELDS = ("id", "name", "price", "category")
+
+
+def minify(payload: object) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode("utf-8")
+
+
+def _thumbnail(trailer: Dict[str, object]) -> str:
+    metas = trailer.get("imageMeta") or []
+    if metas and metas[0]:
+        return metas[0]["thumbnail"]
+    return trailer.get("image", "")
+
+
+class ShardWriter:
+    """Stream trailers and accessories into index.json plus per-category or per-trailer shards.
+
+    Records go straight to temp files; only the compact index entries stay in
+    memory. Nothing replaces the published catalog until ``finish()`` has
+    checked every shard against its size budget.
+    """
+
+    def __init__(self, shard_by: str = "category", catalog_dir: str = CATALOG_DIR):
+        if shard_by not in SHARD_MODES:
+            raise ValueError(f"Unknown shard mode: {shard_by}")
+        self.shard_by = shard_by
+        self.catalog_dir = catalog_dir
+        self.writers: Dict[str, JsonArrayWriter] = {}
+        self.entries: List[Dict[str, object]] = []
+
+    def _writer(self, rel_path: str) -> JsonArrayWriter:
+        writer = self.writers.get(rel_path)
+        if writer is None:
+            writer = JsonArrayWriter(os.path.join(self.catalog_dir, rel_path), indent=None)
+            self.writers[rel_path] = writer
+        return writer
+
+    def add_trailer(self, trailer: Dict[str, object]) -> None:
+        key = trailer["category"] if self.shard_by == "category" else trailer["id"]
+        rel_path = f"trailers/{key}.json"
+        if self.shard_by == "trailer" and rel_path in self.writers:
+            raise ValueError(f"Duplicate trailer id in catalog: {trailer['id']}")
+        writer = self._writer(rel_path)
+        writer.write(trailer)
+        if self.shard_by == "trailer":
+            writer.seal()  # one record per shard; do not keep a handle per trailer open
+        entry = {field: trailer.get(field) for field in INDEX_FIELDS}
+        entry["thumbnail"] = _thumbnail(trailer)
+        entry["shard"] = rel_path
+        self.entries.append(entry)
+
+    def add_accessory(self, accessory: Dict[str, object]) -> None:
+        self._writer(f"accessories/{accessory['category']}.json").write(accessory)
+
+    def _discard(self) -> None:
+        for writer in self.writers.values():
+            writer.discard()
+
+    def finish(self, shard_budget_kb: int = DEFAULT_SHARD_BUDGET_KB, index_budget_kb: int = DEFAULT_INDEX_BUDGET_KB) -> List[str]:
+        """Publish index.json and the shards; return budget violations (nothing is published then)."""
+        for writer in self.writers.values():
+            writer.seal()
+        index = {
+            "trailers": self.entries,
+            "accessoryShards": sorted(path for path in self.writers if path.startswith("accessories/")),
+            # Short content hashes let the client cache-bust a shard only when it changed.
+            "versions": {path: self.writers[path].digest.hexdigest()[:12] for path in sorted(self.writers)},
+        }
+        index_data = minify(index)
+
+        errors = []
+        if len(index_data) > index_budget_kb * 1024:
+            errors.append(f"index.json: {len(index_data) / 1024:.1f} KB > {index_budget_kb} KB")
+        for path in sorted(self.writers):
+            size = self.writers[path].size
+            if size > shard_budget_kb * 1024:
+                errors.append(f"{path}: {size / 1024:.1f} KB > {shard_budget_kb} KB")
+        if errors:
+            self._discard()
+            return errors
+
+        written = sum(writer.commit(only_if_changed=True) for writer in self.writers.values())
+        written += _write_if_changed(os.path.join(self.catalog_dir, "index.json"), index_data)
+
+        # Drop shards left over from a previous layout (e.g. per-trailer -> per-category)
+        wanted = {os.path.normpath(writer.path) for writer in self.writers.values()}
+        for sub in ("trailers", "accessories"):
+            folder = os.path.join(self.catalog_dir, sub)
+            if not os.path.isdir(folder):
+                continue
+            for filename in os.listdir(folder):
+                path = os.path.normpath(os.path.join(folder, filename))
+                if path not in wanted:
+                    os.remove(path)
+
+        largest = max((writer.size for writer in self.writers.values()), default=0)
+        print(
+            f"Catalog shards ({self.shard_by}): {len(self.writers)} shards, index {len(index_data) / 1024:.1f} KB, "
+            f"largest shard {largest / 1024:.1f} KB, {written} files written"
+        )
+        return []
+
+
+def _write_if_changed(path: str, data: bytes) -> bool:
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class JsonArrayWriter:
+    """Write a JSON array one record at a time.
+
+    The bytes match ``json.dumps(records, indent=...)`` (or the compact form
+    when ``indent`` is None), so streaming does not change the output. The
+    file is written to a temp path and only replaces ``path`` on ``commit()``.
+    """
+
+    def __init__(self, path: str, indent: Optional[int] = 2, header: str = "", footer: str = ""):
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.indent = indent
+        self.footer = footer
+        self.count = 0
+        self.size = 0
+        self.digest = hashlib.sha256()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.handle = open(self.tmp_path, "w", encoding="utf-8", newline="\n")
+        self._emit(header + "[")
+
+    def _emit(self, text: str) -> None:
+        data = text.encode("utf-8")
+        self.size += len(data)
+        self.digest.update(data)
+        self.handle.write(text)
+
+    def write(self, record: object) -> None:
+        if self.indent is None:
+            text = json.dumps(record, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+            self._emit(("," if self.count else "") + text)
+        else:
+            pad = " " * self.indent
+            text = json.dumps(record, ensure_ascii=False, sort_keys=True, indent=self.indent)
+            body = "\n".join(pad + line for line in text.split("\n"))
+            self._emit(("," if self.count else "") + "\n" + body)
+        self.count += 1
+
+    def seal(self) -> None:
+        """Finish the array and close the temp file, leaving ``path`` untouched."""
+        if self.handle.closed:
+            return
+        self._emit(("\n]" if self.count and self.indent is not None else "]") + self.footer)
+        self.handle.close()
+
+    def commit(self, only_if_changed: bool = False) -> bool:
+        """Move the sealed file into place; False if ``path`` already had these bytes."""
+        self.seal()
+        if only_if_changed and _file_sha256(self.path) == self.digest.digest():
+            os.remove(self.tmp_path)
+            return False
+        os.replace(self.tmp_path, self.path)
+        return True
+
+    def discard(self) -> None:
+        if not self.handle.closed:
+            self.handle.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def _file_sha256(path: str) -> Optional[bytes]:
+    try:
+        with open(path, "rb") as f:
+            digest = hashlib.sha256()
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+            return digest.digest()
+    except FileNotFoundError:
+        return None
+
+
+def bounded_map(executor, func: Callable[[T], R], items: Iterable[T], window: int) -> Iterator[R]:
+    """Like ``executor.map`` but keeps at most ``window`` tasks in flight.
+
+    Results come back in input order; the producer side is consumed lazily,
+    so neither inputs nor pending results pile up in memory.
+    """
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    batch: List[T] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class StageTimer:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - started
+
+    def timed(self, name: str, iterable: Iterable[T]) -> Iterator[T]:
+        """Yield from ``iterable``, charging only the time spent producing items to ``name``."""
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def report(self) -> None:
+        print("Stage timings:")
+        for name, seconds in self.timings.items():
+            print(f"  {name:<14}{seconds:>8.2f}s")
+        print(f"  {'total':<14}{time.perf_counter() - self.started:>8.2f}s")
@@ -0,0 +1,219 @@
+import argparse
+import json
+import os
+import sys
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scraper"))
+
+from textnorm import parse_length_to_mm, transliterate  # noqa: E402
+
+VEHICLE_FILES = (
+    "frontend/src/data/vehiclesDatabase.json",
+    "scraper/vehicles_harvest.json",
+    "scraper/vehicles_rm.json",
+)
+FIT_INDEX_FILE = "frontend/public/catalog/fit-index.json"
+TRAILERS_SNAPSHOT = os.path.join("output", ".catalog_snapshot.jsonl")
+
+# Vehicle types that travel on boat trailers; everything else (ATV, snowmobile,
+# motorcycle, untyped go-rm.ru models) goes on a flatbed.
+WATER_TYPES = {"boat_soviet", "boat_aluminum", "boat_pvc", "jetski"}
+# Trailer category -> whether its bed is a boat bed. Other categories (closed
+# commercial vans) do not carry vehicles and are left out of the index.
+FIT_CATEGORIES = {"general": False, "water": True}
+# Trailer fields the index reads; the catalog build keeps only these per trailer.
+FIT_FIELDS = ("id", "category", "maxVehicleLength", "maxVehicleWidth", "maxVehicleWeight", "bodyDimensions")
+
+
+class TrailerFit(NamedTuple):
+    id: str
+    water: bool
+    length: int
+    width: Optional[int]  # None: not published, no constraint
+    capacity: Optional[float]
+
+
+class VehicleFit(NamedTuple):
+    id: str
+    brand: str
+    model: str
+    water: bool
+    length: int
+    width: int
+    weight: float  # 0 when unknown
+
+
+def _number(value) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number > 0 else None
+
+
+def trailer_fit(trailer: Dict[str, object]) -> Optional[TrailerFit]:
+    """Usable bed limits of a catalog trailer, or None if its length is unknown.
+
+    Only for categories in FIT_CATEGORIES; the caller filters the rest out.
+    """
+    water = FIT_CATEGORIES[str(trailer.get("category"))]
+    length = _number(trailer.get("maxVehicleLength"))
+    if length is None and water and trailer.get("bodyDimensions"):
+        # Boat trailers publish the max hull length as "<mm> мм судно"
+        length = parse_length_to_mm(str(trailer["bodyDimensions"]).split()[0])
+    if not length:
+        return None
+    width = _number(trailer.get("maxVehicleWidth"))
+    return TrailerFit(
+        str(trailer["id"]),
+        water,
+        int(length),
+        int(width) if width else None,
+        _number(trailer.get("maxVehicleWeight")),
+    )
+
+
+def load_vehicles(paths: Iterable[str] = VEHICLE_FILES) -> List[VehicleFit]:
+    vehicles: Dict[str, VehicleFit] = {}
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"Vehicle file not found, skipping: {path}")
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        records = data["vehicles"] if isinstance(data, dict) else data
+        for record in records:
+            length = _number(record.get("length"))
+            width = _number(record.get("width"))
+            if not length or not width:
+                continue
+            brand = str(record.get("brand", "")).strip()
+            model = str(record.get("model", "")).strip(" /")
+            vehicle_id = record.get("id") or transliterate(f"{brand} {model}")
+            vehicles.setdefault(
+                vehicle_id,
+                VehicleFit(
+                    vehicle_id,
+                    brand,
+                    model,
+                    record.get("type") in WATER_TYPES,
+                    int(length),
+                    int(width),
+                    _number(record.get("weight")) or 0,
+                ),
+            )
+    return sorted(vehicles.values(), key=lambda vehicle: vehicle.id)
+
+
+class FitIndex:
+    """Trailers and vehicles sorted by length, per bed type (boat or flatbed).
+
+    A bisect skips the trailers shorter than the vehicle (or the vehicles
+    longer than the bed), and width and weight are checked on every
+    candidate left. A lookup is therefore O(log n + m), m being the trailers
+    at least as long as the vehicle: linear in the worst case. At catalog
+    size (tens of trailers, hundreds of vehicles) the full join runs once
+    per build in milliseconds, so no second index is kept.
+    """
+
+    def __init__(self, trailers: Iterable[TrailerFit], vehicles: Iterable[VehicleFit]):
+        self.trailers = {water: sorted((t for t in trailers if t.water == water), key=lambda t: t.length) for water in (False, True)}
+        self.vehicles = {water: sorted((v for v in vehicles if v.water == water), key=lambda v: v.length) for water in (False, True)}
+        self.trailer_lengths = {water: [t.length for t in group] for water, group in self.trailers.items()}
+        self.vehicle_lengths = {water: [v.length for v in group] for water, group in self.vehicles.items()}
+
+    @staticmethod
+    def fits(trailer: TrailerFit, vehicle: VehicleFit) -> bool:
+        if trailer.water != vehicle.water or vehicle.length > trailer.length:
+            return False
+        if trailer.width is not None and vehicle.width > trailer.width:
+            return False
+        return not (vehicle.weight and trailer.capacity and vehicle.weight > trailer.capacity)
+
+    def trailers_for(self, vehicle: VehicleFit) -> List[str]:
+        group = self.trailers[vehicle.water]
+        start = bisect_left(self.trailer_lengths[vehicle.water], vehicle.length)
+        return sorted(t.id for t in group[start:] if self.fits(t, vehicle))
+
+    def vehicles_for(self, trailer: TrailerFit) -> List[str]:
+        group = self.vehicles[trailer.water]
+        end = bisect_right(self.vehicle_lengths[trailer.water], trailer.length)
+        return sorted(v.id for v in group[:end] if self.fits(trailer, v))
+
+
+def build_fit_index(trailers: Iterable[Dict[str, object]], vehicles: List[VehicleFit]) -> Dict[str, object]:
+    """Precompute both fit lists; ids are replaced by positions to keep the artifact small."""
+    fits: List[TrailerFit] = []
+    unknown: List[str] = []
+    for trailer in trailers:
+        if trailer.get("category") not in FIT_CATEGORIES:
+            continue
+        fit = trailer_fit(trailer)
+        if fit is None:
+            unknown.append(str(trailer["id"]))
+        else:
+            fits.append(fit)
+    fits.sort(key=lambda fit: fit.id)
+
+    index = FitIndex(fits, vehicles)
+    trailer_pos = {fit.id: pos for pos, fit in enumerate(fits)}
+    vehicle_pos = {vehicle.id: pos for pos, vehicle in enumerate(vehicles)}
+    return {
+        "trailers": [fit.id for fit in fits],
+        "vehicles": [{"id": v.id, "brand": v.brand, "model": v.model} for v in vehicles],
+        "byVehicle": [[trailer_pos[tid] for tid in index.trailers_for(v)] for v in vehicles],
+        "byTrailer": [[vehicle_pos[vid] for vid in index.vehicles_for(fit)] for fit in fits],
+        "unknownDimensions": sorted(unknown),
+    }
+
+
+def write_fit_index(
+    trailers: Iterable[Dict[str, object]],
+    vehicle_files: Iterable[str] = VEHICLE_FILES,
+    path: str = FIT_INDEX_FILE,
+) -> Dict[str, object]:
+    payload = build_fit_index(trailers, load_vehicles(vehicle_files))
+    data = json.dumps(payload, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    pairs = sum(len(row) for row in payload["byVehicle"])
+    print(
+        f"Fit index: {len(payload['trailers'])} trailers x {len(payload['vehicles'])} vehicles, {pairs} fits, "
+        f"{len(payload['unknownDimensions'])} trailers without dimensions -> {path} ({len(data.encode('utf-8')) / 1024:.1f} KB)"
+    )
+    return payload
+
+
+def load_trailers(path: str) -> List[Dict[str, object]]:
+    """Trailers from the catalog snapshot (.jsonl) or a db.json-style {"trailers": [...]} file."""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            rows = (json.loads(line) for line in f if line.strip())
+            return [row["record"] for row in rows if row["section"] == "trailers"]
+        return json.load(f).get("trailers", [])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Precompute which vehicles fit which trailers")
+    parser.add_argument("--trailers", default=TRAILERS_SNAPSHOT, help="catalog snapshot (.jsonl) or backend/db.json")
+    parser.add_argument("--vehicles", action="append", help="vehicle JSON file (repeatable)")
+    parser.add_argument("--output", default=FIT_INDEX_FILE)
+    parser.add_argument("--vehicle", help="print trailers that fit vehicles whose name contains this text")
+    args = parser.parse_args()
+
+    payload = write_fit_index(load_trailers(args.trailers), args.vehicles or VEHICLE_FILES, args.output)
+    if args.vehicle:
+        needle = args.vehicle.lower()
+        for pos, vehicle in enumerate(payload["vehicles"]):
+            if needle in f"{vehicle['brand']} {vehicle['model']}".lower():
+                matches = [payload["trailers"][t] for t in payload["byVehicle"][pos]]
+                print(f"{vehicle['brand']} {vehicle['model']}: {', '.join(matches) or 'no fitting trailers'}")
+
+
+if __name__ == "__main__":
+    main()
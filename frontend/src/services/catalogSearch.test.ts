@@ -0,0 +1,29 @@
+import { describe, it, expect } from 'vitest';
+import { queryTerms, searchIndex } from './catalogShards';
+import fixture from './catalogSearch.fixture.json';
+import { SearchIndex } from '../types';
+
+// Индекс и ожидаемые ответы построены catalog_search.py (scraper/tests/test_catalog_search.py
+// проверяет, что они не разошлись с Python-реализацией)
+const index = fixture.index as unknown as SearchIndex;
+const queries = fixture.queries as Record<string, { terms: string[]; ids: string[] }>;
+
+describe('Catalog search parity with catalog_search.py', () => {
+  for (const [query, expected] of Object.entries(queries)) {
+    it(`normalizes "${query}" the same way`, () => {
+      expect(queryTerms(index, query)).toEqual(expected.terms);
+    });
+
+    it(`returns the same documents for "${query}"`, () => {
+      expect(searchIndex(index, query).map((doc) => doc.id)).toEqual(expected.ids);
+    });
+  }
+
+  it('finds boats by the genitive plural form ("лодок" -> "лодка")', () => {
+    expect(searchIndex(index, 'лодка').map((doc) => doc.id)).toContain('mzsa_817701_022');
+  });
+
+  it('respects the limit', () => {
+    expect(searchIndex(index, 'прицеп', 1)).toHaveLength(1);
+  });
+});
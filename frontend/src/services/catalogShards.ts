@@ -0,0 +1,232 @@
+/**
+ * Загрузка каталога по частям из /catalog (generate_catalog.py --output shards)
+ * Сначала компактный индекс, полные карточки и аксессуары — по запросу
+ */
+
+import {
+  Accessory,
+  CatalogFacets,
+  CatalogIndex,
+  FacetNumericField,
+  FacetTermField,
+  FitIndex,
+  SearchDoc,
+  SearchIndex,
+  Trailer,
+} from '../types';
+
+const CATALOG_URL = '/catalog';
+
+let indexPromise: Promise<CatalogIndex> | null = null;
+let fitIndexPromise: Promise<FitIndex> | null = null;
+let facetsPromise: Promise<CatalogFacets> | null = null;
+let searchIndexPromise: Promise<SearchIndex> | null = null;
+const shardCache = new Map<string, Promise<unknown>>();
+
+const fetchJson = async <T>(url: string): Promise<T> => {
+  const res = await fetch(url);
+  if (!res.ok) {
+    throw new Error(`Failed to load ${url}: ${res.status}`);
+  }
+  return res.json();
+};
+
+export const loadCatalogIndex = (): Promise<CatalogIndex> => {
+  if (!indexPromise) {
+    indexPromise = fetchJson<CatalogIndex>(`${CATALOG_URL}/index.json`).catch((error) => {
+      indexPromise = null;
+      throw error;
+    });
+  }
+  return indexPromise;
+};
+
+const loadShard = async <T>(path: string): Promise<T> => {
+  const index = await loadCatalogIndex();
+  // Версия — хэш содержимого: неизменённый шард остаётся в HTTP-кэше
+  const url = `${CATALOG_URL}/${path}?v=${index.versions[path] ?? ''}`;
+  if (!shardCache.has(url)) {
+    shardCache.set(
+      url,
+      fetchJson<T>(url).catch((error) => {
+        shardCache.delete(url);
+        throw error;
+      })
+    );
+  }
+  return shardCache.get(url) as Promise<T>;
+};
+
+export const loadTrailer = async (id: string): Promise<Trailer | undefined> => {
+  const index = await loadCatalogIndex();
+  const entry = index.trailers.find((item) => item.id === id);
+  if (!entry) return undefined;
+  const trailers = await loadShard<Trailer[]>(entry.shard);
+  return trailers.find((trailer) => trailer.id === id);
+};
+
+export const loadTrailersByCategory = async (category: Trailer['category']): Promise<Trailer[]> => {
+  const index = await loadCatalogIndex();
+  const shards = [...new Set(index.trailers.filter((item) => item.category === category).map((item) => item.shard))];
+  const groups = await Promise.all(shards.map((path) => loadShard<Trailer[]>(path)));
+  return groups.flat().filter((trailer) => trailer.category === category);
+};
+
+export const loadAccessories = async (category?: Accessory['category']): Promise<Accessory[]> => {
+  const index = await loadCatalogIndex();
+  const shards = category
+    ? index.accessoryShards.filter((path) => path === `accessories/${category}.json`)
+    : index.accessoryShards;
+  const groups = await Promise.all(shards.map((path) => loadShard<Accessory[]>(path)));
+  return groups.flat();
+};
+
+export const loadFitIndex = (): Promise<FitIndex> => {
+  if (!fitIndexPromise) {
+    fitIndexPromise = fetchJson<FitIndex>(`${CATALOG_URL}/fit-index.json`).catch((error) => {
+      fitIndexPromise = null;
+      throw error;
+    });
+  }
+  return fitIndexPromise;
+};
+
+// id прицепов, в которые помещается техника (без перебора всех пар на клиенте)
+export const getFittingTrailerIds = async (vehicleId: string): Promise<string[]> => {
+  const index = await loadFitIndex();
+  const pos = index.vehicles.findIndex((vehicle) => vehicle.id === vehicleId);
+  return pos < 0 ? [] : index.byVehicle[pos].map((trailerPos) => index.trailers[trailerPos]);
+};
+
+export const getFittingVehicles = async (trailerId: string): Promise<FitIndex['vehicles']> => {
+  const index = await loadFitIndex();
+  const pos = index.trailers.indexOf(trailerId);
+  return pos < 0 ? [] : index.byTrailer[pos].map((vehiclePos) => index.vehicles[vehiclePos]);
+};
+
+export const loadCatalogFacets = (): Promise<CatalogFacets> => {
+  if (!facetsPromise) {
+    facetsPromise = fetchJson<CatalogFacets>(`${CATALOG_URL}/facets.json`).catch((error) => {
+      facetsPromise = null;
+      throw error;
+    });
+  }
+  return facetsPromise;
+};
+
+export interface FacetQuery {
+  ranges?: Partial<Record<FacetNumericField, [number | null, number | null]>>;
+  terms?: Partial<Record<FacetTermField, string[]>>;
+  sort?: FacetNumericField;
+  descending?: boolean;
+}
+
+// Фильтр и сортировка по готовым колонкам, без обхода карточек прицепов
+export const queryTrailerIds = async (query: FacetQuery): Promise<string[]> => {
+  const facets = await loadCatalogFacets();
+  const matches = facets.trailers.map((_, pos) => {
+    for (const [field, [low, high]] of Object.entries(query.ranges ?? {}) as [FacetNumericField, [number | null, number | null]][]) {
+      const value = facets.columns[field][pos];
+      if (value === null || (low !== null && value < low) || (high !== null && value > high)) return false;
+    }
+    return true;
+  });
+  for (const [field, values] of Object.entries(query.terms ?? {}) as [FacetTermField, string[]][]) {
+    const allowed = new Set(values.flatMap((value) => facets.terms[field][value] ?? []));
+    matches.forEach((match, pos) => {
+      if (match && !allowed.has(pos)) matches[pos] = false;
+    });
+  }
+  let order = query.sort ? facets.sorted[query.sort] : facets.trailers.map((_, pos) => pos);
+  if (query.sort && query.descending) {
+    const column = facets.columns[query.sort];
+    const valued = order.filter((pos) => column[pos] !== null);
+    order = [...valued.reverse(), ...order.filter((pos) => column[pos] === null)];
+  }
+  return order.filter((pos) => matches[pos]).map((pos) => facets.trailers[pos]);
+};
+
+const fetchGzipJson = async <T>(url: string): Promise<T> => {
+  const res = await fetch(url);
+  if (!res.ok || !res.body) {
+    throw new Error(`Failed to load ${url}: ${res.status}`);
+  }
+  // Файл отдаётся как есть (.gz), распаковываем в браузере
+  const stream = res.body.pipeThrough(new DecompressionStream('gzip'));
+  return new Response(stream).json();
+};
+
+export const loadSearchIndex = (): Promise<SearchIndex> => {
+  if (!searchIndexPromise) {
+    searchIndexPromise = fetchGzipJson<SearchIndex>(`${CATALOG_URL}/search-index.json.gz`).catch((error) => {
+      searchIndexPromise = null;
+      throw error;
+    });
+  }
+  return searchIndexPromise;
+};
+
+// Та же нормализация, что в catalog_search.py: правила приходят вместе с индексом
+export const queryTerms = (index: SearchIndex, text: string): string[] => {
+  const { ruEndings, latinEndings, minStem, stemExceptions, stopwords } = index.rules;
+  const tokens = text.toLowerCase().replace(/ё/g, 'е').match(/[0-9a-zа-я]+/g) ?? [];
+  return tokens
+    .filter((token) => !stopwords.includes(token))
+    .map((token) => {
+      if (/^[0-9]+$/.test(token)) return token;
+      if (Object.hasOwn(stemExceptions, token)) return stemExceptions[token];
+      const endings = /[а-я]/.test(token) ? ruEndings : latinEndings;
+      const ending = endings.find((end) => token.endsWith(end) && token.length - end.length >= minStem);
+      return ending ? token.slice(0, -ending.length) : token;
+    });
+};
+
+const lowerBound = (terms: string[], term: string): number => {
+  let low = 0;
+  let high = terms.length;
+  while (low < high) {
+    const mid = (low + high) >> 1;
+    if (terms[mid] < term) low = mid + 1;
+    else high = mid;
+  }
+  return low;
+};
+
+// Документы, где есть все слова запроса; последнее слово ищется и как префикс
+export const searchIndex = (index: SearchIndex, text: string, limit = 10): SearchDoc[] => {
+  const terms = queryTerms(index, text);
+  let scores: Map<number, number> | null = null;
+  for (const [number, term] of terms.entries()) {
+    const matches = new Map<number, number>();
+    const start = lowerBound(index.terms, term);
+    let end = start;
+    if (number === terms.length - 1) {
+      while (end < index.terms.length && index.terms[end].startsWith(term)) end++;
+    } else if (index.terms[start] === term) {
+      end = start + 1;
+    }
+    for (let pos = start; pos < end; pos++) {
+      const flat = index.postings[pos];
+      let doc = 0;
+      for (let offset = 0; offset < flat.length; offset += 2) {
+        doc += flat[offset];
+        matches.set(doc, Math.max(matches.get(doc) ?? 0, flat[offset + 1]));
+      }
+    }
+    const previous: Map<number, number> | null = scores;
+    scores = new Map();
+    for (const [doc, score] of matches) {
+      if (previous === null) scores.set(doc, score);
+      else if (previous.has(doc)) scores.set(doc, (previous.get(doc) ?? 0) + score);
+    }
+    if (scores.size === 0) return [];
+  }
+  if (scores === null) return [];
+  return [...scores.entries()]
+    .sort((a, b) => b[1] - a[1] || a[0] - b[0])
+    .slice(0, limit)
+    .map(([doc]) => index.docs[doc]);
+};
+
+export const searchCatalog = async (text: string, limit = 10): Promise<SearchDoc[]> =>
+  searchIndex(await loadSearchIndex(), text, limit);
@@ -0,0 +1,32 @@
+/**
+ * Адаптивные варианты изображений (AVIF/WebP srcset, LQIP) из манифеста image_build.py
+ * В карточках каталога лежат только размеры и миниатюра, остальное — здесь, по запросу
+ */
+
+import { ImageVariants, ImageVariantsManifest } from '../types';
+
+const MANIFEST_URL = '/images/variants/manifest.json';
+
+let manifestPromise: Promise<ImageVariantsManifest> | null = null;
+
+export const loadImageVariants = (): Promise<ImageVariantsManifest> => {
+  if (!manifestPromise) {
+    manifestPromise = fetch(MANIFEST_URL)
+      .then((res) => {
+        if (!res.ok) {
+          throw new Error(`Failed to load ${MANIFEST_URL}: ${res.status}`);
+        }
+        return res.json() as Promise<ImageVariantsManifest>;
+      })
+      .catch((error) => {
+        manifestPromise = null;
+        throw error;
+      });
+  }
+  return manifestPromise;
+};
+
+export const getImageVariants = async (src: string): Promise<ImageVariants | undefined> => {
+  const manifest = await loadImageVariants();
+  return manifest[src]?.meta;
+};
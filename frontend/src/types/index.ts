@@ -210,6 +210,22 @@ export interface AdminUser {
   permissions?: UserPermissions;
 }
 
+/** Размеры изображения, встроенные в карточку (generate_catalog.py) */
+export interface ImageMeta {
+  width: number; // собственные размеры оригинала, px
+  height: number;
+  thumbnail: string; // миниатюра WebP
+}
+
+/** Адаптивные варианты изображения из /images/variants/manifest.json (image_build.py) */
+export interface ImageVariants extends ImageMeta {
+  src: string; // оригинал
+  lqip: string; // крошечное превью (data URI) на время загрузки
+  sources: { type: string; srcset: string }[]; // для <picture><source>: AVIF, WebP
+}
+
+export type ImageVariantsManifest = Record<string, { sha256: string; formats: string[]; meta: ImageVariants }>;
+
 export interface Trailer {
   id: string;
   article?: string; // Артикул производителя (МЗСА)
@@ -233,6 +249,7 @@ export interface Trailer {
   availability: 'in_stock' | 'days_1_3' | 'days_7_14';
   image: string; // URL placeholder
   images?: string[]; // Array of all trailer images
+  imageMeta?: (ImageMeta | null)[]; // размеры для images, по тем же индексам
   description?: string;
   
   specs?: {
@@ -278,6 +295,7 @@ export interface Accessory {
   required?: boolean; // обязательный
   image: string;
   images?: string[];
+  imageMeta?: ImageMeta;
   description: string;
   features?: string[];
   specs?: Record<string, unknown>;
@@ -287,6 +305,72 @@ export interface Accessory {
   isPopular?: boolean | null;
 }
 
+// Каталог по частям: public/catalog/index.json (generate_catalog.py --output shards)
+export interface CatalogIndexEntry {
+  id: string;
+  name: string;
+  price: number;
+  category: Trailer['category'];
+  thumbnail: string;
+  shard: string; // путь шарда с полной карточкой, относительно /catalog
+}
+
+export interface CatalogIndex {
+  trailers: CatalogIndexEntry[];
+  accessoryShards: string[];
+  versions: Record<string, string>; // шард -> хэш содержимого
+}
+
+// Предрасчитанная совместимость техники и прицепов: public/catalog/fit-index.json
+export interface FitIndex {
+  trailers: string[]; // id бортовых и лодочных прицепов (фургоны не входят)
+  vehicles: { id: string; brand: string; model: string }[];
+  byVehicle: number[][]; // для каждой техники — позиции подходящих прицепов в trailers
+  byTrailer: number[][]; // для каждого прицепа — позиции подходящей техники в vehicles
+  unknownDimensions: string[]; // прицепы без размеров, совместимость не рассчитана
+}
+
+export type FacetNumericField = 'price' | 'capacity' | 'length' | 'width' | 'boardHeight' | 'axles';
+export type FacetTermField = 'category' | 'brakes' | 'suspension';
+
+export interface FacetCounts {
+  total: number;
+  terms: Record<FacetTermField, Record<string, number>>;
+  ranges: Record<
+    FacetNumericField,
+    { min: number | null; max: number | null; buckets: { from: number; to: number | null; count: number }[] }
+  >;
+}
+
+// Колонки характеристик и готовые фасеты: public/catalog/facets.json (catalog_facets.py)
+export interface CatalogFacets {
+  trailers: string[]; // id прицепов; остальные массивы ссылаются на позиции в нём
+  columns: Record<FacetNumericField, (number | null)[]>;
+  sorted: Record<FacetNumericField, number[]>; // позиции по возрастанию, без значения — в конце
+  terms: Record<FacetTermField, Record<string, number[]>>;
+  facets: { all: FacetCounts; byCategory: Record<string, FacetCounts> };
+}
+
+export interface SearchDoc {
+  type: 'trailer' | 'accessory';
+  id: string;
+  name: string;
+  image: string;
+}
+
+export interface SearchIndex {
+  docs: SearchDoc[];
+  terms: string[]; // отсортированы, для бинарного поиска и поиска по префиксу
+  postings: number[][]; // [разница позиций документов, вес, ...] для каждого термина
+  rules: {
+    ruEndings: string[];
+    latinEndings: string[];
+    minStem: number;
+    stemExceptions: Record<string, string>; // формы с беглой гласной: «лодок» → «лодк»
+    stopwords: string[];
+  };
+}
+
 export interface Vehicle {
   onr_article?: string; // Артикул ОНР (внутренний, сквозной)
   brand: string;
@@ -1,30 +1,36 @@
+import argparse
+import hashlib
 import json
 import os
-import shutil
-import re
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scraper"))
+
+import catalog_changeset
+import catalog_facets
+import catalog_search
+import catalog_shards
+import catalog_stream
+import fit_index
+import image_build
+from image_sync import SYNC_MODES, ImageSync
+from product_store import DEFAULT_STORE_PATH, ProductStore
+from textnorm import parse_dimensions
 
 OUTPUT_DIR = "output"
 FRONTEND_PUBLIC_IMG_DIR = "frontend/public/images/trailers"
 FRONTEND_PUBLIC_OPT_IMG_DIR = "frontend/public/images/options"
 FRONTEND_TRAILERS_FILE = "frontend/src/data/trailers.ts"
 FRONTEND_ACCESSORIES_FILE = "frontend/src/data/accessories.ts"
-
-# Ensure target image directories exist
-if os.path.exists(FRONTEND_PUBLIC_IMG_DIR):
-    shutil.rmtree(FRONTEND_PUBLIC_IMG_DIR)
-os.makedirs(FRONTEND_PUBLIC_IMG_DIR)
-
-if os.path.exists(FRONTEND_PUBLIC_OPT_IMG_DIR):
-    shutil.rmtree(FRONTEND_PUBLIC_OPT_IMG_DIR)
-os.makedirs(FRONTEND_PUBLIC_OPT_IMG_DIR)
-
-trailers = []
-accessories_map = {} # Map by SKU or Name to avoid duplicates
+LOAD_BATCH_SIZE = 16
 
 category_map = {
     "bortovoy": "general",
     "lodochniy": "water",
-    "furgon": "commercial"
+    "furgon": "commercial",
+    "kommercheskiy": "commercial"
 }
 
 def parse_axles(specs):
@@ -55,23 +61,10 @@ def determine_accessory_category(name):
         return "loading"
     return "safety"
 
-def parse_dimensions(dim_str):
-    if not dim_str:
-        return None
-    # Remove non-digits and 'x' (and 'х' cyrillic)
-    clean = re.sub(r"[^0-9xх]", "", dim_str.lower())
-    parts = re.split(r"[xх]", clean)
-    parts = [p for p in parts if p]
-    if len(parts) >= 2:
-        try:
-            return {
-                "length": int(parts[0]),
-                "width": int(parts[1]),
-                "height": int(parts[2]) if len(parts) > 2 else 0
-            }
-        except ValueError:
-            return None
-    return None
+def content_id(text):
+    # Stable across runs and machines, unlike hash(); whitespace/case changes keep the id
+    normalized = " ".join(text.split()).casefold()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:12]
 
 def infer_compatibility(category, title):
     comps = []
@@ -87,155 +80,392 @@ def infer_compatibility(category, title):
         comps.append("atv")
         comps.append("motorcycle")
         
-    return list(set(comps))
+    return sorted(set(comps))
 
-print("Starting catalog generation...")
+# Inlined into trailers.ts / accessories.ts: intrinsic sizes prevent layout shift.
+# srcset and LQIP stay in the variants manifest, fetched when an image is shown.
+INLINE_IMAGE_FIELDS = ("width", "height", "thumbnail")
 
-for category in os.listdir(OUTPUT_DIR):
-    cat_path = os.path.join(OUTPUT_DIR, category)
-    if not os.path.isdir(cat_path):
-        continue
-    
-    mapped_cat = category_map.get(category, "general")
-    print(f"Processing category: {category} -> {mapped_cat}")
+def inline_image_meta(meta):
+    return {field: meta[field] for field in INLINE_IMAGE_FIELDS}
 
-    for product_slug in os.listdir(cat_path):
-        prod_path = os.path.join(cat_path, product_slug)
-        json_file = os.path.join(prod_path, f"{product_slug}.json")
-        
-        if not os.path.exists(json_file):
+def attach_image_meta(record, image_meta):
+    if "images" in record:
+        # Parallel to record["images"]; None where no variants were built
+        metas = [inline_image_meta(image_meta[src]) if src in image_meta else None for src in record["images"]]
+        if any(metas):
+            record["imageMeta"] = metas
+    else:
+        meta = image_meta.get(record["image"])
+        if meta:
+            record["imageMeta"] = inline_image_meta(meta)
+
+def discover_stored_products(store_path, output_dir=OUTPUT_DIR):
+    # Same jobs as the tree walk, but the product record comes from the SQLite store
+    with ProductStore(store_path) as store:
+        for category in store.categories():
+            mapped_cat = category_map.get(category, "general")
+            print(f"Processing category: {category} -> {mapped_cat}")
+            for data in store.products(category):
+                yield mapped_cat, data["slug"], os.path.join(output_dir, category, data["slug"]), data
+
+def discover_products(output_dir=OUTPUT_DIR):
+    for category in sorted(os.listdir(output_dir)):
+        cat_path = os.path.join(output_dir, category)
+        if category.startswith(".") or not os.path.isdir(cat_path):
             continue
-            
-        with open(json_file, "r", encoding="utf-8") as f:
+
+        mapped_cat = category_map.get(category, "general")
+        print(f"Processing category: {category} -> {mapped_cat}")
+
+        for product_slug in sorted(os.listdir(cat_path)):
+            prod_path = os.path.join(cat_path, product_slug)
+            json_file = os.path.join(prod_path, f"{product_slug}.json")
+            if os.path.exists(json_file):
+                yield mapped_cat, product_slug, prod_path, json_file
+
+def transform_product(job):
+    """Build the trailer record and its option records from one product file.
+
+    Runs in a worker process; image copies are only planned here and
+    carried out by the parent, which owns the image sync state.
+    """
+    mapped_cat, product_slug, prod_path, source = job
+    if isinstance(source, dict):
+        data = source
+    else:
+        with open(source, "r", encoding="utf-8") as f:
             data = json.load(f)
-            
-        # --- Process Trailer Images ---
-        image_path = ""
-        all_images = []
-        if data.get("images"):
-            target_prod_img_dir = os.path.join(FRONTEND_PUBLIC_IMG_DIR, product_slug)
-            os.makedirs(target_prod_img_dir, exist_ok=True)
-            
-            for i, img_rel_path in enumerate(data["images"]):
-                src_img = os.path.join(prod_path, img_rel_path)
-                if os.path.exists(src_img):
-                    filename = os.path.basename(src_img)
-                    dst_img = os.path.join(target_prod_img_dir, filename)
-                    shutil.copy2(src_img, dst_img)
-                    
-                    final_path = f"/images/trailers/{product_slug}/{filename}"
-                    all_images.append(final_path)
-                    
-                    if i == 0:
-                        image_path = final_path
-
-        specs = data.get("specs", {})
-        
-        # --- Calculate Derived Fields ---
-        dims = parse_dimensions(specs.get("razmery_kuzova", ""))
-        compatibility = infer_compatibility(mapped_cat, data.get("title", ""))
-        capacity = specs.get("gruzopodemnost", 0)
-
-        # --- Process Trailer ---
-        trailer_id = data["slug"]
-        trailer = {
-            "id": trailer_id,
-            "model": f"{data.get('model', '')}.{data.get('version', '')}",
-            "name": data.get("title", ""),
-            "category": mapped_cat,
-            "price": data.get("price", 0),
-            "capacity": capacity,
+
+    # --- Process Trailer Images ---
+    image_path = ""
+    all_images = []
+    images = []
+    if data.get("images"):
+        target_prod_img_dir = os.path.join(FRONTEND_PUBLIC_IMG_DIR, product_slug)
+
+        for i, img_rel_path in enumerate(data["images"]):
+            src_img = os.path.join(prod_path, img_rel_path)
+            if os.path.exists(src_img):
+                filename = os.path.basename(src_img)
+                final_path = f"/images/trailers/{product_slug}/{filename}"
+                all_images.append(final_path)
+                images.append((src_img, os.path.join(target_prod_img_dir, filename), final_path, f"trailers/{product_slug}"))
+
+                if i == 0:
+                    image_path = final_path
+
+    specs = data.get("specs", {})
+
+    # --- Calculate Derived Fields ---
+    dims = parse_dimensions(specs.get("razmery_kuzova", ""))
+    compatibility = infer_compatibility(mapped_cat, data.get("title", ""))
+    capacity = specs.get("gruzopodemnost", 0)
+
+    # --- Process Trailer ---
+    trailer_id = data["slug"]
+    trailer = {
+        "id": trailer_id,
+        "model": f"{data.get('model', '')}.{data.get('version', '')}",
+        "name": data.get("title", ""),
+        "category": mapped_cat,
+        "price": data.get("price", 0),
+        "capacity": capacity,
+        "dimensions": specs.get("razmery_kuzova", ""),
+        "boardHeight": specs.get("razmery_kuzova_height", 0),
+        "gabarity": specs.get("gabaritnye_razmery", ""),
+        "features": get_features(data.get("description", "")),
+        "availability": "in_stock",
+        "image": image_path,
+        "images": all_images,
+        "description": data.get("description", ""),
+        "specs": {
             "dimensions": specs.get("razmery_kuzova", ""),
-            "boardHeight": specs.get("razmery_kuzova_height", 0),
-            "gabarity": specs.get("gabaritnye_razmery", ""),
-            "features": get_features(data.get("description", "")),
-            "availability": "in_stock",
-            "image": image_path,
-            "images": all_images,
-            "description": data.get("description", ""),
-            "specs": {
-                "dimensions": specs.get("razmery_kuzova", ""),
-                "capacity": f"{capacity} кг",
-                "weight": f"{specs.get('snaryazhyonnaya_massa', 0)} кг",
-                "axles": parse_axles(specs),
-                "boardHeight": specs.get("razmery_kuzova_height", 0)
-            },
-            "suspension": specs.get("podveska", "Рессорная"),
-            "brakes": specs.get("tormoz", "Нет"),
-            "compatibility": compatibility,
-            "maxVehicleWeight": capacity
+            "capacity": f"{capacity} кг",
+            "weight": f"{specs.get('snaryazhyonnaya_massa', 0)} кг",
+            "axles": parse_axles(specs),
+            "boardHeight": specs.get("razmery_kuzova_height", 0)
+        },
+        "suspension": specs.get("podveska", "Рессорная"),
+        "brakes": specs.get("tormoz", "Нет"),
+        "compatibility": compatibility,
+        "maxVehicleWeight": capacity
+    }
+
+    if dims:
+         trailer["maxVehicleLength"] = dims["length"]
+         trailer["maxVehicleWidth"] = dims["width"]
+
+    if mapped_cat == "water":
+         for key in ["dlina_sudna_mm", "maksimalnaya_dlina_sudna", "dlina_sudna"]:
+             if key in specs:
+                 trailer["bodyDimensions"] = f"{specs[key]} мм судно"
+                 break
+
+    # --- Process Accessories ---
+    options = []
+    for opt in data.get("options", []):
+        sku = opt.get("sku")
+        name = opt.get("name")
+        if not name:
+            continue
+
+        # Use SKU as ID if available, else a content hash of the name
+        acc_id = sku if sku else content_id(name)
+
+        # Handle Option Image
+        opt_image = None
+        opt_image_path = ""
+        if opt.get("image"):
+            src_opt_img = os.path.join(prod_path, opt["image"])
+            if os.path.exists(src_opt_img):
+                filename = os.path.basename(src_opt_img)
+                opt_image_path = f"/images/options/{filename}"
+                opt_image = (src_opt_img, os.path.join(FRONTEND_PUBLIC_OPT_IMG_DIR, filename), opt_image_path)
+
+        accessory = {
+            "id": acc_id,
+            "name": name,
+            "price": opt.get("price", 0),
+            "category": determine_accessory_category(name),
+            "required": False,
+            "image": opt_image_path,
+            "description": opt.get("description", ""),
+            "compatibleWith": [trailer_id]
         }
+        options.append((accessory, opt_image))
 
-        if dims:
-             trailer["maxVehicleLength"] = dims["length"]
-             trailer["maxVehicleWidth"] = dims["width"]
-        
-        if mapped_cat == "water":
-             for key in ["dlina_sudna_mm", "maksimalnaya_dlina_sudna", "dlina_sudna"]:
-                 if key in specs:
-                     trailer["bodyDimensions"] = f"{specs[key]} мм судно"
-                     break
-
-        trailers.append(trailer)
-
-        # --- Process Accessories ---
-        for opt in data.get("options", []):
-            sku = opt.get("sku")
-            name = opt.get("name")
-            if not name:
-                continue
-                
-            # Use SKU as ID if available, else hash name
-            acc_id = sku if sku else str(abs(hash(name)))
-            
-            if acc_id not in accessories_map:
-                # Handle Option Image
-                opt_image_path = ""
-                if opt.get("image"):
-                    src_opt_img = os.path.join(prod_path, opt["image"])
-                    if os.path.exists(src_opt_img):
-                        filename = os.path.basename(src_opt_img)
-                        dst_opt_img = os.path.join(FRONTEND_PUBLIC_OPT_IMG_DIR, filename)
-                        shutil.copy2(src_opt_img, dst_opt_img)
-                        opt_image_path = f"/images/options/{filename}"
-
-                accessories_map[acc_id] = {
-                    "id": acc_id,
-                    "name": name,
-                    "price": opt.get("price", 0),
-                    "category": determine_accessory_category(name),
-                    "required": False,
-                    "image": opt_image_path,
-                    "description": opt.get("description", ""),
-                    "compatibleWith": [trailer_id]
-                }
-            else:
-                # Add compatibility
-                if trailer_id not in accessories_map[acc_id]["compatibleWith"]:
-                    accessories_map[acc_id]["compatibleWith"].append(trailer_id)
-
-print(f"Found {len(trailers)} trailers and {len(accessories_map)} accessories.")
-
-# --- Write Trailers File ---
-trailers_ts = """import { Trailer } from '../types';
-
-export const allTrailers: Trailer[] = %s;
-""" % json.dumps(trailers, ensure_ascii=False, indent=2)
-
-# Clean up JSON to look more like TS (optional, but removing quotes from keys is hard with regex safely)
-# We will just stick to valid JSON which is valid TS.
-
-with open(FRONTEND_TRAILERS_FILE, "w", encoding="utf-8") as f:
-    f.write(trailers_ts)
-
-# --- Write Accessories File ---
-accessories_list = list(accessories_map.values())
-accessories_ts = """import { Accessory } from '../types';
-
-export const accessories: Accessory[] = %s;
-""" % json.dumps(accessories_list, ensure_ascii=False, indent=2)
-
-with open(FRONTEND_ACCESSORIES_FILE, "w", encoding="utf-8") as f:
-    f.write(accessories_ts)
-
-print("Catalog generation complete.")
+    return trailer, images, options
+
+def transform_batch(jobs):
+    return [transform_product(job) for job in jobs]
+
+def load_products(workers, store_path=None):
+    # Products are loaded in batches on a process pool; results keep discovery order
+    # and at most a few batches are in flight, so memory does not grow with the catalog.
+    jobs = discover_stored_products(store_path) if store_path else discover_products()
+    batches = catalog_stream.batched(jobs, LOAD_BATCH_SIZE)
+    if workers == 1:
+        for batch in batches:
+            yield from transform_batch(batch)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for results in catalog_stream.bounded_map(executor, transform_batch, batches, workers * 2):
+            yield from results
+
+def spooled_trailers(spool):
+    # Each spool line is [trailer, names of its options]
+    spool.seek(0)
+    for line in spool:
+        yield json.loads(line)
+
+def generate_catalog(
+    build_images=True,
+    jobs=None,
+    image_sync="copy",
+    output_mode="ts",
+    shard_by="category",
+    shard_budget_kb=catalog_shards.DEFAULT_SHARD_BUDGET_KB,
+    index_budget_kb=catalog_shards.DEFAULT_INDEX_BUDGET_KB,
+    changeset_path=catalog_changeset.CHANGESET_FILE,
+    fit_index_path=fit_index.FIT_INDEX_FILE,
+    store_path=None,
+    facets_path=catalog_facets.FACETS_FILE,
+    search_index_path=catalog_search.SEARCH_INDEX_FILE,
+):
+    """Build every catalog output in one pass over the products.
+
+    Trailer records are spooled to a temporary file and streamed from it by
+    each output stage, so they are never all in memory at once. What is held
+    in memory for the whole build: the deduplicated accessories, one task and
+    one metadata entry per distinct image, and the fit, facet and search
+    indexes, each of which is written as a single document of that size.
+    """
+    print("Starting catalog generation...")
+    timer = catalog_stream.StageTimer()
+    workers = jobs or os.cpu_count() or 1
+    sync = ImageSync([FRONTEND_PUBLIC_IMG_DIR, FRONTEND_PUBLIC_OPT_IMG_DIR], image_sync)
+
+    trailer_count = 0
+    accessories_map = {} # Map by SKU or Name to avoid duplicates
+    image_tasks = []
+
+    # Transformed trailers are spooled to disk until image metadata is known
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as spool:
+        for trailer, images, options in timer.timed("load", load_products(workers, store_path)):
+            option_names = []
+            with timer.stage("image sync"):
+                for src_img, dst_img, final_path, rel_dir in images:
+                    sync.place(src_img, dst_img)
+                    image_tasks.append((dst_img, final_path, rel_dir))
+
+                for accessory, opt_image in options:
+                    existing = accessories_map.get(accessory["id"])
+                    if existing is None:
+                        if opt_image:
+                            src_opt_img, dst_opt_img, opt_image_path = opt_image
+                            sync.place(src_opt_img, dst_opt_img)
+                            image_tasks.append((dst_opt_img, opt_image_path, "options"))
+                        accessories_map[accessory["id"]] = accessory
+                        existing = accessory
+                    elif trailer["id"] not in existing["compatibleWith"]:
+                        # Add compatibility
+                        existing["compatibleWith"].append(trailer["id"])
+                    option_names.append(existing["name"])
+
+            spool.write(json.dumps([trailer, option_names], ensure_ascii=False))
+            spool.write("\n")
+            trailer_count += 1
+
+        print(f"Found {trailer_count} trailers and {len(accessories_map)} accessories.")
+        with timer.stage("image sync"):
+            sync.finish()
+        sync.report()
+
+        image_meta = {}
+        if build_images:
+            with timer.stage("image build"):
+                image_meta = image_build.build_images(image_tasks, jobs)
+
+        # Emit records in a fixed order so unchanged input gives byte-identical files
+        accessories_list = sorted(accessories_map.values(), key=lambda accessory: accessory["id"])
+        for accessory in accessories_list:
+            accessory["compatibleWith"].sort()
+            attach_image_meta(accessory, image_meta)
+
+        with timer.stage("write"):
+            shards = catalog_shards.ShardWriter(shard_by) if output_mode in ("shards", "both") else None
+            changeset = catalog_changeset.ChangesetBuilder(changeset_path) if changeset_path else None
+            trailers_ts = accessories_ts = None
+            if output_mode in ("ts", "both"):
+                trailers_ts = catalog_stream.JsonArrayWriter(
+                    FRONTEND_TRAILERS_FILE,
+                    header="import { Trailer } from '../types';\n\nexport const allTrailers: Trailer[] = ",
+                    footer=";\n",
+                )
+                accessories_ts = catalog_stream.JsonArrayWriter(
+                    FRONTEND_ACCESSORIES_FILE,
+                    header="import { Accessory } from '../types';\n\nexport const accessories: Accessory[] = ",
+                    footer=";\n",
+                )
+
+            search_index = catalog_search.SearchIndexBuilder() if search_index_path else None
+            for trailer, option_names in spooled_trailers(spool):
+                attach_image_meta(trailer, image_meta)
+                if trailers_ts:
+                    trailers_ts.write(trailer)
+                if shards:
+                    shards.add_trailer(trailer)
+                if changeset:
+                    changeset.add("trailers", trailer)
+                if search_index:
+                    search_index.add_trailer(trailer, option_names)
+
+            for accessory in accessories_list:
+                if accessories_ts:
+                    accessories_ts.write(accessory)
+                if shards:
+                    shards.add_accessory(accessory)
+                if changeset:
+                    changeset.add("accessories", accessory)
+                if search_index:
+                    search_index.add_accessory(accessory)
+
+            errors = shards.finish(shard_budget_kb, index_budget_kb) if shards else []
+            if errors:
+                for writer in (trailers_ts, accessories_ts, changeset):
+                    if writer:
+                        writer.discard()
+                print("Catalog shard budget exceeded:")
+                for line in errors:
+                    print(f"  {line}")
+                sys.exit(1)
+
+            for writer in (trailers_ts, accessories_ts):
+                if writer:
+                    writer.commit(only_if_changed=True)
+            if changeset:
+                changeset.finish()
+
+        if fit_index_path:
+            with timer.stage("fit index"):
+                fit_rows = (
+                    {key: trailer.get(key) for key in fit_index.FIT_FIELDS} for trailer, _ in spooled_trailers(spool)
+                )
+                fit_index.write_fit_index(fit_rows, path=fit_index_path)
+
+        if search_index:
+            with timer.stage("search index"):
+                search_index.write(search_index_path)
+
+        if facets_path:
+            with timer.stage("facets"):
+                facet_rows = (catalog_facets.facet_row(trailer) for trailer, _ in spooled_trailers(spool))
+                catalog_facets.write_facets(facet_rows, facets_path)
+
+    timer.report()
+    print("Catalog generation complete.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Build frontend catalog data from scraper output")
+    parser.add_argument("--skip-image-build", action="store_true", help="do not build responsive image variants")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes for loading products and building images (default: CPU count)")
+    parser.add_argument(
+        "--image-sync",
+        choices=SYNC_MODES,
+        default="copy",
+        help="how new or changed images reach frontend/public (link = hardlink from output/)",
+    )
+    parser.add_argument(
+        "--output",
+        choices=("ts", "shards", "both"),
+        default="ts",
+        help=f"ts = trailers.ts/accessories.ts, shards = index + JSON shards in {catalog_shards.CATALOG_DIR}",
+    )
+    parser.add_argument("--shard-by", choices=catalog_shards.SHARD_MODES, default="category")
+    parser.add_argument(
+        "--shard-budget",
+        type=int,
+        default=catalog_shards.DEFAULT_SHARD_BUDGET_KB,
+        help="max size of one shard, KB (the build fails above it)",
+    )
+    parser.add_argument(
+        "--index-budget",
+        type=int,
+        default=catalog_shards.DEFAULT_INDEX_BUDGET_KB,
+        help="max size of index.json, KB",
+    )
+    parser.add_argument(
+        "--changeset",
+        default=catalog_changeset.CHANGESET_FILE,
+        help="where to write added/removed/changed records vs the previous build",
+    )
+    parser.add_argument("--no-changeset", action="store_true", help="do not diff against the previous build")
+    parser.add_argument("--no-fit-index", action="store_true", help=f"do not write {fit_index.FIT_INDEX_FILE}")
+    parser.add_argument("--no-search-index", action="store_true", help=f"do not write {catalog_search.SEARCH_INDEX_FILE}")
+    parser.add_argument("--no-facets", action="store_true", help=f"do not write {catalog_facets.FACETS_FILE}")
+    parser.add_argument(
+        "--from-store",
+        nargs="?",
+        const=DEFAULT_STORE_PATH,
+        metavar="PATH",
+        help="read products from the SQLite product store instead of walking output/",
+    )
+    args = parser.parse_args()
+    generate_catalog(
+        build_images=not args.skip_image_build,
+        jobs=args.jobs,
+        image_sync=args.image_sync,
+        output_mode=args.output,
+        shard_by=args.shard_by,
+        shard_budget_kb=args.shard_budget,
+        index_budget_kb=args.index_budget,
+        changeset_path=None if args.no_changeset else args.changeset,
+        fit_index_path=None if args.no_fit_index else fit_index.FIT_INDEX_FILE,
+        store_path=args.from_store,
+        facets_path=None if args.no_facets else catalog_facets.FACETS_FILE,
+        search_index_path=None if args.no_search_index else catalog_search.SEARCH_INDEX_FILE,
+    )
+
+if __name__ == "__main__":
+    main()
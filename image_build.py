@@ -0,0 +1,193 @@
+import base64
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from PIL import Image, features
+except ImportError:  # Pillow is optional; the catalog still builds without variants.
+    Image = None
+    features = None
+
+VARIANTS_DIR = "frontend/public/images/variants"
+VARIANTS_URL = "/images/variants"
+MANIFEST_FILE = os.path.join(VARIANTS_DIR, "manifest.json")
+
+WIDTHS = (480, 960, 1600)
+THUMBNAIL_WIDTH = 320
+LQIP_WIDTH = 24
+FORMATS = {
+    "avif": {"mime": "image/avif", "params": {"quality": 50}},
+    "webp": {"mime": "image/webp", "params": {"quality": 78, "method": 4}},
+}
+
+# (source file, public URL of the original, variant folder relative to VARIANTS_DIR)
+ImageTask = Tuple[str, str, str]
+
+
+def is_available() -> bool:
+    return Image is not None
+
+
+def supported_formats() -> List[str]:
+    if features is None:
+        return []
+    return [fmt for fmt in FORMATS if features.check(fmt)]
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handler:
+        for chunk in iter(lambda: handler.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _resize(image, width: int):
+    if image.width <= width:
+        return image
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def _variant_name(src_path: str, suffix: str) -> str:
+    # The full source name, extension included: a.jpg and a.png in one folder
+    # must not write the same a-480.webp
+    return f"{os.path.basename(src_path)}-{suffix}"
+
+
+def _thumbnail_url(task: ImageTask) -> str:
+    src_path, _, rel_dir = task
+    return f"{VARIANTS_URL}/{rel_dir}/{_variant_name(src_path, 'thumb.webp')}"
+
+
+def build_variants(task: ImageTask, formats: List[str]) -> Optional[Dict[str, object]]:
+    src_path, public_src, rel_dir = task
+    out_dir = os.path.join(VARIANTS_DIR, rel_dir)
+    os.makedirs(out_dir, exist_ok=True)
+
+    try:
+        with Image.open(src_path) as opened:
+            opened.load()
+            image = opened.convert("RGBA" if opened.mode in ("RGBA", "LA", "P") else "RGB")
+    except OSError as exc:
+        print(f"Skipping unreadable image {src_path}: {exc}")
+        return None
+    width, height = image.size
+
+    widths = sorted({min(w, width) for w in WIDTHS})
+    sources = []
+    for fmt in formats:
+        entries = []
+        for target in widths:
+            filename = _variant_name(src_path, f"{target}.{fmt}")
+            _resize(image, target).save(os.path.join(out_dir, filename), fmt.upper(), **FORMATS[fmt]["params"])
+            entries.append(f"{VARIANTS_URL}/{rel_dir}/{filename} {target}w")
+        sources.append({"type": FORMATS[fmt]["mime"], "srcset": ", ".join(entries)})
+
+    thumb_name = _variant_name(src_path, "thumb.webp")
+    _resize(image, THUMBNAIL_WIDTH).save(os.path.join(out_dir, thumb_name), "WEBP", **FORMATS["webp"]["params"])
+
+    buffer = io.BytesIO()
+    _resize(image, LQIP_WIDTH).save(buffer, "WEBP", quality=30)
+    lqip = "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+    return {
+        "src": public_src,
+        "width": width,
+        "height": height,
+        "thumbnail": _thumbnail_url(task),
+        "lqip": lqip,
+        "sources": sources,
+    }
+
+
+def _variant_paths(meta: Dict[str, object]) -> List[str]:
+    urls = [str(meta["thumbnail"])]
+    for source in meta.get("sources", []):
+        urls.extend(entry.rsplit(" ", 1)[0] for entry in source["srcset"].split(", "))
+    return [os.path.normpath(os.path.join(VARIANTS_DIR, url[len(VARIANTS_URL) + 1:])) for url in urls]
+
+
+def _variants_exist(meta: Dict[str, object]) -> bool:
+    return all(os.path.exists(path) for path in _variant_paths(meta))
+
+
+def remove_orphans(manifest: Dict[str, Dict[str, object]]) -> int:
+    """Delete variant files no manifest entry points at; returns how many went."""
+    wanted = {os.path.normpath(MANIFEST_FILE)}
+    for entry in manifest.values():
+        wanted.update(_variant_paths(entry["meta"]))
+    removed = 0
+    for dirpath, _, filenames in os.walk(VARIANTS_DIR, topdown=False):
+        for filename in filenames:
+            path = os.path.normpath(os.path.join(dirpath, filename))
+            if path not in wanted:
+                os.remove(path)
+                removed += 1
+        if dirpath != VARIANTS_DIR and not os.listdir(dirpath):
+            os.rmdir(dirpath)
+    return removed
+
+
+def _load_manifest() -> Dict[str, Dict[str, object]]:
+    if not os.path.exists(MANIFEST_FILE):
+        return {}
+    with open(MANIFEST_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_images(tasks: List[ImageTask], jobs: Optional[int] = None) -> Dict[str, Dict[str, object]]:
+    """Build responsive variants for every task and return metadata by public URL.
+
+    Images whose source hash matches the previous build (and whose variant
+    files are still on disk) are not re-encoded. Variants of images that are
+    no longer referenced are deleted along with their manifest entries.
+    """
+    if not is_available():
+        print("Pillow is not installed, skipping responsive image build.")
+        return {}
+
+    formats = supported_formats()
+    previous = _load_manifest()
+    manifest: Dict[str, Dict[str, object]] = {}
+    results: Dict[str, Dict[str, object]] = {}
+    pending: List[Tuple[ImageTask, str]] = []
+
+    for task in tasks:
+        src_path, public_src, _ = task
+        digest = file_sha256(src_path)
+        cached = previous.get(public_src)
+        if (
+            cached
+            and cached.get("sha256") == digest
+            and cached.get("formats") == formats
+            # Entries from before variant names carried the extension are rebuilt
+            and cached["meta"].get("thumbnail") == _thumbnail_url(task)
+            and _variants_exist(cached["meta"])
+        ):
+            results[public_src] = cached["meta"]
+            manifest[public_src] = cached
+        else:
+            pending.append((task, digest))
+
+    print(f"Image build: {len(pending)} to encode, {len(results)} unchanged ({', '.join(formats)})")
+    if pending:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            built = executor.map(build_variants, [task for task, _ in pending], [formats] * len(pending))
+            for (task, digest), meta in zip(pending, built):
+                if meta is None:
+                    continue
+                results[task[1]] = meta
+                manifest[task[1]] = {"sha256": digest, "formats": formats, "meta": meta}
+
+    os.makedirs(VARIANTS_DIR, exist_ok=True)
+    with open(MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    removed = remove_orphans(manifest)
+    if removed:
+        print(f"Image build: {removed} orphaned variant files removed")
+    return results
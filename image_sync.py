@@ -0,0 +1,136 @@
+import json
+import os
+import shutil
+from typing import Dict, Iterable, Set
+
+from image_build import file_sha256
+
+SYNC_MODES = ("copy", "link")
+# Files placed by the last run; only these are candidates for removal
+DEFAULT_MANIFEST = os.path.join(".cache", "image_sync.json")
+
+
+class ImageSync:
+    """Mirror catalog images into the frontend without rewriting unchanged files.
+
+    ``place()`` copies (or hardlinks) a source image only when the destination
+    is missing or differs; ``finish()`` deletes files placed by an earlier run
+    that no product referenced this run. The roots are shared with other
+    writers (``scripts/transform_scraper_to_db.cjs`` copies its images there
+    too), so a file ImageSync never recorded in its manifest is left alone.
+    Untouched files keep their mtime and inode, so Vite and Docker layer
+    caches stay valid across rebuilds.
+    """
+
+    def __init__(self, roots: Iterable[str], mode: str = "copy", manifest_path: str = DEFAULT_MANIFEST):
+        if mode not in SYNC_MODES:
+            raise ValueError(f"Unknown image sync mode: {mode}")
+        self.roots = list(roots)
+        self.mode = mode
+        self.manifest_path = manifest_path
+        self.wanted: Set[str] = set()
+        self.stats: Dict[str, int] = {
+            "copied": 0,
+            "copied_bytes": 0,
+            "unchanged": 0,
+            "saved_bytes": 0,
+            "removed": 0,
+            "removed_bytes": 0,
+        }
+        for root in self.roots:
+            os.makedirs(root, exist_ok=True)
+
+    def _is_current(self, src: str, dst: str) -> bool:
+        try:
+            dst_stat = os.stat(dst)
+        except FileNotFoundError:
+            return False
+        src_stat = os.stat(src)
+        if (src_stat.st_dev, src_stat.st_ino) == (dst_stat.st_dev, dst_stat.st_ino):
+            return True
+        if src_stat.st_size != dst_stat.st_size:
+            return False
+        if int(src_stat.st_mtime) == int(dst_stat.st_mtime):
+            return True
+        # Same size, different mtime (e.g. a fresh checkout): settle it by content
+        # and align the mtime so the next run takes the cheap path.
+        if file_sha256(src) != file_sha256(dst):
+            return False
+        os.utime(dst, ns=(dst_stat.st_atime_ns, src_stat.st_mtime_ns))
+        return True
+
+    def _write(self, src: str, dst: str) -> None:
+        tmp_path = f"{dst}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        if self.mode == "link":
+            try:
+                os.link(src, tmp_path)
+            except OSError:
+                shutil.copy2(src, tmp_path)
+        else:
+            shutil.copy2(src, tmp_path)
+        os.replace(tmp_path, dst)
+
+    def place(self, src: str, dst: str) -> None:
+        dst = os.path.normpath(dst)
+        self.wanted.add(dst)
+        size = os.path.getsize(src)
+        if self._is_current(src, dst):
+            self.stats["unchanged"] += 1
+            self.stats["saved_bytes"] += size
+            return
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        self._write(src, dst)
+        self.stats["copied"] += 1
+        self.stats["copied_bytes"] += size
+
+    def _load_manifest(self) -> Set[str]:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as handler:
+                return set(json.load(handler).get("files", []))
+        except (OSError, ValueError):
+            return set()
+
+    def _save_manifest(self) -> None:
+        folder = os.path.dirname(self.manifest_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handler:
+            json.dump({"files": sorted(self.wanted)}, handler, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _remove_empty_parents(self, path: str) -> None:
+        roots = {os.path.normpath(root) for root in self.roots}
+        folder = os.path.dirname(path)
+        while folder and folder not in roots and os.path.isdir(folder) and not os.listdir(folder):
+            os.rmdir(folder)
+            folder = os.path.dirname(folder)
+
+    def _is_managed(self, path: str) -> bool:
+        return any(os.path.commonpath([os.path.normpath(root), path]) == os.path.normpath(root) for root in self.roots)
+
+    def finish(self) -> Dict[str, int]:
+        for path in sorted(self._load_manifest() - self.wanted):
+            if not self._is_managed(path):
+                continue
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            self.stats["removed"] += 1
+            self.stats["removed_bytes"] += size
+            self._remove_empty_parents(path)
+        self._save_manifest()
+        return self.stats
+
+    def report(self) -> None:
+        mb = 1024 * 1024
+        stats = self.stats
+        print(
+            f"Image sync ({self.mode}): {stats['copied']} written ({stats['copied_bytes'] / mb:.1f} MB), "
+            f"{stats['unchanged']} unchanged ({stats['saved_bytes'] / mb:.1f} MB not rewritten), "
+            f"{stats['removed']} orphans removed ({stats['removed_bytes'] / mb:.1f} MB)"
+        )
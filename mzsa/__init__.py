@@ -0,0 +1,2 @@
+# Entry point for the catalog pipeline: python -m mzsa <command> [args]
+# Subsystems are imported by the command that needs them, not here.
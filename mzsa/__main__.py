@@ -0,0 +1,7 @@
+import sys
+
+from mzsa.cli import main
+
+# Guarded because process pools started with spawn/forkserver re-import __main__
+if __name__ == "__main__":
+    sys.exit(main())
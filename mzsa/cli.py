@@ -0,0 +1,96 @@
+import argparse
+import importlib
+import os
+import sys
+import time
+from typing import List, NamedTuple, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRAPER_DIR = os.path.join(REPO_ROOT, "scraper")
+# Separates stages run in one process: python -m mzsa scrape --workers 4 + catalog
+STAGE_SEPARATOR = "+"
+
+
+class Command(NamedTuple):
+    module: str
+    summary: str
+
+
+# Modules are imported only when their command runs, so `--help` and cheap
+# commands never pay for requests / bs4 / Pillow.
+COMMANDS = {
+    "scrape": Command("scraper", "scrape mzsa.ru trailers into output/"),
+    "reparse": Command("reparse", "re-run product parsing over the archived pages, offline"),
+    "vehicles": Command("vehicle_harvest", "harvest vehicle dimensions from manufacturer sites into scraper/vehicles_harvest.json"),
+    "rm-vehicles": Command("scraper_rm", "scrape go-rm.ru vehicle dimensions into scraper/vehicles_rm.json"),
+    "catalog": Command("generate_catalog", "build frontend catalog data and images from output/"),
+    "validate": Command("validate_catalog", "validate output/ and backend/db.json against the schemas"),
+    "fit-index": Command("fit_index", "precompute which vehicles fit which trailers"),
+    "build": Command("mzsa.pipeline", "run the stages above in order, skipping those whose inputs are unchanged"),
+}
+
+
+def load_command(name: str):
+    for path in (REPO_ROOT, SCRAPER_DIR):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    return importlib.import_module(COMMANDS[name].module)
+
+
+def split_stages(argv: List[str]) -> List[List[str]]:
+    stages: List[List[str]] = [[]]
+    for arg in argv:
+        if arg == STAGE_SEPARATOR:
+            stages.append([])
+        else:
+            stages[-1].append(arg)
+    return stages
+
+
+def run_command(name: str, args: List[str]) -> int:
+    """Run a command's ``main()`` with ``args`` as its argv; returns the exit code."""
+    module = load_command(name)
+    saved_argv = sys.argv
+    sys.argv = [f"mzsa {name}", *args]
+    try:
+        module.main()
+    except SystemExit as exc:
+        if exc.code is None or isinstance(exc.code, int):
+            return exc.code or 0
+        print(exc.code, file=sys.stderr)
+        return 1
+    finally:
+        sys.argv = saved_argv
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    commands = "\n".join(f"  {name:<12} {command.summary}" for name, command in COMMANDS.items())
+    parser = argparse.ArgumentParser(
+        prog="python -m mzsa",
+        description="MZSA catalog pipeline. Run from the repository root.",
+        epilog=(
+            f"commands:\n{commands}\n\n"
+            f"Several commands separated by '{STAGE_SEPARATOR}' run in one process and share\n"
+            "the HTTP session and caches, e.g.: python -m mzsa scrape + catalog --jobs 4 + validate"
+        ),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("command", choices=COMMANDS, metavar="command")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="arguments for the command (see: <command> --help)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    stages = [parser.parse_args(stage) for stage in split_stages(sys.argv[1:] if argv is None else argv)]
+    for stage in stages:
+        if len(stages) > 1:
+            print(f"=== {stage.command} ===")
+        started = time.monotonic()
+        code = run_command(stage.command, stage.args)
+        if len(stages) > 1:
+            print(f"=== {stage.command} finished in {time.monotonic() - started:.1f}s (exit {code}) ===")
+        if code:
+            return code
+    return 0
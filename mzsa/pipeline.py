@@ -0,0 +1,301 @@
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATE_FILE = os.path.join(".cache", "pipeline.json")
+DEFAULT_TARGETS = ("validate",)
+
+
+class Stage(NamedTuple):
+    name: str
+    command: Tuple[str, ...]
+    inputs: Tuple[str, ...]  # files or directories (walked, dot-entries skipped)
+    outputs: Tuple[str, ...]  # must exist for the stage to count as built
+    deps: Tuple[str, ...] = ()
+    # Reads a remote site: its real input cannot be fingerprinted, so it only
+    # runs with --refresh (or when its outputs are missing).
+    remote: bool = False
+
+
+PYTHON = (sys.executable, "-m", "mzsa")
+CATALOG_CODE = (
+    "generate_catalog.py",
+    "catalog_changeset.py",
+    "catalog_facets.py",
+    "catalog_search.py",
+    "catalog_shards.py",
+    "catalog_stream.py",
+    "fit_index.py",
+    "image_build.py",
+    "image_sync.py",
+    "scraper/textnorm.py",
+)
+
+STAGES = {
+    stage.name: stage
+    for stage in (
+        Stage(
+            "scrape",
+            PYTHON + ("scrape", "--incremental"),
+            # CATEGORIES (the category URLs) live in scraper.py
+            (
+                "scraper/scraper.py",
+                "scraper/frontier.py",
+                "scraper/downloader.py",
+                "scraper/response_archive.py",
+                "scraper/product_blocks.py",
+                "scraper/fast_parse.py",
+                "scraper/textnorm.py",
+            ),
+            ("output",),
+            remote=True,
+        ),
+        Stage(
+            "vehicles",
+            PYTHON + ("vehicles",),
+            ("scraper/vehicle_harvest.py", "scraper/scraper_rm.py", "scraper/textnorm.py"),
+            ("scraper/vehicles_harvest.json", "scraper/vehicles_rm.json"),
+            remote=True,
+        ),
+        Stage(
+            "catalog",
+            PYTHON + ("catalog",),
+            CATALOG_CODE
+            + ("output", "frontend/src/data/vehiclesDatabase.json", "scraper/vehicles_harvest.json", "scraper/vehicles_rm.json"),
+            # .cache/image_sync.json lists the images this stage owns in
+            # frontend/public/images; it never touches files it did not place
+            ("frontend/src/data/trailers.ts", "frontend/src/data/accessories.ts", ".cache/image_sync.json"),
+            deps=("scrape", "vehicles"),
+        ),
+        # Copies its own NN-<name> images next to the catalog's; the two sets are
+        # disjoint, so it does not need to wait for the catalog stage.
+        Stage(
+            "transform",
+            ("node", "scripts/transform_scraper_to_db.cjs"),
+            ("scripts/transform_scraper_to_db.cjs", "output"),
+            ("backend/db.json",),
+            deps=("scrape",),
+        ),
+        Stage(
+            "validate",
+            PYTHON + ("validate", "--show", "5"),
+            (
+                "validate_catalog.py",
+                "scraper/schema_compiler.py",
+                "scraper/product_schema.json",
+                "scraper/options_schema.json",
+                "scraper/catalog_schema.json",
+                "output",
+                "backend/db.json",
+            ),
+            ("output/.validation_report.json",),
+            # After catalog too, so the default target still builds everything
+            deps=("catalog", "transform"),
+        ),
+        Stage(
+            "import",
+            ("node", "scripts/import_to_supabase.cjs"),
+            ("scripts/import_to_supabase.cjs", "backend/db.json"),
+            (),
+            deps=("validate",),
+            remote=True,
+        ),
+    )
+}
+
+
+def _walk(path: str) -> Iterable[str]:
+    if not os.path.isdir(path):
+        yield path
+        return
+    for root, dirs, files in os.walk(path):
+        dirs[:] = sorted(d for d in dirs if not d.startswith(".") and d != "__pycache__")
+        for name in sorted(files):
+            if not name.startswith("."):
+                yield os.path.join(root, name)
+
+
+def fingerprint_inputs(paths: Iterable[str]) -> str:
+    """Hash of every input file's path, size and mtime (no content reads, so a no-op check stays fast)."""
+    digest = hashlib.sha256()
+    for top in paths:
+        for path in _walk(top):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                digest.update(f"{path}\0missing\n".encode("utf-8"))
+                continue
+            digest.update(f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def plan(targets: Iterable[str], refresh: bool) -> List[str]:
+    """Stages needed for ``targets`` in dependency order; built remote deps only with ``refresh``."""
+    order: List[str] = []
+    seen: Set[str] = set()
+
+    def visit(name: str, requested: bool) -> None:
+        if name in seen:
+            return
+        seen.add(name)
+        stage = STAGES[name]
+        for dep in stage.deps:
+            visit(dep, False)
+        if requested or refresh or not stage.remote or not all(os.path.exists(path) for path in stage.outputs):
+            order.append(name)
+
+    for target in targets:
+        visit(target, True)
+    return order
+
+
+class Pipeline:
+    def __init__(self, stages: List[str], force: bool = False, jobs: int = 2, dry_run: bool = False) -> None:
+        self.stages = stages
+        self.force = force
+        self.jobs = max(1, jobs)
+        self.dry_run = dry_run
+        self.state: Dict[str, Dict[str, str]] = self._load_state()
+        self.keys: Dict[str, str] = {}
+        self._print_lock = threading.Lock()
+
+    @staticmethod
+    def _load_state() -> Dict[str, Dict[str, str]]:
+        try:
+            with open(STATE_FILE, "r", encoding="utf-8") as handler:
+                return json.load(handler)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self) -> None:
+        os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+        tmp_path = f"{STATE_FILE}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handler:
+            json.dump(self.state, handler, indent=2, sort_keys=True)
+        os.replace(tmp_path, STATE_FILE)
+
+    def stage_key(self, stage: Stage) -> str:
+        # A dependency that was rebuilt changes every stage downstream of it
+        parts = [fingerprint_inputs(stage.inputs), " ".join(stage.command)]
+        parts += [self.keys.get(dep) or self.state.get(dep, {}).get("key", "") for dep in stage.deps]
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def is_current(self, stage: Stage, key: str) -> bool:
+        if self.force or not all(os.path.exists(path) for path in stage.outputs):
+            return False
+        if stage.remote:
+            # Remote stages in the plan were asked for explicitly (or via --refresh)
+            return False
+        return self.state.get(stage.name, {}).get("key") == key
+
+    def _log(self, name: str, line: str) -> None:
+        with self._print_lock:
+            print(f"[{name}] {line}", flush=True)
+
+    def _run(self, stage: Stage) -> int:
+        self._log(stage.name, "$ " + " ".join(stage.command))
+        process = subprocess.Popen(
+            stage.command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            env={**os.environ, "PYTHONUNBUFFERED": "1"},
+        )
+        for line in process.stdout:
+            self._log(stage.name, line.rstrip("\n"))
+        return process.wait()
+
+    def run(self) -> int:
+        pending = list(self.stages)
+        running: Dict[Future, Stage] = {}
+        finished: Set[str] = set()
+        failed: Optional[str] = None
+        started = time.monotonic()
+
+        def ready(name: str) -> bool:
+            return all(dep in finished or dep not in self.stages for dep in STAGES[name].deps)
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            while (pending and failed is None) or running:
+                for name in [name for name in pending if ready(name)] if failed is None else []:
+                    pending.remove(name)
+                    stage = STAGES[name]
+                    key = self.stage_key(stage)
+                    self.keys[name] = key
+                    if self.is_current(stage, key):
+                        self._log(name, "up to date")
+                        finished.add(name)
+                        continue
+                    if self.dry_run:
+                        self._log(name, "would run: " + " ".join(stage.command))
+                        finished.add(name)
+                        continue
+                    running[executor.submit(self._stage_job, stage)] = stage
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    code, elapsed = future.result()
+                    if code:
+                        self._log(stage.name, f"failed with exit code {code} after {elapsed:.1f}s")
+                        failed = failed or stage.name
+                        continue
+                    # Re-key after the run: the stage may have rewritten its own inputs
+                    self.keys[stage.name] = self.stage_key(stage)
+                    self.state[stage.name] = {
+                        "key": self.keys[stage.name],
+                        "finished_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                    }
+                    if not self.dry_run:
+                        self._save_state()
+                    self._log(stage.name, f"done in {elapsed:.1f}s")
+                    finished.add(stage.name)
+
+        print(f"Pipeline {'failed at ' + failed if failed else 'finished'} in {time.monotonic() - started:.1f}s")
+        return 1 if failed else 0
+
+    def _stage_job(self, stage: Stage) -> Tuple[int, float]:
+        started = time.monotonic()
+        try:
+            code = self._run(stage)
+        except OSError as exc:
+            self._log(stage.name, f"Error starting {stage.command[0]}: {exc}")
+            code = 127
+        return code, time.monotonic() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the catalog pipeline, skipping stages whose inputs have not changed")
+    parser.add_argument(
+        "targets",
+        nargs="*",
+        metavar="stage",
+        help=f"stages to build with their dependencies (default: {' '.join(DEFAULT_TARGETS)}); one of: {', '.join(STAGES)}",
+    )
+    parser.add_argument("--refresh", action="store_true", help="also re-run remote stages (scrape, vehicles)")
+    parser.add_argument("--force", action="store_true", help="run every planned stage even if it is up to date")
+    parser.add_argument("--jobs", type=int, default=2, help="stages run in parallel when independent")
+    parser.add_argument("--dry-run", action="store_true", help="show what would run")
+    args = parser.parse_args()
+    unknown = [name for name in args.targets if name not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage: {', '.join(unknown)}")
+
+    os.chdir(REPO_ROOT)
+    stages = plan(args.targets or DEFAULT_TARGETS, args.refresh)
+    sys.exit(Pipeline(stages, args.force, args.jobs, args.dry_run).run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+import argparse
+import gc
+import json
+import os
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import requests  # noqa: E402
+from bs4 import BeautifulSoup  # noqa: E402
+
+import fast_parse  # noqa: E402
+import product_blocks  # noqa: E402
+import scraper  # noqa: E402
+import scraper_rm  # noqa: E402
+
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+# Throughput depends on the machine, so the baseline stays local (.cache/ is not in git)
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.dirname(BENCH_DIR)), ".cache", "bench", "baseline.json")
+DEFAULT_THRESHOLD = 0.25
+# A fixed html.parser + regex workload timed in rounds alternating with every case; throughput is
+# compared as a multiple of it, which cancels out CPU speed and load drift
+REFERENCE_HTML = "<table>" + "".join(
+    f"<tr><td>Длина кузова, мм</td><td>{2000 + i} x {1200 + i}</td></tr>" for i in range(40)
+) + "</table>"
+REFERENCE_RE = re.compile(r"(\d+)\s*x\s*(\d+)")
+RELATIVE_ROUNDS = 9
+
+# name -> (unit, items per call, callable)
+Case = Tuple[str, int, Callable[[], object]]
+
+
+def load_corpus() -> List[Dict[str, object]]:
+    with open(os.path.join(FIXTURES_DIR, "index.json"), "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    for entry in entries:
+        with open(os.path.join(FIXTURES_DIR, entry["file"]), "rb") as f:
+            entry["raw"] = f.read()
+    return entries
+
+
+def reference() -> None:
+    soup = BeautifulSoup(REFERENCE_HTML, "html.parser")
+    for cell in soup.find_all("td"):
+        REFERENCE_RE.search(cell.get_text().lower())
+
+
+def as_response(entry: Dict[str, object]) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = entry["raw"]
+    response.headers["content-type"] = entry["content_type"]
+    response.url = entry["url"]
+    return response
+
+
+def build_cases(corpus: List[Dict[str, object]]) -> Dict[str, Case]:
+    mzsa = [entry for entry in corpus if entry["file"].startswith("mzsa/")]
+    data_pages = [
+        BeautifulSoup(entry["raw"], "html.parser")
+        for entry in corpus
+        if entry["file"].startswith("go-rm/") and entry["file"].endswith("_data.html")
+    ]
+
+    raw_specs: List[Dict[str, str]] = []
+    for entry in mzsa:
+        soup = scraper.make_soup(as_response(entry))
+        header = soup.find(lambda tag: tag.name == "h3" and product_blocks.SPECS_HEADER in tag.get_text())
+        raw_specs.append(product_blocks.extract_spec_pairs(header))
+    spec_count = sum(len(specs) for specs in raw_specs)
+    labels = [key for specs in raw_specs for key in specs]
+    values = [value for specs in raw_specs for value in specs.values()]
+
+    def parse_legacy() -> None:
+        for entry in mzsa:
+            scraper.parse_product_response(entry["url"], as_response(entry), "legacy")
+
+    def parse_fast() -> None:
+        for entry in mzsa:
+            scraper.parse_product_response(entry["url"], as_response(entry), "fast")
+
+    def normalize() -> None:
+        for specs in raw_specs:
+            scraper.normalize_specs(specs)
+
+    def transliterate() -> None:
+        for label in labels:
+            scraper.transliterate(label)
+
+    def lengths() -> None:
+        for value in values:
+            scraper.parse_length_to_mm(value)
+
+    def rm_dimensions() -> None:
+        for soup in data_pages:
+            scraper_rm.parse_dimensions(soup)
+
+    return {
+        "parse_product_page": ("pages", len(mzsa), parse_legacy),
+        "parse_product_fast": ("pages", len(mzsa), parse_fast),
+        "normalize_specs": ("specs", spec_count, normalize),
+        "transliterate": ("strings", len(labels), transliterate),
+        "parse_length_to_mm": ("values", len(values), lengths),
+        "scraper_rm.parse_dimensions": ("pages", len(data_pages), rm_dimensions),
+    }
+
+
+def check_parsers_agree(corpus: List[Dict[str, object]]) -> List[str]:
+    mismatches = []
+    for entry in corpus:
+        if not entry["file"].startswith("mzsa/"):
+            continue
+        legacy = scraper.parse_product_response(entry["url"], as_response(entry), "legacy")
+        fast = scraper.parse_product_response(entry["url"], as_response(entry), "fast")
+        if json.dumps(legacy, ensure_ascii=False) != json.dumps(fast, ensure_ascii=False):
+            mismatches.append(str(entry["file"]))
+    return mismatches
+
+
+def measure(func: Callable[[], object], items: int, min_time: float, repeat: int) -> Dict[str, float]:
+    func()  # warm up caches and lazy imports
+    best = float("inf")
+    for _ in range(repeat):
+        calls = 0
+        gc.collect()
+        started = time.perf_counter()
+        while True:
+            func()
+            calls += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= min_time:
+                break
+        best = min(best, elapsed / calls)
+
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"per_second": items / best, "peak_kb": peak / 1024}
+
+
+def _rate(func: Callable[[], object], min_time: float) -> float:
+    calls = 0
+    started = time.perf_counter()
+    while True:
+        func()
+        calls += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            return calls / elapsed
+
+
+def measure_relative(func: Callable[[], object], items: int, min_time: float, repeat: int) -> Dict[str, float]:
+    """``measure`` plus ``relative``: calls per reference call, as the median over interleaved rounds."""
+    result = measure(func, items, min_time, repeat)
+    ratios = []
+    for _ in range(RELATIVE_ROUNDS):
+        gc.collect()
+        ratios.append(_rate(func, min_time / 4) / _rate(reference, min_time / 4))
+    result["relative"] = items * statistics.median(ratios)
+    return result
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if "relative" in base and result["relative"] < base["relative"] * (1 - threshold):
+            regressions.append(
+                f"{name}: {result['relative']:.2f}x reference vs baseline {base['relative']:.2f}x"
+                f" ({result['per_second']:.0f}/s now)"
+            )
+        if result["peak_kb"] > base["peak_kb"] * (1 + threshold):
+            regressions.append(f"{name}: peak {result['peak_kb']:.0f} KB vs baseline {base['peak_kb']:.0f} KB")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline micro-benchmarks for the scraper parsing hot paths")
+    parser.add_argument("--only", action="append", help="run only the named case (repeatable)")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds per timing round")
+    parser.add_argument("--repeat", type=int, default=3, help="timing rounds; the best one counts")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed relative regression")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="this machine's baseline (not kept in git)")
+    parser.add_argument("--update-baseline", action="store_true", help="write results to the baseline file")
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    mismatches = check_parsers_agree(corpus)
+    if mismatches:
+        print("Fast parser output differs from parse_product_page on:")
+        for name in mismatches:
+            print(f"  {name}")
+        sys.exit(1)
+
+    synthetic = sum(1 for entry in corpus if entry.get("synthetic"))
+    if synthetic:
+        # Rebuilt from scraped output: a fraction of the size of live pages
+        print(
+            f"Note: {synthetic} of {len(corpus)} pages are rebuilt stand-ins, not recorded pages; "
+            "figures track changes in the code, not real parse cost."
+        )
+    cases = build_cases(corpus)
+    results: Dict[str, Dict[str, float]] = {}
+    print(f"Tree builder for fast parser: {fast_parse.TREE_BUILDER}")
+    print(f"{'case':<30}{'throughput':>20}{'vs reference':>14}{'peak memory':>14}")
+    for name, (unit, items, func) in cases.items():
+        if args.only and name not in args.only:
+            continue
+        result = measure_relative(func, items, args.min_time, args.repeat)
+        results[name] = result
+        print(
+            f"{name:<30}{result['per_second']:>14.0f} {unit + '/s':<8}"
+            f"{result['relative']:>11.2f}x{result['peak_kb']:>11.0f} KB"
+        )
+    if "parse_product_page" in results and "parse_product_fast" in results:
+        speedup = results["parse_product_fast"]["per_second"] / results["parse_product_page"]["per_second"]
+        print(f"Fast parser: {speedup:.2f}x parse_product_page on this run")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline updated: {os.path.relpath(args.baseline)}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("No baseline on this machine yet; run with --update-baseline to record one.")
+        return
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"Regressions beyond {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"No regressions beyond {args.threshold:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import argparse
+import json
+import os
+import sys
+from urllib.parse import urlsplit
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from http_client import fetch  # noqa: E402
+
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+SITE_DIRS = {"www.mzsa.ru": "mzsa", "mzsa.ru": "mzsa", "go-rm.ru": "go-rm"}
+
+
+def record(url: str, name: str = "") -> dict:
+    response = fetch(url, use_cache=False)
+    response.raise_for_status()
+    parts = urlsplit(url)
+    site = SITE_DIRS.get(parts.netloc, parts.netloc)
+    filename = name or os.path.basename(parts.path) or "index.html"
+    rel_path = f"{site}/{filename}"
+    os.makedirs(os.path.join(FIXTURES_DIR, site), exist_ok=True)
+    with open(os.path.join(FIXTURES_DIR, rel_path), "wb") as f:
+        f.write(response.content)
+    # Recorded pages replace rebuilt stand-ins of the same name, so no "synthetic" flag
+    return {"file": rel_path, "url": url, "content_type": response.headers.get("content-type", "text/html")}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Save live pages into the offline benchmark corpus")
+    parser.add_argument("urls", nargs="+")
+    parser.add_argument("--name", default="", help="file name to use (single URL only)")
+    args = parser.parse_args()
+
+    index_path = os.path.join(FIXTURES_DIR, "index.json")
+    with open(index_path, "r", encoding="utf-8") as f:
+        index = {entry["file"]: entry for entry in json.load(f)}
+
+    for url in args.urls:
+        entry = record(url, args.name if len(args.urls) == 1 else "")
+        index[entry["file"]] = entry
+        print(f"Saved {url} -> {entry['file']}")
+
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump(sorted(index.values(), key=lambda entry: entry["file"]), f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
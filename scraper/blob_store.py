@@ -0,0 +1,157 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, NamedTuple, Optional
+
+DEFAULT_BLOB_DIR = os.path.join("output", ".blobs")
+INDEX_NAME = "index.jsonl"
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".webp")
+
+
+class BlobEntry(NamedTuple):
+    sha256: str
+    ext: str
+    size: int
+
+
+class BlobStore:
+    """Content-addressed image store: ``<root>/<aa>/<sha256><ext>``.
+
+    ``index.jsonl`` maps source URLs to blob hashes. It is append-only so a
+    killed run never loses entries that were already written; the last
+    line for a URL wins on load.
+    """
+
+    def __init__(self, root: str = DEFAULT_BLOB_DIR) -> None:
+        self.root = root
+        self.index_path = os.path.join(root, INDEX_NAME)
+        self.index: Dict[str, BlobEntry] = {}
+        self._lock = threading.Lock()
+        self._url_locks: Dict[str, threading.Lock] = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as handler:
+                for line in handler:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.index[record["url"]] = BlobEntry(record["sha256"], record["ext"], record["size"])
+
+    def path(self, entry: BlobEntry) -> str:
+        return os.path.join(self.root, entry.sha256[:2], f"{entry.sha256}{entry.ext}")
+
+    def lookup(self, url: str) -> Optional[BlobEntry]:
+        with self._lock:
+            entry = self.index.get(url)
+        if entry and os.path.exists(self.path(entry)):
+            return entry
+        return None
+
+    @contextmanager
+    def url_lock(self, url: str) -> Iterator[None]:
+        # Many trailers share the same option image; only one thread fetches it.
+        with self._lock:
+            lock = self._url_locks.setdefault(url, threading.Lock())
+        with lock:
+            yield
+
+    def _remember(self, url: str, entry: BlobEntry) -> None:
+        with self._lock:
+            if self.index.get(url) == entry:
+                return
+            self.index[url] = entry
+            os.makedirs(self.root, exist_ok=True)
+            with open(self.index_path, "a", encoding="utf-8") as handler:
+                handler.write(json.dumps({"url": url, **entry._asdict()}) + "\n")
+
+    def write(self, data: bytes, ext: str) -> BlobEntry:
+        entry = BlobEntry(hashlib.sha256(data).hexdigest(), ext.lower(), len(data))
+        blob_path = self.path(entry)
+        if not os.path.exists(blob_path):
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            tmp_path = f"{blob_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as handler:
+                handler.write(data)
+            os.replace(tmp_path, blob_path)
+        return entry
+
+    def put(self, url: str, data: bytes, ext: str) -> BlobEntry:
+        entry = self.write(data, ext)
+        self._remember(url, entry)
+        return entry
+
+    def put_file(self, url: str, path: str, ext: str) -> BlobEntry:
+        """Move a finished download into the store (a rename, so the blob appears whole or not at all)."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as handler:
+            for chunk in iter(lambda: handler.read(1024 * 1024), b""):
+                digest.update(chunk)
+        entry = BlobEntry(digest.hexdigest(), ext.lower(), os.path.getsize(path))
+        blob_path = self.path(entry)
+        if os.path.exists(blob_path):
+            os.remove(path)
+        else:
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            os.replace(path, blob_path)
+        self._remember(url, entry)
+        return entry
+
+    def adopt(self, url: str, existing_path: str) -> BlobEntry:
+        with open(existing_path, "rb") as handler:
+            data = handler.read()
+        entry = self.put(url, data, os.path.splitext(existing_path)[1])
+        self.link(entry, existing_path)
+        return entry
+
+    def link(self, entry: BlobEntry, dest_path: str) -> None:
+        blob_path = self.path(entry)
+        if os.path.exists(dest_path) and os.path.samefile(blob_path, dest_path):
+            return
+        os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+        tmp_path = f"{dest_path}.{threading.get_ident()}.tmp"
+        try:
+            os.link(blob_path, tmp_path)
+        except OSError:
+            # Different filesystem or no hardlink support: fall back to a copy.
+            shutil.copyfile(blob_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+
+
+def dedupe_tree(output_dir: str, store: BlobStore) -> None:
+    saved = 0
+    linked = 0
+    for dirpath, dirnames, filenames in os.walk(output_dir):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for filename in sorted(filenames):
+            if not filename.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            path = os.path.join(dirpath, filename)
+            before = os.stat(path)
+            with open(path, "rb") as handler:
+                data = handler.read()
+            entry = BlobEntry(hashlib.sha256(data).hexdigest(), os.path.splitext(filename)[1].lower(), len(data))
+            already_stored = os.path.exists(store.path(entry))
+            store.write(data, entry.ext)
+            if os.path.samefile(store.path(entry), path):
+                continue
+            store.link(entry, path)
+            linked += 1
+            if already_stored and before.st_nlink == 1:
+                saved += before.st_size
+    print(f"Linked {linked} files into {store.root}, reclaimed {saved / 1024 / 1024:.1f} MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replace duplicate images in output/ with hardlinks into the blob store")
+    parser.add_argument("output_dir", nargs="?", default="output")
+    parser.add_argument("--blob-dir", default=None, help="defaults to <output_dir>/.blobs")
+    args = parser.parse_args()
+    dedupe_tree(args.output_dir, BlobStore(args.blob_dir or os.path.join(args.output_dir, ".blobs")))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,9 @@
-import requests
+from http_client import fetch
 from bs4 import BeautifulSoup
 
 url = "https://www.mzsa.ru/goods/commerce/"
 try:
-    response = requests.get(url, timeout=10)
+    response = fetch(url, timeout=10)
     response.raise_for_status()
     soup = BeautifulSoup(response.text, "html.parser")
     
@@ -1,8 +1,8 @@
-import requests
+from http_client import fetch
 from bs4 import BeautifulSoup
 
 url = "https://www.mzsa.ru/goods/water/water_103.html"
-response = requests.get(url)
+response = fetch(url)
 soup = BeautifulSoup(response.text, "html.parser")
 
 # Find div with id="model_desc"
@@ -1,8 +1,8 @@
-import requests
+from http_client import head
 
 url = "https://www.mzsa.ru/netcat_files/176/185/h_c610b58cca8b0c8aa965de673ec3e869"
 try:
-    response = requests.head(url, allow_redirects=True)
+    response = head(url, allow_redirects=True)
     print(f"URL: {url}")
     print(f"Status Code: {response.status_code}")
     print(f"Content-Type: {response.headers.get('Content-Type')}")
@@ -1,8 +1,8 @@
-import requests
+from http_client import fetch
 from bs4 import BeautifulSoup
 
 url = "https://www.mzsa.ru/goods/common/zincs/zinc_220.html"
-response = requests.get(url)
+response = fetch(url)
 soup = BeautifulSoup(response.text, "html.parser")
 
 # Check for id="model_desc"
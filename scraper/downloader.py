@@ -0,0 +1,258 @@
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+import http_client
+from blob_store import BlobEntry, BlobStore
+from metrics import metrics
+from throttle import BACKOFF_STATUSES, parse_retry_after
+
+DEFAULT_WORKERS = 4
+CHUNK_SIZE = 16 * 1024
+PARTIAL_DIR_NAME = ".partial"
+# A 200 with any other type is an error page served in place of the image
+ACCEPTED_TYPES = ("image/", "application/octet-stream", "binary/octet-stream")
+
+
+class DownloadError(Exception):
+    pass
+
+
+class IncompleteDownload(DownloadError):
+    """The body stopped short or the server asked to back off; worth another attempt."""
+
+
+RETRYABLE = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError, IncompleteDownload)
+
+
+class Bandwidth:
+    """Token bucket over bytes shared by every download; ``None`` means unlimited."""
+
+    def __init__(self, bytes_per_second: Optional[float] = None) -> None:
+        self.rate = bytes_per_second or None
+        # One second worth of burst, at least one chunk
+        self.capacity = max(float(self.rate or 0), float(CHUNK_SIZE))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def consume(self, size: int) -> None:
+        if self.rate is None:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= size:
+                    self.tokens -= size
+                    return
+                wait = (size - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# Leading bytes of the formats the site serves, for bodies sent as application/octet-stream
+IMAGE_SIGNATURES = ((b"\xff\xd8", ".jpg"), (b"\x89PNG", ".png"), (b"GIF8", ".gif"), (b"RIFF", ".webp"))
+
+
+def sniff_image_extension(path: str) -> Optional[str]:
+    with open(path, "rb") as handler:
+        head = handler.read(12)
+    for signature, ext in IMAGE_SIGNATURES:
+        if head.startswith(signature) and (ext != ".webp" or head[8:12] == b"WEBP"):
+            return ext
+    return None
+
+
+def image_complete(path: str) -> bool:
+    """Cheap truncation check on the file's tail; unknown formats pass."""
+    try:
+        size = os.path.getsize(path)
+        with open(path, "rb") as handler:
+            head = handler.read(12)
+            handler.seek(max(0, size - 1024))
+            tail = handler.read()
+    except OSError:
+        return False
+    if not size:
+        return False
+    if head.startswith(b"\xff\xd8"):
+        # Some encoders pad after the EOI marker, so look near the end rather than at it
+        return b"\xff\xd9" in tail
+    if head.startswith(b"\x89PNG"):
+        return b"IEND" in tail[-32:]
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return b";" in tail[-16:]
+    if head.startswith(b"RIFF") and head[8:12] == b"WEBP":
+        return int.from_bytes(head[4:8], "little") + 8 <= size
+    return True
+
+
+def guess_image_extension(content_type: Optional[str]) -> str:
+    ext = ""
+    if content_type:
+        ext = mimetypes.guess_extension(content_type.split(";")[0].strip()) or ""
+        if ext == ".jpe":
+            ext = ".jpg"
+    return ext or ".jpg"
+
+
+def _content_type(response: requests.Response) -> str:
+    return (response.headers.get("content-type") or "").split(";")[0].strip().lower()
+
+
+def _total_length(response: requests.Response, offset: int) -> Optional[int]:
+    if response.status_code == 206:
+        # Content-Range: bytes 1000-4999/5000
+        total = (response.headers.get("content-range") or "").rpartition("/")[2]
+        return int(total) if total.isdigit() else None
+    length = response.headers.get("content-length")
+    return int(length) if length and length.isdigit() else None
+
+
+class Downloader:
+    """Image downloads into the blob store on a worker pool.
+
+    Bodies stream into ``<blob root>/.partial/<sha1(url)>.part`` and only a
+    complete, verified file is renamed into the store, so a killed run never
+    leaves a truncated image where a finished one is expected. The part file
+    and its validators survive the kill: the next attempt asks for the rest
+    with ``Range`` / ``If-Range`` instead of starting over. The pool size is
+    the global download concurrency; ``bandwidth`` caps bytes per second
+    across all of them, on top of the per-host throttle, whose slot is
+    held only until the response headers arrive.
+    """
+
+    def __init__(self, store: BlobStore, workers: int = DEFAULT_WORKERS, bandwidth: Optional[float] = None) -> None:
+        self.store = store
+        self.partial_dir = os.path.join(store.root, PARTIAL_DIR_NAME)
+        self.bandwidth = Bandwidth(bandwidth)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="download")
+
+    def submit(self, func: Callable[..., object], *args: object) -> Future:
+        return self._executor.submit(func, *args)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def _paths(self, url: str) -> Tuple[str, str]:
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        part_path = os.path.join(self.partial_dir, f"{key}.part")
+        return part_path, f"{part_path}.json"
+
+    @staticmethod
+    def _load_meta(meta_path: str) -> Dict[str, object]:
+        try:
+            with open(meta_path, "r", encoding="utf-8") as handler:
+                return json.load(handler)
+        except (OSError, ValueError):
+            return {}
+
+    def fetch(self, url: str, ext: str = "") -> BlobEntry:
+        """Download ``url`` (resuming a partial file) and store it; ``ext`` defaults from the content type."""
+        part_path, meta_path = self._paths(url)
+        os.makedirs(self.partial_dir, exist_ok=True)
+        for attempt in range(http_client.MAX_RETRIES + 1):
+            try:
+                meta = self._download(url, part_path, meta_path)
+                break
+            except RETRYABLE:
+                # Whatever arrived stays in the part file for the next attempt
+                if attempt == http_client.MAX_RETRIES:
+                    raise
+                metrics.count("scraper_http_retries_total", host=urlsplit(url).netloc)
+        if not image_complete(part_path):
+            os.remove(part_path)
+            os.remove(meta_path)
+            raise DownloadError(f"{url}: image data is truncated")
+        if not ext:
+            content_type = str(meta.get("content_type") or "")
+            ext = guess_image_extension(content_type) if content_type.startswith("image/") else None
+            ext = ext or sniff_image_extension(part_path) or ".jpg"
+        entry = self.store.put_file(url, part_path, ext)
+        try:
+            os.remove(meta_path)
+        except OSError:
+            pass
+        return entry
+
+    def _download(self, url: str, part_path: str, meta_path: str) -> Dict[str, object]:
+        meta: Dict[str, object] = self._load_meta(meta_path)
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers: Dict[str, str] = {}
+        validator = meta.get("etag") or meta.get("last_modified")
+        if offset and validator:
+            # If the image changed since the part was written, If-Range gets the whole new one
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = str(validator)
+        elif offset:
+            offset = 0
+
+        host = urlsplit(url).netloc
+        # The host slot covers the request up to its headers, as for a page; the
+        # body streams outside it (paced by ``bandwidth``) so a slow image does
+        # not keep page fetches to the same host waiting.
+        with http_client.throttle.slot(url) as budget:
+            started = time.monotonic()
+            try:
+                response = http_client.session.get(url, timeout=30, headers=headers, stream=True)
+            except requests.RequestException:
+                budget.record(0, time.monotonic() - started)
+                raise
+            budget.record(
+                response.status_code,
+                time.monotonic() - started,
+                parse_retry_after(response.headers.get("Retry-After")),
+            )
+        with response:
+            if response.status_code == 416 and offset:
+                if offset == meta.get("length"):
+                    return meta
+                # The part no longer fits the file on the server: start over
+                os.remove(part_path)
+                raise IncompleteDownload(f"{url}: stale partial download")
+            if response.status_code in BACKOFF_STATUSES:
+                raise IncompleteDownload(f"{url}: got {response.status_code}")
+            if response.status_code not in (200, 206):
+                response.raise_for_status()
+                raise DownloadError(f"{url}: unexpected status {response.status_code}")
+            content_type = _content_type(response)
+            if content_type and not content_type.startswith(ACCEPTED_TYPES):
+                raise DownloadError(f"{url}: expected an image, got {content_type}")
+            if response.status_code == 200:
+                offset = 0
+            elif not (response.headers.get("content-range") or "").startswith(f"bytes {offset}-"):
+                os.remove(part_path)
+                raise IncompleteDownload(f"{url}: server resumed at the wrong offset")
+            else:
+                metrics.count("scraper_images_total", source="resumed")
+            meta = {
+                "url": url,
+                "etag": response.headers.get("ETag") or meta.get("etag"),
+                "last_modified": response.headers.get("Last-Modified") or meta.get("last_modified"),
+                "content_type": content_type or meta.get("content_type"),
+                "length": _total_length(response, offset),
+            }
+            with open(meta_path, "w", encoding="utf-8") as handler:
+                json.dump(meta, handler)
+            received = 0
+            with open(part_path, "ab" if offset else "wb") as handler:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    self.bandwidth.consume(len(chunk))
+                    handler.write(chunk)
+                    received += len(chunk)
+        metrics.observe("scraper_http_request_seconds", time.monotonic() - started, host=host)
+        metrics.count("scraper_http_bytes_total", received, host=host)
+
+        size = os.path.getsize(part_path)
+        if meta["length"] is not None and size != meta["length"]:
+            raise IncompleteDownload(f"{url}: got {size} of {meta['length']} bytes")
+        return meta
@@ -0,0 +1,148 @@
+import codecs
+import re
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
+
+import product_blocks
+
+try:
+    import lxml  # noqa: F401
+
+    TREE_BUILDER = "lxml"
+except ImportError:  # lxml is optional; html.parser still benefits from the single pass.
+    TREE_BUILDER = "html.parser"
+
+HEADER_CHARSET_RE = re.compile(r"charset=[\"']?([\w\-]+)", re.I)
+META_CHARSET_RE = re.compile(rb"<meta[^>]+charset=[\"']?([\w\-]+)", re.I)
+BOMS = (
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+# Only strings of these exact types count towards Tag.get_text().
+TEXT_TYPES = (NavigableString, CData)
+
+
+def _known_codec(name: str) -> Optional[str]:
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+def sniff_encoding(raw: bytes, content_type: Optional[str] = None) -> str:
+    """Pick the page charset from the header, a BOM or <meta>, in that order.
+
+    Unlike ``response.apparent_encoding`` this never runs statistical
+    detection over the whole body; pages that declare nothing are tried as
+    UTF-8 and otherwise read as windows-1251.
+    """
+    if content_type:
+        match = HEADER_CHARSET_RE.search(content_type)
+        if match and _known_codec(match.group(1)):
+            return _known_codec(match.group(1))
+    for bom, name in BOMS:
+        if raw.startswith(bom):
+            return name
+    match = META_CHARSET_RE.search(raw[:4096])
+    if match and _known_codec(match.group(1).decode("ascii", "ignore")):
+        return _known_codec(match.group(1).decode("ascii"))
+    try:
+        raw.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "windows-1251"
+
+
+def _find_price_block(soup: BeautifulSoup) -> Optional[Tag]:
+    # Equivalent of soup.find(div/p whose get_text() contains "Цена:"): the
+    # first such tag in document order is the outermost div/p around the
+    # first matching text node, so there is no need to get_text() every block.
+    hit = soup.find(string=lambda value: type(value) in TEXT_TYPES and "Цена:" in value)
+    block = None
+    if hit is not None:
+        for parent in hit.parents:
+            if parent.name in ("div", "p"):
+                block = parent
+        if block is not None and "Цена:" in block.get_text():
+            return block
+    # "Цена" and ":" may sit in different text nodes; use the exhaustive search.
+    return soup.find(lambda tag: tag.name in ["div", "p"] and "Цена:" in tag.get_text())
+
+
+def parse_product_bytes(
+    raw: bytes,
+    url: str,
+    base_url: str,
+    content_type: Optional[str] = None,
+) -> Dict[str, object]:
+    """Extract a product from raw page bytes in a single pass over the tree.
+
+    Returns the same fields, in the same order, as ``parse_product_page``
+    except that ``specs`` holds the raw label/value pairs; the caller runs
+    ``normalize_specs`` on them.
+    """
+    soup = BeautifulSoup(raw.decode(sniff_encoding(raw, content_type), errors="replace"), TREE_BUILDER)
+
+    title_tag = None
+    model_desc = None
+    text_div = None
+    specs_header = None
+    options_header = None
+    list_items: List[Tag] = []
+    alt_texts: List[str] = []
+    hrefs: List[str] = []
+
+    for tag in soup.find_all(True):
+        name = tag.name
+        if name == "li":
+            list_items.append(tag)
+        elif name == "a":
+            href = tag.get("href")
+            if href is not None:
+                hrefs.append(href)
+        elif name == "img":
+            alt = tag.get("alt")
+            if alt is not None:
+                alt_texts.append(alt)
+        elif name == "div":
+            if model_desc is None and tag.get("id") == "model_desc":
+                model_desc = tag
+            if text_div is None and "text" in (tag.get("class") or ()):
+                text_div = tag
+        elif name == "h2":
+            if title_tag is None:
+                title_tag = tag
+        elif name == "h3" and (specs_header is None or options_header is None):
+            text = tag.get_text()
+            if specs_header is None and product_blocks.SPECS_HEADER in text:
+                specs_header = tag
+            if options_header is None and product_blocks.OPTIONS_HEADER in text:
+                options_header = tag
+
+    product: Dict[str, object] = {"url": url}
+    product["title"] = title_tag.get_text(strip=True) if title_tag else "Unknown Product"
+
+    for li in list_items:
+        product_blocks.apply_list_item(product, li.get_text(" ", strip=True))
+
+    product_blocks.apply_title_model(product)
+
+    if "model" not in product:
+        for alt_text in alt_texts:
+            if product_blocks.apply_alt_model(product, alt_text):
+                break
+
+    product_blocks.apply_model_version(product)
+
+    if "price" not in product:
+        product_blocks.apply_price_block(product, _find_price_block(soup))
+
+    product["description"] = product_blocks.extract_description(model_desc or text_div)
+    product["specs"] = product_blocks.extract_spec_pairs(specs_header)
+
+    options, excluded_urls = product_blocks.extract_options(options_header, base_url)
+    product["options"] = options
+    product["image_urls"] = product_blocks.collect_images(hrefs, excluded_urls, base_url)
+    return product
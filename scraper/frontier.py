@@ -0,0 +1,168 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+DEFAULT_FRONTIER_PATH = os.path.join("output", ".frontier.sqlite")
+
+LISTING = "listing"
+PRODUCT = "product"
+# A URL that failed this many times is left out of later resumes
+MAX_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    key INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    category TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS frontier_next ON frontier (kind, state, priority, seq);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class Entry(NamedTuple):
+    url: str
+    kind: str
+    category: str
+
+
+def url_key(url: str) -> int:
+    """64-bit key of a URL: the seen-set is an integer primary key, not a text index."""
+    return int.from_bytes(hashlib.sha1(url.encode("utf-8")).digest()[:8], "big", signed=True)
+
+
+class CrawlFrontier:
+    """Listing pages and product URLs of one crawl, with their state, in SQLite.
+
+    A URL enters once (its key doubles as the seen-set) and leaves the queue
+    when it is marked done or failed; each of those is its own commit, so a
+    killed run picks up at the first unfinished URL. A run that reached
+    ``finish()`` is cleared by the next ``begin()``.
+    """
+
+    def __init__(self, path: str = DEFAULT_FRONTIER_PATH) -> None:
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "CrawlFrontier":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _meta(self, name: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def begin(self, fresh: bool = False) -> bool:
+        """Start a crawl; returns True when an interrupted one is resumed instead."""
+        with self._lock, self._conn:
+            resumed = not fresh and self._meta("started_at") is not None and self._meta("finished_at") is None
+            if resumed:
+                # Failed URLs get one more try per run, up to MAX_ATTEMPTS
+                self._conn.execute(
+                    "UPDATE frontier SET state = 'pending' WHERE state = 'failed' AND attempts < ?", (MAX_ATTEMPTS,)
+                )
+            else:
+                self._conn.execute("DELETE FROM frontier")
+                self._conn.execute("DELETE FROM meta")
+                self._conn.execute(
+                    "INSERT INTO meta (name, value) VALUES ('started_at', ?)",
+                    (time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),),
+                )
+        return resumed
+
+    def finish(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES ('finished_at', ?)",
+                (time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),),
+            )
+
+    def add(self, urls: Iterable[str], kind: str, category: str, priority: int = 0) -> int:
+        """Queue URLs not seen before in this crawl; returns how many were new."""
+        with self._lock, self._conn:
+            seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM frontier").fetchone()[0]
+            added = 0
+            for url in urls:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO frontier (key, url, kind, category, priority, seq) VALUES (?, ?, ?, ?, ?, ?)",
+                    (url_key(url), url, kind, category, priority, seq + 1),
+                )
+                if cursor.rowcount:
+                    seq += 1
+                    added += 1
+        return added
+
+    def pending(self, kind: str, limit: Optional[int] = None) -> List[Entry]:
+        """Unfinished URLs of ``kind``, highest priority (lowest number) first, then in discovery order."""
+        sql = "SELECT url, kind, category FROM frontier WHERE kind = ? AND state = 'pending' ORDER BY priority, seq"
+        params: tuple = (kind,)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params += (limit,)
+        with self._lock:
+            return [Entry(*row) for row in self._conn.execute(sql, params).fetchall()]
+
+    def complete(self, url: str, ok: bool = True) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE frontier SET state = ?, attempts = attempts + 1 WHERE key = ?",
+                ("done" if ok else "failed", url_key(url)),
+            )
+
+    def urls(self, kind: str, category: Optional[str] = None) -> List[str]:
+        sql = "SELECT url FROM frontier WHERE kind = ?"
+        params: tuple = (kind,)
+        if category is not None:
+            sql += " AND category = ?"
+            params += (category,)
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql + " ORDER BY seq", params).fetchall()]
+
+    def complete_categories(self) -> List[str]:
+        """Categories whose every listing page was read, so their product list is whole."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT category FROM frontier WHERE kind = ? GROUP BY category"
+                " HAVING SUM(state != 'done') = 0 ORDER BY category",
+                (LISTING,),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def retryable(self) -> int:
+        """Failed URLs a resumed run would try again."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM frontier WHERE state = 'failed' AND attempts < ?", (MAX_ATTEMPTS,)
+            ).fetchone()[0]
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT kind, state, COUNT(*) FROM frontier GROUP BY kind, state").fetchall()
+        result: Dict[str, Dict[str, int]] = {}
+        for kind, state, count in rows:
+            result.setdefault(kind, {})[state] = count
+        return result
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import metrics
+from throttle import BACKOFF_STATUSES, HostThrottle, parse_retry_after
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "http")
+MAX_RETRIES = 3
+USER_AGENT = "mzsa-gem-scraper/1.0 (+https://o-n-r.ru)"
+
+# Shared by every crawler thread; scripts tune it with throttle.configure().
+throttle = HostThrottle()
+
+
+def _build_session(pool_size: int = 16) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+session = _build_session()
+
+
+class ResponseCache:
+    """On-disk store of response bodies keyed by URL, with their validators.
+
+    Each entry is a ``<sha1>.body`` file and a ``<sha1>.json`` sidecar that
+    keeps the ETag / Last-Modified needed for conditional requests.
+    """
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR) -> None:
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _paths(self, url: str) -> Tuple[str, str]:
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        folder = os.path.join(self.root, key[:2])
+        return os.path.join(folder, f"{key}.json"), os.path.join(folder, f"{key}.body")
+
+    def load(self, url: str) -> Optional[Dict[str, object]]:
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as handler:
+                meta = json.load(handler)
+            with open(body_path, "rb") as handler:
+                meta["body"] = handler.read()
+        except (OSError, ValueError):
+            return None
+        return meta
+
+    def store(self, url: str, response: requests.Response) -> None:
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        meta_path, body_path = self._paths(url)
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "headers": dict(response.headers),
+            "stored_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(body_path + suffix, "wb") as handler:
+            handler.write(response.content)
+        with open(meta_path + suffix, "w", encoding="utf-8") as handler:
+            json.dump(meta, handler, ensure_ascii=False)
+        with self._lock:
+            os.replace(body_path + suffix, body_path)
+            os.replace(meta_path + suffix, meta_path)
+
+
+cache: Optional[ResponseCache] = ResponseCache()
+
+
+def configure(cache_dir: Optional[str] = DEFAULT_CACHE_DIR, pool_size: int = 16) -> None:
+    global cache, session
+    cache = ResponseCache(cache_dir) if cache_dir else None
+    session = _build_session(pool_size)
+
+
+def _from_cache(url: str, entry: Dict[str, object], fresh: requests.Response) -> requests.Response:
+    response = requests.Response()
+    response.url = url
+    response.status_code = 200
+    response.headers.update(entry.get("headers") or {})
+    for name in ("ETag", "Last-Modified", "Date"):
+        if name in fresh.headers:
+            response.headers[name] = fresh.headers[name]
+    response._content = entry["body"]
+    response.request = fresh.request
+    response.from_cache = True
+    return response
+
+
+def _send(url: str, timeout: int, headers: Dict[str, str]) -> requests.Response:
+    host = urlsplit(url).netloc
+    for attempt in range(MAX_RETRIES + 1):
+        if attempt:
+            metrics.count("scraper_http_retries_total", host=host)
+        with throttle.slot(url) as budget:
+            started = time.monotonic()
+            try:
+                response = session.get(url, timeout=timeout, headers=headers)
+            except requests.RequestException:
+                budget.record(0, time.monotonic() - started)
+                if attempt == MAX_RETRIES:
+                    raise
+                continue
+            elapsed = time.monotonic() - started
+            budget.record(
+                response.status_code,
+                elapsed,
+                parse_retry_after(response.headers.get("Retry-After")),
+            )
+        metrics.observe("scraper_http_request_seconds", elapsed, host=host)
+        metrics.count("scraper_http_bytes_total", len(response.content), host=host)
+        if response.status_code not in BACKOFF_STATUSES or attempt == MAX_RETRIES:
+            return response
+        print(f"Got {response.status_code} for {url}, retrying ({attempt + 1}/{MAX_RETRIES})")
+    return response
+
+
+def fetch(url: str, timeout: int = 20, use_cache: bool = True) -> requests.Response:
+    """GET ``url`` through the shared session, throttle and response cache.
+
+    A 304 answer to a conditional request is turned into a normal 200
+    response built from the cached body; such responses carry
+    ``from_cache = True``.
+    """
+    entry = cache.load(url) if (use_cache and cache) else None
+    headers: Dict[str, str] = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = str(entry["etag"])
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = str(entry["last_modified"])
+
+    response = _send(url, timeout, headers)
+    if entry and response.status_code == 304:
+        metrics.count("scraper_http_cache_total", result="hit")
+        return _from_cache(url, entry, response)
+    if entry:
+        metrics.count("scraper_http_cache_total", result="miss")
+
+    response.from_cache = False
+    if use_cache and cache and response.status_code == 200:
+        cache.store(url, response)
+    return response
+
+
+def head(url: str, timeout: int = 20, allow_redirects: bool = True) -> requests.Response:
+    with throttle.slot(url):
+        return session.head(url, timeout=timeout, allow_redirects=allow_redirects)
@@ -1,10 +1,10 @@
-import requests
+from http_client import fetch
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 
 url = 'https://go-rm.ru/'
 try:
-    response = requests.get(url)
+    response = fetch(url)
     response.raise_for_status()
     soup = BeautifulSoup(response.text, 'html.parser')
     
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+MANIFEST_NAME = ".manifest.json"
+# Entries recorded since the last save, one JSON line each; replayed on load
+LOG_NAME = ".manifest.log"
+
+# Fields produced by parse_product_page; anything stamped later (slug,
+# scraped_at, local image paths) must stay out of the fingerprint.
+FINGERPRINT_FIELDS = (
+    "title",
+    "model",
+    "version",
+    "price",
+    "description",
+    "specs",
+    "options",
+    "image_urls",
+)
+
+
+def fingerprint(product: Dict[str, object]) -> str:
+    payload = {field: product.get(field) for field in FINGERPRINT_FIELDS}
+    encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class CrawlManifest:
+    """Per-URL fingerprints of the last successful scrape of each product.
+
+    ``record`` appends the new entry to ``.manifest.log`` right away, so a
+    killed run keeps every product it finished without rewriting the whole
+    manifest per product; ``save`` folds the log into ``.manifest.json``.
+    """
+
+    def __init__(self, output_dir: str, exists: Optional[Callable[[str, str], bool]] = None) -> None:
+        self.output_dir = output_dir
+        # (category, slug) -> whether the product's output is still stored
+        self.exists = exists
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self.log_path = os.path.join(output_dir, LOG_NAME)
+        self.entries: Dict[str, Dict[str, str]] = {}
+        self.seen: set = set()
+        self.added: List[str] = []
+        self.changed: List[str] = []
+        self.unchanged: List[str] = []
+        self._lock = threading.Lock()
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as handler:
+                self.entries = json.load(handler).get("products", {})
+        if os.path.exists(self.log_path):
+            with open(self.log_path, "r", encoding="utf-8") as handler:
+                for line in handler:
+                    try:
+                        logged = json.loads(line)
+                        self.entries[logged["url"]] = logged["entry"]
+                    except (KeyError, TypeError, ValueError):
+                        # A line cut short by the kill
+                        continue
+
+    def _output_exists(self, entry: Dict[str, str]) -> bool:
+        slug = entry.get("slug", "")
+        if slug and self.exists is not None:
+            return self.exists(entry.get("category", ""), slug)
+        return bool(slug) and os.path.exists(
+            os.path.join(self.output_dir, entry.get("category", ""), slug, f"{slug}.json")
+        )
+
+    def is_current(self, url: str, fp: Optional[str] = None) -> bool:
+        """True if ``url`` was scraped before and its output is still on disk.
+
+        With ``fp`` the stored fingerprint must match as well; without it the
+        caller already knows the page itself did not change (HTTP 304).
+        """
+        with self._lock:
+            entry = self.entries.get(url)
+        if not entry or not self._output_exists(entry):
+            return False
+        return fp is None or entry.get("fingerprint") == fp
+
+    def discover(self, urls: Iterable[str]) -> None:
+        # Listed URLs are not "removed" even if fetching them fails this run.
+        with self._lock:
+            self.seen.update(urls)
+
+    def mark_unchanged(self, url: str) -> None:
+        with self._lock:
+            self.seen.add(url)
+            self.unchanged.append(url)
+
+    def record(self, url: str, fp: str, category: str, slug: str) -> None:
+        with self._lock:
+            self.seen.add(url)
+            previous = self.entries.get(url)
+            if previous is None:
+                self.added.append(url)
+            elif previous.get("fingerprint") != fp:
+                self.changed.append(url)
+            else:
+                self.unchanged.append(url)
+            entry = {"fingerprint": fp, "category": category, "slug": slug}
+            self.entries[url] = entry
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as handler:
+                handler.write(json.dumps({"url": url, "entry": entry}, ensure_ascii=False) + "\n")
+
+    def removed(self, categories: Iterable[str]) -> List[str]:
+        categories = set(categories)
+        with self._lock:
+            return sorted(
+                url
+                for url, entry in self.entries.items()
+                if entry.get("category") in categories and url not in self.seen
+            )
+
+    def save(self, categories: Iterable[str] = ()) -> List[str]:
+        gone = self.removed(categories)
+        with self._lock:
+            for url in gone:
+                self.entries.pop(url, None)
+            os.makedirs(self.output_dir, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as handler:
+                json.dump({"products": self.entries}, handler, ensure_ascii=False, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            if os.path.exists(self.log_path):
+                os.remove(self.log_path)
+        return gone
+
+    def report(self, removed: List[str]) -> None:
+        print(
+            f"Products: {len(self.added)} added, {len(self.changed)} changed, "
+            f"{len(self.unchanged)} unchanged, {len(removed)} removed"
+        )
+        for label, urls in (("+", self.added), ("~", self.changed), ("-", removed)):
+            for url in sorted(urls):
+                print(f"  {label} {url}")
@@ -0,0 +1,215 @@
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HELP = {
+    "scraper_stage_seconds": "Time spent in each scraper stage",
+    "scraper_http_request_seconds": "HTTP round trip per attempt, excluding throttle waits",
+    "scraper_http_bytes_total": "Response body bytes received",
+    "scraper_http_retries_total": "Requests retried after an error or a 429/503",
+    "scraper_http_cache_total": "Conditional requests answered from the response cache (hit) or in full (miss)",
+    "scraper_images_total": "Images by where they came from: blob store, file from an earlier run or network",
+    "scraper_vehicles_total": "Vehicle pages by outcome: harvested, cached, skipped (not a vehicle) or no_dimensions",
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+F = TypeVar("F", bound=Callable)
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+
+class _NullSpan:
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Metrics:
+    """Counters, latency histograms and trace spans shared by the crawler threads.
+
+    Disabled by default: ``span()`` then hands back a shared no-op context
+    manager and ``count()`` / ``observe()`` return at once, so the hooks in
+    the scrapers cost one attribute check per call.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.tracing = False
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+        self.histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self.events: List[Dict[str, object]] = []
+        self.origin = time.perf_counter()
+
+    def configure(self, enabled: bool = True, tracing: bool = False) -> None:
+        with self._lock:
+            self.enabled = enabled or tracing
+            self.tracing = tracing
+            self._reset()
+
+    def count(self, name: str, value: float = 1, **labels: str) -> None:
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram()
+            series[key].observe(seconds)
+
+    def span(self, stage: str, **args: object):
+        """Time a block into ``scraper_stage_seconds`` and, when tracing, the trace."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(stage, args)
+
+    @contextmanager
+    def _span(self, stage: str, args: Dict[str, object]) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.observe("scraper_stage_seconds", elapsed, stage=stage)
+            if self.tracing:
+                event = {
+                    "name": stage,
+                    "ph": "X",
+                    "ts": round((started - self.origin) * 1e6),
+                    "dur": round(elapsed * 1e6),
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                }
+                if args:
+                    event["args"] = {key: str(value) for key, value in args.items()}
+                with self._lock:
+                    self.events.append(event)
+
+    def prometheus_text(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted(self.counters):
+                lines += _header(name, "counter")
+                for key, value in sorted(self.counters[name].items()):
+                    lines.append(f"{name}{_labels(key)} {_number(value)}")
+            for name in sorted(self.histograms):
+                lines += _header(name, "histogram")
+                for key, hist in sorted(self.histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets + (float("inf"),), hist.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else _number(bound)
+                        lines.append(f"{name}_bucket{_labels(key + (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(key)} {hist.total:.6f}")
+                    lines.append(f"{name}_count{_labels(key)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        # node_exporter's textfile collector may read at any moment, so replace atomically
+        _write_atomic(path, self.prometheus_text())
+
+    def write_trace(self, path: str) -> None:
+        """Chrome trace-event JSON, viewable in chrome://tracing or Perfetto."""
+        with self._lock:
+            events = sorted(self.events, key=lambda event: event["ts"])
+        _write_atomic(path, json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}, ensure_ascii=False))
+
+    def summary(self) -> List[str]:
+        rows = []
+        with self._lock:
+            for key, hist in sorted(self.histograms.get("scraper_stage_seconds", {}).items()):
+                calls = sum(hist.counts)
+                rows.append(f"  {dict(key)['stage']:<16} {calls:>6} calls {hist.total:>9.2f}s total {hist.total / calls * 1000:>8.1f}ms avg")
+        return rows
+
+    def export(self, prometheus_path: Optional[str] = None, trace_path: Optional[str] = None) -> None:
+        if not self.enabled:
+            return
+        if prometheus_path:
+            self.write_prometheus(prometheus_path)
+            print(f"Metrics written to {prometheus_path}")
+        if trace_path:
+            self.write_trace(trace_path)
+            print(f"Trace written to {trace_path}")
+        rows = self.summary()
+        if rows:
+            print("Stage timings:")
+            print("\n".join(rows))
+
+
+def _header(name: str, kind: str) -> List[str]:
+    lines = [f"# HELP {name} {HELP[name]}"] if name in HELP else []
+    return lines + [f"# TYPE {name} {kind}"]
+
+
+def _labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in key)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(key, escaped)) + "}"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def _write_atomic(path: str, data: str) -> None:
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handler:
+        handler.write(data)
+    os.replace(tmp_path, path)
+
+
+metrics = Metrics()
+
+
+def timed(stage: str) -> Callable[[F], F]:
+    """Decorator form of ``metrics.span(stage)`` for whole functions."""
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+            with metrics.span(stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,188 @@
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+from bs4 import Tag
+
+# Field extraction shared by the legacy (html.parser, find-based) and the
+# fast (lxml, single-pass) product page parsers. Both locate the same nodes
+# and hand them here, so their output stays field-identical.
+
+GARBAGE_PHRASE = "Заказать\n\nКоличество:\n\nСравнить с другими моделями\n\nЗаказать звонок менеджера\n\nВаше мнение/пожелания\n\nНайти продавца в вашем регионе"
+SPECS_HEADER = "Технические характеристики"
+OPTIONS_HEADER = "Дополнительное оборудование"
+OPTIONS_STOP_NAMES = ["Ваша заявка", "Сравнить с другими моделями"]
+
+MODEL_IN_TITLE_RE = re.compile(r"МЗСА\s+([0-9A-Z\.]+)")
+MODEL_IN_ALT_RE = re.compile(r"(МЗСА\s+[0-9A-Z\.]+)")
+VERSION_IN_ALT_RE = re.compile(r"исп\.\s*(\d+)")
+PRICE_RE = re.compile(r"Цена:\s*([\d\s]+)\s*руб")
+OPTION_PRICE_RE = re.compile(r"Цена:\s*([\d\s]+)")
+SKU_RE = re.compile(r"Номер:\s*(\d+)")
+
+
+def absolute_url(href: str, base_url: str) -> str:
+    return base_url + href if href.startswith("/") else href
+
+
+def apply_list_item(product: Dict[str, object], text: str) -> None:
+    if "Наименование" in text:
+        product["model"] = text.replace("Наименование", "").strip()
+    elif "Исполнение" in text:
+        product["version"] = text.replace("Исполнение", "").strip()
+    elif "Цена:" in text:
+        price_text = text.replace("Цена:", "").replace("руб.", "").replace(" ", "").strip()
+        try:
+            product["price"] = int(price_text)
+        except ValueError:
+            product["price"] = price_text
+
+
+def apply_title_model(product: Dict[str, object]) -> None:
+    if "model" not in product:
+        match = MODEL_IN_TITLE_RE.search(product.get("title", ""))
+        if match:
+            product["model"] = f"МЗСА {match.group(1)}"
+
+
+def apply_alt_model(product: Dict[str, object], alt_text: str) -> bool:
+    """Take model (and version) from an image alt text; True if it matched."""
+    if "МЗСА" not in alt_text:
+        return False
+    match = MODEL_IN_ALT_RE.search(alt_text)
+    if not match:
+        return False
+    product["model"] = match.group(1)
+    # Try to extract version from alt text too
+    if "исп." in alt_text:
+        ver_match = VERSION_IN_ALT_RE.search(alt_text)
+        if ver_match:
+            product["version"] = ver_match.group(1)
+    return True
+
+
+def apply_model_version(product: Dict[str, object]) -> None:
+    if "version" not in product and product.get("model"):
+        parts = str(product["model"]).split(".")
+        if len(parts) > 1 and parts[-1].isdigit():
+            product["version"] = parts[-1]
+
+
+def apply_price_block(product: Dict[str, object], price_tag: Optional[Tag]) -> None:
+    if price_tag:
+        text = price_tag.get_text(" ", strip=True)
+        match = PRICE_RE.search(text)
+        if match:
+            try:
+                product["price"] = int(match.group(1).replace(" ", ""))
+            except ValueError:
+                pass
+
+
+def extract_description(description_block: Optional[Tag]) -> str:
+    if not description_block:
+        return ""
+    raw_desc = description_block.get_text("\n\n", strip=True)
+    return raw_desc.replace(GARBAGE_PHRASE, "").strip()
+
+
+def extract_spec_pairs(specs_header: Optional[Tag]) -> Dict[str, str]:
+    specs: Dict[str, str] = {}
+    if not specs_header:
+        return specs
+    current = specs_header.find_next_sibling()
+    while current:
+        if current.name == "h3":
+            break
+        if current.name == "ul":
+            for li in current.find_all("li"):
+                strong = li.find("strong")
+                if strong:
+                    key = strong.get_text(strip=True)
+                    value = li.get_text(" ", strip=True).replace(key, "").strip()
+                    specs[key] = value
+            break
+        if current.name == "dl":
+            for dt, dd in zip(current.find_all("dt"), current.find_all("dd")):
+                specs[dt.get_text(strip=True)] = dd.get_text(strip=True)
+            break
+        current = current.find_next_sibling()
+    return specs
+
+
+def extract_options(options_header: Optional[Tag], base_url: str) -> Tuple[List[Dict[str, object]], Set[str]]:
+    excluded_urls: Set[str] = set()
+    options: List[Dict[str, object]] = []
+    if not options_header:
+        return options, excluded_urls
+    current = options_header.find_next_sibling()
+    while current:
+        if current.name == "div":
+            # Collect all potential image links in this option block to exclude them later
+            for a_tag in current.find_all("a", href=True):
+                excluded_urls.add(absolute_url(a_tag["href"], base_url))
+
+            for img_tag in current.find_all("img", src=True):
+                excluded_urls.add(absolute_url(img_tag["src"], base_url))
+
+            opt_header = current.find(["h3", "h4"])
+            if opt_header:
+                opt_name = opt_header.get_text(strip=True)
+                if opt_name in OPTIONS_STOP_NAMES:
+                    break
+
+                option: Dict[str, object] = {"name": opt_name}
+                text = current.get_text(" ", strip=True)
+                sku_match = SKU_RE.search(text)
+                if sku_match:
+                    option["sku"] = sku_match.group(1)
+
+                anchor = opt_header.find("a")
+                if anchor and anchor.get("href"):
+                    option["image_url"] = absolute_url(anchor["href"], base_url)
+
+                if "image_url" not in option:
+                    img = current.find("img")
+                    if img:
+                        parent_a = img.find_parent("a")
+                        if parent_a and parent_a.get("href"):
+                            option["image_url"] = absolute_url(parent_a["href"], base_url)
+                        elif img.get("src"):
+                            option["image_url"] = absolute_url(img["src"], base_url)
+
+                if "Цена:" in text:
+                    match = OPTION_PRICE_RE.search(text)
+                    if match:
+                        try:
+                            option["price"] = int(match.group(1).replace(" ", ""))
+                        except ValueError:
+                            pass
+
+                desc_chunks = []
+                for paragraph in current.find_all("p"):
+                    content = paragraph.get_text(strip=True)
+                    if "Цена:" not in content and "Номер:" not in content:
+                        desc_chunks.append(content)
+                if desc_chunks:
+                    option["description"] = "\n".join(desc_chunks)
+
+                options.append(option)
+        current = current.find_next_sibling()
+    return options, excluded_urls
+
+
+def is_product_image(href: str) -> bool:
+    if "netcat_files" in href and "/h_" in href:
+        return True
+    return href.lower().endswith((".jpg", ".jpeg", ".png")) and ("images" in href or "netcat_files" in href)
+
+
+def collect_images(hrefs: List[str], excluded_urls: Set[str], base_url: str) -> List[str]:
+    images: List[str] = []
+    seen: Set[str] = set()
+    for href in hrefs:
+        if is_product_image(href):
+            href = absolute_url(href, base_url)
+            if href not in seen and href not in excluded_urls:
+                seen.add(href)
+                images.append(href)
+    return images
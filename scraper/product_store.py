@@ -0,0 +1,273 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+DEFAULT_STORE_PATH = os.path.join("output", ".products.sqlite")
+STORE_MODES = ("files", "sqlite", "both")
+
+# Fields stamped on every save; they do not make a product "changed".
+VOLATILE_FIELDS = ("scraped_at",)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    url TEXT PRIMARY KEY,
+    slug TEXT NOT NULL,
+    category TEXT NOT NULL,
+    title TEXT,
+    model TEXT,
+    version TEXT,
+    price INTEGER,
+    fingerprint TEXT NOT NULL,
+    scraped_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS products_slug ON products (category, slug);
+CREATE INDEX IF NOT EXISTS products_model ON products (model);
+CREATE TABLE IF NOT EXISTS options (
+    product_url TEXT NOT NULL REFERENCES products (url) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT,
+    sku TEXT,
+    price INTEGER,
+    image TEXT,
+    PRIMARY KEY (product_url, position)
+);
+CREATE INDEX IF NOT EXISTS options_sku ON options (sku);
+CREATE TABLE IF NOT EXISTS images (
+    product_url TEXT NOT NULL REFERENCES products (url) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    PRIMARY KEY (product_url, kind, position)
+);
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    scraped_at TEXT,
+    fingerprint TEXT NOT NULL,
+    price INTEGER,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS history_url ON history (url, id);
+"""
+
+
+def content_fingerprint(product: Dict[str, object]) -> str:
+    payload = {key: value for key, value in product.items() if key not in VOLATILE_FIELDS}
+    encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _int_or_none(value: object) -> Optional[int]:
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+class ProductStore:
+    """Scraped products in one SQLite file, indexed by category, model and option SKU.
+
+    ``products.data`` keeps the full record exactly as ``<slug>.json`` would;
+    options and image paths are mirrored into their own tables for lookups.
+    Every save appends to ``history``, so price and content changes over
+    time stay queryable after the product itself is overwritten.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH) -> None:
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        # Crawler threads share one connection; writes are serialized by the lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "ProductStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def save(self, product: Dict[str, object]) -> str:
+        """Insert or replace one processed product; returns added / changed / unchanged."""
+        url = str(product["url"])
+        fp = content_fingerprint(product)
+        scraped_at = product.get("scraped_at") or time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        price = _int_or_none(product.get("price"))
+        options = [option for option in product.get("options", []) if isinstance(option, dict)]
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT fingerprint FROM products WHERE url = ?", (url,)).fetchone()
+            status = "added" if row is None else ("unchanged" if row["fingerprint"] == fp else "changed")
+            self._conn.execute("DELETE FROM products WHERE url = ?", (url,))
+            # Another URL with the same model+version slug: the last writer wins, as it does in output/
+            displaced = self._conn.execute(
+                "SELECT url FROM products WHERE category = ? AND slug = ?", (product.get("category"), product.get("slug"))
+            ).fetchall()
+            for (other_url,) in displaced:
+                self._conn.execute("DELETE FROM products WHERE url = ?", (other_url,))
+                self._conn.execute(
+                    "INSERT INTO history (url, scraped_at, fingerprint, price, status) VALUES (?, ?, '', NULL, 'removed')",
+                    (other_url, scraped_at),
+                )
+            self._conn.execute(
+                "INSERT INTO products (url, slug, category, title, model, version, price, fingerprint, scraped_at, data)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    product.get("slug"),
+                    product.get("category"),
+                    product.get("title"),
+                    product.get("model"),
+                    product.get("version"),
+                    price,
+                    fp,
+                    scraped_at,
+                    json.dumps(product, ensure_ascii=False),
+                ),
+            )
+            self._conn.executemany(
+                "INSERT INTO options (product_url, position, name, sku, price, image) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (url, pos, option.get("name"), option.get("sku"), _int_or_none(option.get("price")), option.get("image"))
+                    for pos, option in enumerate(options)
+                ],
+            )
+            images = [("product", pos, path) for pos, path in enumerate(product.get("images", []))]
+            images += [("option", pos, option["image"]) for pos, option in enumerate(options) if option.get("image")]
+            self._conn.executemany(
+                "INSERT INTO images (product_url, kind, position, path) VALUES (?, ?, ?, ?)",
+                [(url, kind, pos, path) for kind, pos, path in images],
+            )
+            self._conn.execute(
+                "INSERT INTO history (url, scraped_at, fingerprint, price, status) VALUES (?, ?, ?, ?, ?)",
+                (url, scraped_at, fp, price, status),
+            )
+        return status
+
+    def remove(self, urls: Iterable[str]) -> None:
+        with self._lock, self._conn:
+            for url in urls:
+                self._conn.execute("DELETE FROM products WHERE url = ?", (url,))
+                self._conn.execute(
+                    "INSERT INTO history (url, scraped_at, fingerprint, price, status) VALUES (?, ?, '', NULL, 'removed')",
+                    (url, time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())),
+                )
+
+    def _query(self, sql: str, params: Iterable[object] = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, tuple(params)).fetchall()
+
+    def has(self, category: str, slug: str) -> bool:
+        return bool(self._query("SELECT 1 FROM products WHERE category = ? AND slug = ?", (category, slug)))
+
+    def products(self, category: Optional[str] = None) -> Iterator[Dict[str, object]]:
+        """Full product records ordered by category and slug (the order of the output/ walk)."""
+        if category is None:
+            rows = self._query("SELECT data FROM products ORDER BY category, slug")
+        else:
+            rows = self._query("SELECT data FROM products WHERE category = ? ORDER BY slug", (category,))
+        for row in rows:
+            yield json.loads(row["data"])
+
+    def categories(self) -> List[str]:
+        return [row["category"] for row in self._query("SELECT DISTINCT category FROM products ORDER BY category")]
+
+    def by_model(self, model: str) -> List[Dict[str, object]]:
+        rows = self._query("SELECT data FROM products WHERE model = ? ORDER BY category, slug", (model,))
+        return [json.loads(row["data"]) for row in rows]
+
+    def by_sku(self, sku: str) -> List[Dict[str, object]]:
+        """Products offering an option with this SKU."""
+        rows = self._query(
+            "SELECT DISTINCT p.data, p.category, p.slug FROM options o JOIN products p ON p.url = o.product_url"
+            " WHERE o.sku = ? ORDER BY p.category, p.slug",
+            (sku,),
+        )
+        return [json.loads(row["data"]) for row in rows]
+
+    def history(self, url: str) -> List[Dict[str, object]]:
+        rows = self._query(
+            "SELECT scraped_at, fingerprint, price, status FROM history WHERE url = ? ORDER BY id", (url,)
+        )
+        return [dict(row) for row in rows]
+
+    def export_jsonl(self, path: str) -> int:
+        count = 0
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handler:
+            for product in self.products():
+                handler.write(json.dumps(product, ensure_ascii=False, sort_keys=True))
+                handler.write("\n")
+                count += 1
+        os.replace(tmp_path, path)
+        return count
+
+    def import_tree(self, output_dir: str) -> int:
+        """Load an existing output/<category>/<slug>/<slug>.json tree."""
+        count = 0
+        for category in sorted(os.listdir(output_dir)):
+            cat_path = os.path.join(output_dir, category)
+            if category.startswith(".") or not os.path.isdir(cat_path):
+                continue
+            for slug in sorted(os.listdir(cat_path)):
+                json_file = os.path.join(cat_path, slug, f"{slug}.json")
+                if not os.path.exists(json_file):
+                    continue
+                with open(json_file, "r", encoding="utf-8") as handler:
+                    product = json.load(handler)
+                product.setdefault("category", category)
+                product.setdefault("slug", slug)
+                product.setdefault("url", f"file:{category}/{slug}")
+                self.save(product)
+                count += 1
+        return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query or maintain the SQLite product store")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("import", help="load an existing output/ tree").add_argument("output_dir", nargs="?", default="output")
+    sub.add_parser("export", help="write all products as JSON Lines").add_argument("path")
+    query = sub.add_parser("query", help="print matching products")
+    query.add_argument("--category")
+    query.add_argument("--model")
+    query.add_argument("--sku")
+    sub.add_parser("history", help="print the scrape history of a product URL").add_argument("url")
+    args = parser.parse_args()
+
+    with ProductStore(args.store) as store:
+        if args.command == "import":
+            print(f"Imported {store.import_tree(args.output_dir)} products into {args.store}")
+        elif args.command == "export":
+            print(f"Exported {store.export_jsonl(args.path)} products to {args.path}")
+        elif args.command == "history":
+            for entry in store.history(args.url):
+                print(f"{entry['scraped_at']}  {entry['status']:<9}  price={entry['price']}  {entry['fingerprint'][:12]}")
+        else:
+            if args.sku:
+                products = store.by_sku(args.sku)
+            elif args.model:
+                products = store.by_model(args.model)
+            else:
+                products = list(store.products(args.category))
+            for product in products:
+                if args.category and product.get("category") != args.category:
+                    continue
+                print(f"{product.get('category')}/{product.get('slug')}  {product.get('price')}  {product.get('title')}")
+
+
+if __name__ == "__main__":
+    main()
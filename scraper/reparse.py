@@ -0,0 +1,120 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+import scraper
+from manifest import CrawlManifest, fingerprint
+from product_store import DEFAULT_STORE_PATH, STORE_MODES
+from response_archive import DEFAULT_ARCHIVE_DIR, ArchiveEntry, ResponseArchive
+
+_archive: Optional[ResponseArchive] = None
+_parser = "legacy"
+
+# (status, url, fingerprint, category, slug); status is changed / unchanged / failed
+Result = Tuple[str, str, str, str, str]
+
+
+def _init_worker(archive_dir: str, store_mode: str, store_path: str, parser: str) -> None:
+    global _archive, _parser
+    _archive = ResponseArchive(archive_dir)
+    _parser = parser
+    scraper.offline = True
+    scraper.configure_archive(None)
+    scraper.configure_store(store_mode, store_path)
+
+
+def archived_response(entry: ArchiveEntry, body: bytes) -> requests.Response:
+    response = requests.Response()
+    response.url = entry.url
+    response.status_code = 200
+    response._content = body
+    if entry.content_type:
+        response.headers["content-type"] = entry.content_type
+    return response
+
+
+def reparse_entry(entry: ArchiveEntry, known_fp: Optional[str]) -> Result:
+    """Parse one archived page and write the product unless it comes out the same as last time."""
+    try:
+        response = archived_response(entry, _archive.read(entry))
+        product = scraper.parse_product_response(entry.url, response, _parser)
+        if not product:
+            return "failed", entry.url, "", entry.category, ""
+        fp = fingerprint(product)
+        if fp == known_fp:
+            return "unchanged", entry.url, fp, entry.category, ""
+        slug = scraper.process_product(product, entry.category, entry.fetched_at)
+        return ("changed" if slug else "failed"), entry.url, fp, entry.category, slug or ""
+    except Exception as exc:
+        print(f"Error reparsing {entry.url}: {exc}")
+        return "failed", entry.url, "", entry.category, ""
+
+
+def _reparse_job(job: Tuple[ArchiveEntry, Optional[str]]) -> Result:
+    return reparse_entry(*job)
+
+
+def reparse(
+    archive_dir: str = DEFAULT_ARCHIVE_DIR,
+    jobs: Optional[int] = None,
+    categories: Optional[List[str]] = None,
+    force: bool = False,
+    parser: str = "legacy",
+    store_mode: str = "files",
+    store_path: str = DEFAULT_STORE_PATH,
+) -> Dict[str, int]:
+    archive = ResponseArchive(archive_dir)
+    entries = sorted(
+        (entry for entry in archive.entries.values() if not categories or entry.category in categories),
+        key=lambda entry: (entry.category, entry.url),
+    )
+    scraper.configure_store(store_mode, store_path)
+    manifest = CrawlManifest(scraper.OUTPUT_DIR, exists=scraper.product_exists)
+    work = []
+    for entry in entries:
+        # A product whose output is gone is rewritten even if its fingerprint matches
+        current = not force and manifest.is_current(entry.url)
+        work.append((entry, manifest.entries[entry.url]["fingerprint"] if current else None))
+
+    counts = {"changed": 0, "unchanged": 0, "failed": 0}
+    with ProcessPoolExecutor(
+        max_workers=jobs or os.cpu_count(),
+        initializer=_init_worker,
+        initargs=(archive_dir, store_mode, store_path, parser),
+    ) as executor:
+        for status, url, fp, category, slug in executor.map(_reparse_job, work, chunksize=4):
+            counts[status] += 1
+            if status == "changed":
+                manifest.record(url, fp, category, slug)
+            elif status == "unchanged":
+                manifest.mark_unchanged(url)
+    manifest.save()
+    manifest.report([])
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-run parsing over archived product pages, without network access")
+    parser.add_argument("--archive-dir", default=DEFAULT_ARCHIVE_DIR)
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--category", action="append", help="only these categories (repeatable)")
+    parser.add_argument("--force", action="store_true", help="rewrite products even if parsing gives the same result")
+    parser.add_argument("--parser", choices=["legacy", "fast"], default="legacy")
+    parser.add_argument("--store", choices=STORE_MODES, default="files")
+    parser.add_argument("--store-path", default=DEFAULT_STORE_PATH)
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    counts = reparse(args.archive_dir, args.jobs, args.category, args.force, args.parser, args.store, args.store_path)
+    print(
+        f"Reparsed {sum(counts.values())} pages in {time.monotonic() - started:.1f}s: "
+        f"{counts['changed']} rewritten, {counts['unchanged']} unchanged, {counts['failed']} failed"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from typing import Dict, NamedTuple, Optional
+
+DEFAULT_ARCHIVE_DIR = os.path.join("output", ".archive")
+INDEX_NAME = "index.jsonl"
+# A pack is closed and a new one started past this size
+PACK_LIMIT = 64 * 1024 * 1024
+
+
+class ArchiveEntry(NamedTuple):
+    url: str
+    category: str
+    fetched_at: str
+    content_type: str
+    sha256: str
+    size: int
+    pack: str
+    offset: int
+    length: int
+
+
+class ResponseArchive:
+    """Raw product page bodies in append-only compressed packs.
+
+    Each body is zlib-compressed and appended to ``pack-<n>.bin``; one line
+    per body in ``index.jsonl`` says where it is. A body identical to the
+    last one stored for its URL is not stored again, so re-crawling an
+    unchanged site adds nothing. As with the blob store index, the last line
+    for a URL wins and a killed run loses at most the body being written.
+    """
+
+    def __init__(self, root: str = DEFAULT_ARCHIVE_DIR) -> None:
+        self.root = root
+        self.index_path = os.path.join(root, INDEX_NAME)
+        self.entries: Dict[str, ArchiveEntry] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as handler:
+                for line in handler:
+                    try:
+                        entry = ArchiveEntry(**json.loads(line))
+                    except (TypeError, ValueError):
+                        continue
+                    self.entries[entry.url] = entry
+        packs = sorted(name for name in os.listdir(root) if name.startswith("pack-")) if os.path.isdir(root) else []
+        self.pack = packs[-1] if packs else "pack-000001.bin"
+
+    def _pack_for(self, size: int) -> str:
+        path = os.path.join(self.root, self.pack)
+        if os.path.exists(path) and os.path.getsize(path) + size > PACK_LIMIT:
+            number = int(self.pack[len("pack-") : -len(".bin")]) + 1
+            self.pack = f"pack-{number:06d}.bin"
+        return self.pack
+
+    def store(self, url: str, body: bytes, category: str = "", content_type: str = "") -> Optional[ArchiveEntry]:
+        """Append ``body`` unless it equals the last body stored for ``url``."""
+        sha256 = hashlib.sha256(body).hexdigest()
+        with self._lock:
+            previous = self.entries.get(url)
+            if previous and previous.sha256 == sha256 and previous.category == category:
+                return None
+        data = zlib.compress(body, 6)
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            pack = self._pack_for(len(data))
+            with open(os.path.join(self.root, pack), "ab") as handler:
+                offset = handler.tell()
+                handler.write(data)
+            entry = ArchiveEntry(
+                url,
+                category,
+                time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                content_type,
+                sha256,
+                len(body),
+                pack,
+                offset,
+                len(data),
+            )
+            # The index line goes last: an entry never points at bytes that are not there
+            with open(self.index_path, "a", encoding="utf-8") as handler:
+                handler.write(json.dumps(entry._asdict(), ensure_ascii=False) + "\n")
+            self.entries[url] = entry
+        return entry
+
+    def read(self, entry: ArchiveEntry) -> bytes:
+        with open(os.path.join(self.root, entry.pack), "rb") as handler:
+            handler.seek(entry.offset)
+            body = zlib.decompress(handler.read(entry.length))
+        if hashlib.sha256(body).hexdigest() != entry.sha256:
+            raise ValueError(f"Archived body of {entry.url} is corrupt")
+        return body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="List or extract archived product pages")
+    parser.add_argument("--archive", default=DEFAULT_ARCHIVE_DIR)
+    parser.add_argument("--category")
+    parser.add_argument("--dump", metavar="URL", help="print the archived body of one URL")
+    args = parser.parse_args()
+
+    archive = ResponseArchive(args.archive)
+    if args.dump:
+        entry = archive.entries.get(args.dump)
+        if entry is None:
+            print(f"Not archived: {args.dump}")
+            return
+        print(archive.read(entry).decode("utf-8", errors="replace"))
+        return
+    entries = [entry for entry in archive.entries.values() if not args.category or entry.category == args.category]
+    for entry in sorted(entries, key=lambda entry: (entry.category, entry.url)):
+        print(f"{entry.fetched_at}  {entry.category:<14} {entry.size / 1024:>7.1f} KB  {entry.url}")
+    total = sum(entry.length for entry in entries)
+    print(f"{len(entries)} pages, {total / 1024 / 1024:.1f} MB compressed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+import re
+from typing import Callable, Dict, Iterator, List, Optional
+
+# Compiles the subset of JSON Schema (draft-07) used by the *_schema.json files
+# in this folder into plain Python closures. A schema is walked once; validating
+# a record is then just calling the closures, with no per-record dict lookups
+# of schema keywords.
+
+Validator = Callable[[object, str], Iterator[str]]
+
+TYPE_CHECKS: Dict[str, Callable[[object], bool]] = {
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "string": lambda value: isinstance(value, str),
+    "integer": lambda value: isinstance(value, int) and not isinstance(value, bool),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "boolean": lambda value: isinstance(value, bool),
+    "null": lambda value: value is None,
+}
+URI_RE = re.compile(r"^[a-zA-Z][a-zA-Z0-9+.-]*://\S+$")
+FORMAT_CHECKS: Dict[str, Callable[[str], bool]] = {
+    "uri": lambda value: bool(URI_RE.match(value)),
+}
+# Keywords compile_schema enforces, and those that carry no constraint. Anything
+# else is rejected at compile time rather than silently not enforced.
+VALIDATION_KEYWORDS = frozenset(
+    (
+        "$ref",
+        "type",
+        "enum",
+        "minLength",
+        "pattern",
+        "format",
+        "minimum",
+        "required",
+        "properties",
+        "additionalProperties",
+        "items",
+        "minItems",
+    )
+)
+ANNOTATION_KEYWORDS = frozenset(("$schema", "$id", "$comment", "title", "description", "default", "examples", "definitions"))
+
+
+def _type_name(value: object) -> str:
+    for name, check in TYPE_CHECKS.items():
+        if name != "number" and check(value):
+            return name
+    return "number" if TYPE_CHECKS["number"](value) else type(value).__name__
+
+
+def _resolve(ref: str, root: Dict[str, object]) -> Dict[str, object]:
+    if not ref.startswith("#/"):
+        raise ValueError(f"Only local $ref is supported: {ref}")
+    node: object = root
+    for part in ref[2:].split("/"):
+        node = node[part]
+    return node
+
+
+def _check_keywords(schema: Dict[str, object], pointer: str) -> None:
+    """Raise ValueError for any keyword below ``schema`` that compile_schema would ignore."""
+    unsupported = sorted(set(schema) - VALIDATION_KEYWORDS - ANNOTATION_KEYWORDS)
+    if unsupported:
+        raise ValueError(f"Unsupported schema keyword(s) at {pointer}: {', '.join(unsupported)}")
+    if "$ref" in schema and set(schema) & VALIDATION_KEYWORDS != {"$ref"}:
+        # Draft-07 ignores every sibling of $ref
+        raise ValueError(f"Keywords next to $ref are not applied at {pointer}")
+    names = schema.get("type", [])
+    for name in names if isinstance(names, list) else [names]:
+        if name not in TYPE_CHECKS:
+            raise ValueError(f"Unsupported type {name!r} at {pointer}")
+    if "format" in schema and schema["format"] not in FORMAT_CHECKS:
+        raise ValueError(f"Unsupported format {schema['format']!r} at {pointer}")
+    for keyword in ("properties", "definitions"):
+        for key, sub in schema.get(keyword, {}).items():
+            _check_keywords(sub, f"{pointer}/{keyword}/{key}")
+    if isinstance(schema.get("items"), list):
+        raise ValueError(f"Tuple-form items is not supported at {pointer}")
+    for keyword in ("items", "additionalProperties"):
+        if isinstance(schema.get(keyword), dict):
+            _check_keywords(schema[keyword], f"{pointer}/{keyword}")
+
+
+def compile_schema(schema: Dict[str, object], root: Optional[Dict[str, object]] = None) -> Validator:
+    """Turn a schema into ``validate(value, path) -> iterator of error messages``.
+
+    Raises ValueError if the schema (or ``root``, which ``$ref`` resolves
+    against) uses a keyword, type or format this compiler does not enforce.
+    """
+    if root is None:
+        root = schema
+    else:
+        _check_keywords(schema, "#")
+    _check_keywords(root, "#")
+    return _compile(schema, root)
+
+
+def _compile(schema: Dict[str, object], root: Dict[str, object]) -> Validator:
+    if "$ref" in schema:
+        target = _resolve(schema["$ref"], root)
+        compiled: List[Validator] = []
+
+        # Compile lazily so recursive definitions do not loop forever
+        def validate_ref(value: object, path: str) -> Iterator[str]:
+            if not compiled:
+                compiled.append(_compile(target, root))
+            yield from compiled[0](value, path)
+
+        return validate_ref
+
+    checks: List[Validator] = []
+
+    if "type" in schema:
+        names = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+        type_checks = [TYPE_CHECKS[name] for name in names]
+        expected = " or ".join(names)
+
+        def check_type(value: object, path: str) -> Iterator[str]:
+            if not any(check(value) for check in type_checks):
+                yield f"{path}: expected {expected}, got {_type_name(value)}"
+
+        checks.append(check_type)
+
+    if "enum" in schema:
+        allowed = list(schema["enum"])
+
+        def check_enum(value: object, path: str) -> Iterator[str]:
+            if value not in allowed:
+                yield f"{path}: {value!r} is not one of {allowed}"
+
+        checks.append(check_enum)
+
+    if "minLength" in schema or "pattern" in schema or "format" in schema:
+        min_length = schema.get("minLength", 0)
+        pattern = re.compile(schema["pattern"]) if "pattern" in schema else None
+        fmt = schema.get("format")
+        fmt_check = FORMAT_CHECKS.get(fmt) if fmt else None
+
+        def check_string(value: object, path: str) -> Iterator[str]:
+            if not isinstance(value, str):
+                return
+            if len(value) < min_length:
+                yield f"{path}: shorter than {min_length} characters"
+            if pattern is not None and not pattern.search(value):
+                yield f"{path}: does not match {pattern.pattern}"
+            if fmt_check is not None and not fmt_check(value):
+                yield f"{path}: not a valid {fmt}"
+
+        checks.append(check_string)
+
+    if "minimum" in schema:
+        minimum = schema["minimum"]
+
+        def check_minimum(value: object, path: str) -> Iterator[str]:
+            if TYPE_CHECKS["number"](value) and value < minimum:
+                yield f"{path}: {value} is less than {minimum}"
+
+        checks.append(check_minimum)
+
+    if "required" in schema:
+        required = list(schema["required"])
+
+        def check_required(value: object, path: str) -> Iterator[str]:
+            if isinstance(value, dict):
+                for key in required:
+                    if key not in value:
+                        yield f"{path}: missing required field '{key}'"
+
+        checks.append(check_required)
+
+    if "properties" in schema or "additionalProperties" in schema:
+        properties = {key: _compile(sub, root) for key, sub in schema.get("properties", {}).items()}
+        additional = schema.get("additionalProperties", True)
+        additional_check = _compile(additional, root) if isinstance(additional, dict) else None
+
+        def check_properties(value: object, path: str) -> Iterator[str]:
+            if not isinstance(value, dict):
+                return
+            for key, item in value.items():
+                validator = properties.get(key)
+                if validator is not None:
+                    yield from validator(item, f"{path}.{key}")
+                elif additional is False:
+                    yield f"{path}: unexpected field '{key}'"
+                elif additional_check is not None:
+                    yield from additional_check(item, f"{path}.{key}")
+
+        checks.append(check_properties)
+
+    if "items" in schema or "minItems" in schema:
+        item_check = _compile(schema["items"], root) if "items" in schema else None
+        min_items = schema.get("minItems", 0)
+
+        def check_items(value: object, path: str) -> Iterator[str]:
+            if not isinstance(value, list):
+                return
+            if len(value) < min_items:
+                yield f"{path}: fewer than {min_items} items"
+            if item_check is not None:
+                for pos, item in enumerate(value):
+                    yield from item_check(item, f"{path}[{pos}]")
+
+        checks.append(check_items)
+
+    def validate(value: object, path: str = "$") -> Iterator[str]:
+        for check in checks:
+            yield from check(value, path)
+
+    return validate
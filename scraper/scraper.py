@@ -1,116 +1,122 @@
+import argparse
+import hashlib
 import json
-import mimetypes
 import os
 import re
-import shutil
+import threading
 import time
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urldefrag
 
 import requests
 from bs4 import BeautifulSoup
 
+import http_client
+import fast_parse
+import product_blocks
+from blob_store import IMAGE_EXTENSIONS, BlobStore
+from downloader import DEFAULT_WORKERS as DEFAULT_DOWNLOAD_WORKERS, Downloader, image_complete
+from frontier import DEFAULT_FRONTIER_PATH, LISTING, PRODUCT, CrawlFrontier
+from http_client import fetch, throttle
+from manifest import CrawlManifest, fingerprint
+from metrics import metrics, timed
+from product_store import DEFAULT_STORE_PATH, STORE_MODES, ProductStore
+from response_archive import DEFAULT_ARCHIVE_DIR, ResponseArchive
+from textnorm import normalize_specs, parse_length_to_mm, transliterate
+
 BASE_URL = "https://www.mzsa.ru"
 OUTPUT_DIR = "output"
+DEFAULT_WORKERS = 8
+
+_blob_store: Optional[BlobStore] = None
+_blob_store_lock = threading.Lock()
+_downloader: Optional[Downloader] = None
+download_workers = DEFAULT_DOWNLOAD_WORKERS
+download_bandwidth: Optional[float] = None
+# Raw product pages kept for `reparse`; None when archiving is off
+response_archive: Optional[ResponseArchive] = None
+# Set by reparse: images come from the blob store or not at all
+offline = False
+
+# "files" writes output/<category>/<slug>/<slug>.json, "sqlite" the product store, "both" both
+store_mode = "files"
+product_store: Optional[ProductStore] = None
 
 CATEGORY_PREFIXES = {
     "lodochniy": "pritsep_lodka",
     "bortovoy": "pritsep_bort",
     "furgon": "pritsep_furgon",
+    "kommercheskiy": "pritsep_kommerch",
 }
+# Listing pagination links: ?PAGEN_1=2 (Bitrix), ?page=2 or /page-2/
+PAGINATION_RE = re.compile(r"[?&](PAGEN_\d+|page)=\d+|/page-?\d+/?$", re.IGNORECASE)
 
 
-def get_soup(url: str) -> Optional[BeautifulSoup]:
+def get_blob_store() -> BlobStore:
+    # Opened on first use so that importing this module does not read output/
+    global _blob_store
+    with _blob_store_lock:
+        if _blob_store is None:
+            _blob_store = BlobStore(os.path.join(OUTPUT_DIR, ".blobs"))
+        return _blob_store
+
+
+def get_downloader() -> Downloader:
+    global _downloader
+    blob_store = get_blob_store()
+    with _blob_store_lock:
+        if _downloader is None:
+            _downloader = Downloader(blob_store, download_workers, download_bandwidth)
+        return _downloader
+
+
+def configure_downloads(workers: int = DEFAULT_DOWNLOAD_WORKERS, bandwidth_kbps: float = 0) -> None:
+    """Global image download budget: concurrent downloads and KB/s across all of them (0 = unlimited)."""
+    global download_workers, download_bandwidth
+    download_workers = workers
+    download_bandwidth = bandwidth_kbps * 1024 if bandwidth_kbps else None
+
+
+def configure_store(mode: str = "files", path: str = DEFAULT_STORE_PATH) -> None:
+    global store_mode, product_store
+    store_mode = mode
+    product_store = ProductStore(path) if mode in ("sqlite", "both") else None
+
+
+def configure_archive(path: Optional[str] = DEFAULT_ARCHIVE_DIR) -> None:
+    global response_archive
+    response_archive = ResponseArchive(path) if path else None
+
+
+def product_exists(category_name: str, slug: str) -> bool:
+    if product_store is not None:
+        return product_store.has(category_name, slug)
+    return os.path.exists(os.path.join(OUTPUT_DIR, category_name, slug, f"{slug}.json"))
+
+
+def fetch_page(url: str) -> Optional[requests.Response]:
     try:
-        response = requests.get(url, timeout=20)
+        response = fetch(url)
         response.raise_for_status()
-        response.encoding = response.apparent_encoding
-        return BeautifulSoup(response.text, "html.parser")
+        return response
     except Exception as exc:
         print(f"Error fetching {url}: {exc}")
         return None
 
 
-def transliterate(text: str) -> str:
-    mapping = {
-        "а": "a",
-        "б": "b",
-        "в": "v",
-        "г": "g",
-        "д": "d",
-        "е": "e",
-        "ё": "yo",
-        "ж": "zh",
-        "з": "z",
-        "и": "i",
-        "й": "y",
-        "к": "k",
-        "л": "l",
-        "м": "m",
-        "н": "n",
-        "о": "o",
-        "п": "p",
-        "р": "r",
-        "с": "s",
-        "т": "t",
-        "у": "u",
-        "ф": "f",
-        "х": "kh",
-        "ц": "ts",
-        "ч": "ch",
-        "ш": "sh",
-        "щ": "shch",
-        "ъ": "",
-        "ы": "y",
-        "ь": "",
-        "э": "e",
-        "ю": "yu",
-        "я": "ya",
-        " ": "_",
-        "-": "_",
-    }
-    result: List[str] = []
-    for char in text.lower():
-        if char in mapping:
-            result.append(mapping[char])
-        elif char.isalnum():
-            result.append(char)
-        else:
-            result.append("_")
-    return re.sub(r"_+", "_", "".join(result)).strip("_")
-
-
-def parse_length_to_mm(raw_value: Optional[object]) -> Optional[int]:
-    if raw_value is None:
-        return None
-    if isinstance(raw_value, (int, float)):
-        value = float(raw_value)
-        if value <= 0:
-            return None
-        if value < 100:  # assume meters
-            return int(round(value * 1000))
-        return int(round(value))
-
-    text = str(raw_value).strip().lower()
-    if not text:
-        return None
-
-    match = re.findall(r"[\d.,]+", text)
-    if not match:
-        return None
+def make_soup(response: requests.Response) -> BeautifulSoup:
+    with metrics.span("decode"):
+        response.encoding = response.apparent_encoding
+        text = response.text
+    with metrics.span("parse_html"):
+        return BeautifulSoup(text, "html.parser")
 
-    number_str = match[0].replace(",", ".")
-    try:
-        value = float(number_str)
-    except ValueError:
-        return None
 
-    if "мм" in text or "mill" in text or value > 100:
-        return int(round(value))
-    if "см" in text:
-        return int(round(value * 10))
-    if "м" in text:
-        return int(round(value * 1000))
-    return int(round(value))
+@timed("get_soup")
+def get_soup(url: str) -> Optional[BeautifulSoup]:
+    response = fetch_page(url)
+    return make_soup(response) if response is not None else None
 
 
 def extract_boat_length_mm(specs: Dict[str, object]) -> Optional[int]:
@@ -166,75 +172,56 @@ def build_product_image_basename(
     return re.sub(r"_+", "_", base_name).strip("_") or prefix
 
 
+@timed("download_image")
 def download_image(url: str, folder: str, base_name: Optional[str] = None) -> Optional[str]:
     if not url:
         return None
+    blob_store = get_blob_store()
     try:
         original_filename = os.path.basename(url).split("?")[0]
         name, ext = os.path.splitext(original_filename)
 
-        response = requests.get(url, stream=True, timeout=30)
-        response.raise_for_status()
-
-        if not ext:
-            content_type = response.headers.get("content-type")
-            if content_type:
-                ext = mimetypes.guess_extension(content_type) or ""
-                if ext == ".jpe":
-                    ext = ".jpg"
-            if not ext:
-                ext = ".jpg"
+        # Known URLs are served from the blob store without touching the network.
+        entry = blob_store.lookup(url)
+        if entry:
+            filename = f"{base_name or name}{ext or entry.ext}"
+            blob_store.link(entry, os.path.join(folder, filename))
+            metrics.count("scraper_images_total", source="blob")
+            return filename
 
-        filename = f"{base_name or name}{ext}"
-        final_path = os.path.join(folder, filename)
+        # Files left by earlier runs are adopted instead of downloaded again,
+        # unless a killed run cut them short. Extensionless URLs
+        # (netcat_files/.../h_<hash>) may have been saved under any image extension.
+        for candidate_ext in (ext,) if ext else IMAGE_EXTENSIONS:
+            filename = f"{base_name or name}{candidate_ext}"
+            final_path = os.path.join(folder, filename)
+            if os.path.exists(final_path) and image_complete(final_path):
+                blob_store.adopt(url, final_path)
+                metrics.count("scraper_images_total", source="adopted")
+                return filename
+
+        if offline:
+            print(f"Image not in the blob store, skipped offline: {url}")
+            return None
 
-        if os.path.exists(final_path):
-            return filename
+        with blob_store.url_lock(url):
+            entry = blob_store.lookup(url)
+            if entry is None:
+                entry = get_downloader().fetch(url, ext)
+                metrics.count("scraper_images_total", source="network")
 
-        with open(final_path, "wb") as handler:
-            shutil.copyfileobj(response.raw, handler)
+        filename = f"{base_name or name}{ext or entry.ext}"
+        blob_store.link(entry, os.path.join(folder, filename))
         return filename
     except Exception as exc:
         print(f"Error downloading image {url}: {exc}")
         return None
 
 
-def normalize_specs(specs: Dict[str, str]) -> Dict[str, str]:
-    normalized: Dict[str, str] = {}
-    for key, value in specs.items():
-        clean_key = key.strip().rstrip(":")
-        transliterated_key = transliterate(clean_key)
-        clean_value = value.strip().replace("×", "x")
-
-        match = re.match(r"^(\d+([.,]\d+)?)\s*([а-яА-Яa-zA-Z]+)?$", clean_value)
-        if match:
-            num = match.group(1).replace(",", ".")
-            unit = match.group(3)
-            try:
-                number = float(num) if "." in num else int(num)
-                if any(token in clean_key.lower() for token in ["масса", "груз", "нагруз"]):
-                    normalized[transliterated_key] = number
-                    normalized[f"{transliterated_key}_unit"] = unit or "kg"
-                else:
-                    normalized[transliterated_key] = clean_value
-            except ValueError:
-                normalized[transliterated_key] = clean_value
-        else:
-            normalized[transliterated_key] = clean_value
-
-        if "x" in clean_value and any(token in clean_key.lower() for token in ["размер", "габарит"]):
-            digits = re.sub(r"[^0-9x]", "", clean_value)
-            parts = [int(part) for part in digits.split("x") if part.isdigit()]
-            if len(parts) >= 2:
-                normalized[f"{transliterated_key}_length"] = parts[0]
-                normalized[f"{transliterated_key}_width"] = parts[1]
-            if len(parts) >= 3:
-                normalized[f"{transliterated_key}_height"] = parts[2]
-    return normalized
-
-
-def parse_product_page(url: str) -> Optional[Dict[str, object]]:
-    soup = get_soup(url)
+@timed("parse_product")
+def parse_product_page(url: str, soup: Optional[BeautifulSoup] = None) -> Optional[Dict[str, object]]:
+    if soup is None:
+        soup = get_soup(url)
     if not soup:
         return None
 
@@ -244,182 +231,50 @@ def parse_product_page(url: str) -> Optional[Dict[str, object]]:
     product["title"] = title_tag.get_text(strip=True) if title_tag else "Unknown Product"
 
     for li in soup.find_all("li"):
-        text = li.get_text(" ", strip=True)
-        if "Наименование" in text:
-            product["model"] = text.replace("Наименование", "").strip()
-        elif "Исполнение" in text:
-            product["version"] = text.replace("Исполнение", "").strip()
-        elif "Цена:" in text:
-            price_text = text.replace("Цена:", "").replace("руб.", "").replace(" ", "").strip()
-            try:
-                product["price"] = int(price_text)
-            except ValueError:
-                product["price"] = price_text
+        product_blocks.apply_list_item(product, li.get_text(" ", strip=True))
 
-    if "model" not in product:
-        match = re.search(r"МЗСА\s+([0-9A-Z\.]+)", product.get("title", ""))
-        if match:
-            product["model"] = f"МЗСА {match.group(1)}"
+    product_blocks.apply_title_model(product)
 
     # Fallback: Try to find model in image alt text
     if "model" not in product:
         for img in soup.find_all("img", alt=True):
-            alt_text = img["alt"]
-            if "МЗСА" in alt_text:
-                match = re.search(r"(МЗСА\s+[0-9A-Z\.]+)", alt_text)
-                if match:
-                    product["model"] = match.group(1)
-                    # Try to extract version from alt text too
-                    if "исп." in alt_text:
-                        ver_match = re.search(r"исп\.\s*(\d+)", alt_text)
-                        if ver_match:
-                            product["version"] = ver_match.group(1)
-                    break
-
-    if "version" not in product and product.get("model"):
-        parts = str(product["model"]).split(".")
-        if len(parts) > 1 and parts[-1].isdigit():
-            product["version"] = parts[-1]
+            if product_blocks.apply_alt_model(product, img["alt"]):
+                break
+
+    product_blocks.apply_model_version(product)
 
     if "price" not in product:
         price_tag = soup.find(lambda tag: tag.name in ["div", "p"] and "Цена:" in tag.get_text())
-        if price_tag:
-            text = price_tag.get_text(" ", strip=True)
-            match = re.search(r"Цена:\s*([\d\s]+)\s*руб", text)
-            if match:
-                try:
-                    product["price"] = int(match.group(1).replace(" ", ""))
-                except ValueError:
-                    pass
+        product_blocks.apply_price_block(product, price_tag)
 
     description_block = soup.find("div", id="model_desc")
     if not description_block:
         description_block = soup.find("div", class_="text")
+    product["description"] = product_blocks.extract_description(description_block)
 
-    if description_block:
-        raw_desc = description_block.get_text("\n\n", strip=True)
-        garbage_phrase = "Заказать\n\nКоличество:\n\nСравнить с другими моделями\n\nЗаказать звонок менеджера\n\nВаше мнение/пожелания\n\nНайти продавца в вашем регионе"
-        product["description"] = raw_desc.replace(garbage_phrase, "").strip()
-    else:
-        product["description"] = ""
-
-    specs: Dict[str, str] = {}
+    specs_header = soup.find(lambda tag: tag.name == "h3" and product_blocks.SPECS_HEADER in tag.get_text())
+    product["specs"] = normalize_specs(product_blocks.extract_spec_pairs(specs_header))
 
-    specs_header = soup.find(lambda tag: tag.name == "h3" and "Технические характеристики" in tag.get_text())
-    if specs_header:
-        current = specs_header.find_next_sibling()
-        while current:
-            if current.name == "h3":
-                break
-            if current.name == "ul":
-                for li in current.find_all("li"):
-                    strong = li.find("strong")
-                    if strong:
-                        key = strong.get_text(strip=True)
-                        value = li.get_text(" ", strip=True).replace(key, "").strip()
-                        specs[key] = value
-                break
-            if current.name == "dl":
-                for dt, dd in zip(current.find_all("dt"), current.find_all("dd")):
-                    specs[dt.get_text(strip=True)] = dd.get_text(strip=True)
-                break
-            current = current.find_next_sibling()
-    product["specs"] = normalize_specs(specs)
-
-    excluded_urls = set()
-    options: List[Dict[str, str]] = []
-    options_header = soup.find(lambda tag: tag.name == "h3" and "Дополнительное оборудование" in tag.get_text())
-    if options_header:
-        current = options_header.find_next_sibling()
-        while current:
-            if current.name == "div":
-                # Collect all potential image links in this option block to exclude them later
-                for a_tag in current.find_all("a", href=True):
-                    href = a_tag["href"]
-                    if href.startswith("/"):
-                        href = BASE_URL + href
-                    excluded_urls.add(href)
-                
-                for img_tag in current.find_all("img", src=True):
-                    src = img_tag["src"]
-                    if src.startswith("/"):
-                        src = BASE_URL + src
-                    excluded_urls.add(src)
-
-                opt_header = current.find(["h3", "h4"])
-                if opt_header:
-                    opt_name = opt_header.get_text(strip=True)
-                    if opt_name in ["Ваша заявка", "Сравнить с другими моделями"]:
-                        break
-
-                    option: Dict[str, str] = {"name": opt_name}
-                    text = current.get_text(" ", strip=True)
-                    sku_match = re.search(r"Номер:\s*(\d+)", text)
-                    if sku_match:
-                        option["sku"] = sku_match.group(1)
-
-                    anchor = opt_header.find("a")
-                    if anchor and anchor.get("href"):
-                        href = anchor["href"]
-                        if href.startswith("/"):
-                            href = BASE_URL + href
-                        option["image_url"] = href
-
-                    if "image_url" not in option:
-                        img = current.find("img")
-                        if img:
-                            parent_a = img.find_parent("a")
-                            if parent_a and parent_a.get("href"):
-                                href = parent_a["href"]
-                                if href.startswith("/"):
-                                    href = BASE_URL + href
-                                option["image_url"] = href
-                            elif img.get("src"):
-                                src = img["src"]
-                                if src.startswith("/"):
-                                    src = BASE_URL + src
-                                option["image_url"] = src
-
-                    if "Цена:" in text:
-                        match = re.search(r"Цена:\s*([\d\s]+)", text)
-                        if match:
-                            try:
-                                option["price"] = int(match.group(1).replace(" ", ""))
-                            except ValueError:
-                                pass
-
-                    desc_chunks = []
-                    for paragraph in current.find_all("p"):
-                        content = paragraph.get_text(strip=True)
-                        if "Цена:" not in content and "Номер:" not in content:
-                            desc_chunks.append(content)
-                    if desc_chunks:
-                        option["description"] = "\n".join(desc_chunks)
-
-                    options.append(option)
-            current = current.find_next_sibling()
+    options_header = soup.find(lambda tag: tag.name == "h3" and product_blocks.OPTIONS_HEADER in tag.get_text())
+    options, excluded_urls = product_blocks.extract_options(options_header, BASE_URL)
     product["options"] = options
 
-    images: List[str] = []
-    for anchor in soup.find_all("a", href=True):
-        href = anchor["href"]
-        is_image = False
-        if "netcat_files" in href and "/h_" in href:
-            is_image = True
-        elif href.lower().endswith((".jpg", ".jpeg", ".png")) and ("images" in href or "netcat_files" in href):
-            is_image = True
-
-        if is_image:
-            if href.startswith("/"):
-                href = BASE_URL + href
-            
-            if href not in images and href not in excluded_urls:
-                images.append(href)
-    product["image_urls"] = images
+    hrefs = [anchor["href"] for anchor in soup.find_all("a", href=True)]
+    product["image_urls"] = product_blocks.collect_images(hrefs, excluded_urls, BASE_URL)
 
     return product
 
 
+def parse_product_response(url: str, response: requests.Response, parser: str = "legacy") -> Optional[Dict[str, object]]:
+    if parser == "fast":
+        product = fast_parse.parse_product_bytes(
+            response.content, url, BASE_URL, response.headers.get("content-type")
+        )
+        product["specs"] = normalize_specs(product["specs"])
+        return product
+    return parse_product_page(url, make_soup(response))
+
+
 def ensure_model_and_version(product: Dict[str, object]) -> None:
     if not product.get("model"):
         product["model"] = product.get("title") or os.path.basename(product.get("url", ""))
@@ -453,7 +308,9 @@ def build_product_slug(product: Dict[str, object], category_name: str) -> str:
                  slug_base = f"{slug_base}_{ver_slug}"
         return slug_base
 
-    fallback = transliterate(f"{category_name}_{int(time.time())}")
+    # No model, title or URL name: derive a stable suffix from the URL rather than the clock
+    digest = hashlib.sha256(str(product.get("url", "")).encode("utf-8")).hexdigest()[:10]
+    fallback = transliterate(f"{category_name}_{digest}")
     return fallback or category_name
 
 
@@ -461,16 +318,21 @@ def ensure_forward_slash(value: Optional[str]) -> Optional[str]:
     return value.replace("\\", "/") if isinstance(value, str) else value
 
 
-def process_product(product: Optional[Dict[str, object]], category_name: str) -> None:
+@timed("process_product")
+def process_product(
+    product: Optional[Dict[str, object]],
+    category_name: str,
+    scraped_at: Optional[str] = None,
+) -> Optional[str]:
     if not product:
-        return
+        return None
 
     ensure_model_and_version(product)
     slug = build_product_slug(product, category_name)
 
     product["category"] = category_name
     product["slug"] = slug
-    product["scraped_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    product["scraped_at"] = scraped_at or time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
 
     category_dir = os.path.join(OUTPUT_DIR, category_name)
     product_dir = os.path.join(category_dir, slug)
@@ -494,66 +356,257 @@ def process_product(product: Optional[Dict[str, object]], category_name: str) ->
         if url and url not in option_image_urls
     ]
 
-    local_images: List[str] = []
-    for index, url in enumerate(product_image_urls):
-        base_name = f"{base_stub}_{index}" if index else base_stub
-        filename = download_image(url, images_dir, base_name)
-        if filename:
-            local_images.append(ensure_forward_slash(os.path.join("pricep", filename)))
-    product["images"] = local_images
-
+    # Every image of the product goes to the download pool at once; this
+    # thread only waits for the results, and other product workers keep
+    # fetching and parsing pages meanwhile.
+    downloader = get_downloader()
+    product_downloads = [
+        downloader.submit(download_image, url, images_dir, f"{base_stub}_{index}" if index else base_stub)
+        for index, url in enumerate(product_image_urls)
+    ]
+    option_downloads = []
     for option in product.get("options", []):
         if isinstance(option, dict) and option.get("image_url"):
             sku = option.get("sku", "")
             option_base = option.get("name", slug)
             if sku:
                 option_base = f"{option_base}_{sku}"
-            filename = download_image(option["image_url"], options_dir, transliterate(option_base))
-            if filename:
-                option["image"] = ensure_forward_slash(os.path.join("options", filename))
+            option_downloads.append(
+                (option, downloader.submit(download_image, option["image_url"], options_dir, transliterate(option_base)))
+            )
+
+    local_images: List[str] = []
+    for future in product_downloads:
+        filename = future.result()
+        if filename:
+            local_images.append(ensure_forward_slash(os.path.join("pricep", filename)))
+    product["images"] = local_images
+
+    for option, future in option_downloads:
+        filename = future.result()
+        if filename:
+            option["image"] = ensure_forward_slash(os.path.join("options", filename))
+    for option in product.get("options", []):
         if isinstance(option, dict):
             option.pop("image_url", None)
 
     product.pop("image_urls", None)
 
-    with open(os.path.join(product_dir, f"{slug}.json"), "w", encoding="utf-8") as handler:
-        json.dump(product, handler, ensure_ascii=False, indent=2)
+    if store_mode != "sqlite":
+        with metrics.span("write_json"), open(os.path.join(product_dir, f"{slug}.json"), "w", encoding="utf-8") as handler:
+            json.dump(product, handler, ensure_ascii=False, indent=2)
+    if product_store is not None:
+        with metrics.span("store"):
+            product_store.save(product)
 
     print(f"Processed {category_name}/{slug}")
+    return slug
 
 
-def scrape_category(category_url: str, category_name: str) -> None:
-    soup = get_soup(category_url)
-    if not soup:
-        return
-
+def parse_listing(page_url: str, category_url: str, soup: BeautifulSoup) -> Tuple[List[str], List[str]]:
+    """Product links and further pages of the same category listing."""
     links = set()
+    pages = set()
     for anchor in soup.find_all("a", href=True):
         href = anchor["href"]
         if "/goods/" in href and href.endswith(".html"):
             full_url = BASE_URL + href if href.startswith("/") else href
             links.add(full_url)
+            continue
+        page = urldefrag(urljoin(page_url, href))[0]
+        if page.startswith(category_url) and page != page_url and PAGINATION_RE.search(page):
+            pages.add(page)
+    return sorted(links), sorted(pages)
 
-    print(f"Found {len(links)} products in {category_url} ({category_name})")
 
-    for link in sorted(links):
+def scrape_product(
+    link: str,
+    category_name: str,
+    manifest: Optional[CrawlManifest] = None,
+    incremental: bool = False,
+    parser: str = "legacy",
+) -> bool:
+    """Scrape one product page; False only when the page could not be fetched."""
+    with metrics.span("product", url=link, category=category_name):
         print(f"Scraping {link}...")
-        product = parse_product_page(link)
-        if product:
-            process_product(product, category_name)
-        time.sleep(1)
-
+        response = fetch_page(link)
+        if response is None:
+            return False
+        if response_archive is not None:
+            with metrics.span("archive"):
+                response_archive.store(link, response.content, category_name, response.headers.get("content-type", ""))
+
+        # A 304 means the HTML itself is identical, so there is nothing to parse.
+        if incremental and manifest and getattr(response, "from_cache", False) and manifest.is_current(link):
+            manifest.mark_unchanged(link)
+            return True
+
+        product = parse_product_response(link, response, parser)
+        if not product:
+            return True
+
+        fp = fingerprint(product)
+        if incremental and manifest and manifest.is_current(link, fp):
+            manifest.mark_unchanged(link)
+            return True
+
+        slug = process_product(product, category_name)
+        if manifest and slug:
+            manifest.record(link, fp, category_name, slug)
+        return True
+
+
+def crawl_product(
+    link: str,
+    category_name: str,
+    manifest: Optional[CrawlManifest] = None,
+    incremental: bool = False,
+    parser: str = "legacy",
+    frontier: Optional[CrawlFrontier] = None,
+) -> None:
+    try:
+        ok = scrape_product(link, category_name, manifest, incremental, parser)
+    except Exception:
+        if frontier is not None:
+            frontier.complete(link, ok=False)
+        raise
+    if frontier is not None:
+        # scrape_product already logged the manifest entry, so a finished URL is never without one
+        frontier.complete(link, ok)
+
+
+def run_crawl(
+    jobs: Iterable[Tuple[str, str]],
+    workers: int = DEFAULT_WORKERS,
+    manifest: Optional[CrawlManifest] = None,
+    incremental: bool = False,
+    parser: str = "legacy",
+    frontier: Optional[CrawlFrontier] = None,
+) -> None:
+    jobs = list(jobs)
+    if workers <= 1:
+        for link, category_name in jobs:
+            crawl_product(link, category_name, manifest, incremental, parser, frontier)
+        return
 
-if __name__ == "__main__":
-    categories = [
-        ("bortovoy", "https://www.mzsa.ru/goods/common/zincs/"),
-        ("lodochniy", "https://www.mzsa.ru/goods/water/"),
-        ("furgon", "https://www.mzsa.ru/goods/van/"),
-        # ("kommercheskiy", "https://www.mzsa.ru/goods/commerce/"),
-    ]
+    # Politeness is enforced per host by the throttle, so the pool size only
+    # bounds how many products are in flight across all hosts.
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(crawl_product, link, category_name, manifest, incremental, parser, frontier): link
+            for link, category_name in jobs
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as exc:
+                print(f"Error scraping {futures[future]}: {exc}")
+
+
+CATEGORIES = [
+    ("bortovoy", "https://www.mzsa.ru/goods/common/zincs/"),
+    ("lodochniy", "https://www.mzsa.ru/goods/water/"),
+    ("furgon", "https://www.mzsa.ru/goods/van/"),
+    ("kommercheskiy", "https://www.mzsa.ru/goods/commerce/"),
+]
+
+
+def discover_listings(frontier: CrawlFrontier, manifest: Optional[CrawlManifest] = None) -> None:
+    """Read every pending listing page, queueing its products and further pages."""
+    category_urls = dict(CATEGORIES)
+    while True:
+        batch = frontier.pending(LISTING)
+        if not batch:
+            return
+        for page_url, _, cat_name in batch:
+            soup = get_soup(page_url)
+            if soup is None:
+                frontier.complete(page_url, ok=False)
+                continue
+            links, pages = parse_listing(page_url, category_urls[cat_name], soup)
+            # Products not in the manifest yet go first, so new items land even if the run is cut short
+            known = manifest.entries if manifest is not None else {}
+            frontier.add([link for link in links if link not in known], PRODUCT, cat_name, priority=0)
+            frontier.add([link for link in links if link in known], PRODUCT, cat_name, priority=1)
+            frontier.add(pages, LISTING, cat_name)
+            frontier.complete(page_url)
+            print(f"Found {len(links)} products and {len(pages)} linked pages in {page_url} ({cat_name})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Scrape MZSA trailers into output/")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="product pages in flight (1 = sequential)")
+    parser.add_argument("--per-host", type=int, default=4, help="max concurrent requests per host")
+    parser.add_argument("--rate", type=float, default=2.0, help="initial requests per second per host")
+    parser.add_argument("--max-rate", type=float, default=8.0, help="upper bound for the adaptive rate")
+    parser.add_argument("--cache-dir", default=http_client.DEFAULT_CACHE_DIR, help="HTTP response cache location")
+    parser.add_argument("--no-cache", action="store_true", help="always download pages in full")
+    parser.add_argument("--incremental", action="store_true", help="skip products whose content has not changed")
+    parser.add_argument(
+        "--parser",
+        choices=["legacy", "fast"],
+        default="legacy",
+        help="product page parser: html.parser + find() or the single-pass lxml extractor",
+    )
+    parser.add_argument(
+        "--store",
+        choices=STORE_MODES,
+        default="files",
+        help="where products are written: per-product JSON files, the SQLite product store or both",
+    )
+    parser.add_argument("--store-path", default=DEFAULT_STORE_PATH, help="SQLite product store location")
+    parser.add_argument("--metrics", metavar="PATH", help="write Prometheus textfile metrics (latency, bytes, retries, cache hits)")
+    parser.add_argument("--trace", metavar="PATH", help="write per-product spans as Chrome trace JSON")
+    parser.add_argument(
+        "--download-workers",
+        type=int,
+        default=DEFAULT_DOWNLOAD_WORKERS,
+        help="images downloaded at once across all products",
+    )
+    parser.add_argument("--bandwidth", type=float, default=0, help="image download budget in KB/s (0 = unlimited)")
+    parser.add_argument("--archive-dir", default=DEFAULT_ARCHIVE_DIR, help="raw product pages kept for reparse")
+    parser.add_argument("--no-archive", action="store_true", help="do not archive raw product pages")
+    parser.add_argument("--frontier", default=DEFAULT_FRONTIER_PATH, help="crawl queue used to resume an interrupted run")
+    parser.add_argument("--fresh", action="store_true", help="discard an interrupted run instead of resuming it")
+    args = parser.parse_args()
+
+    if args.metrics or args.trace:
+        metrics.configure(tracing=bool(args.trace))
+    throttle.configure(rate=args.rate, concurrency=args.per_host, max_rate=args.max_rate)
+    http_client.configure(cache_dir=None if args.no_cache else args.cache_dir, pool_size=max(args.workers, args.per_host))
+
+    configure_store(args.store, args.store_path)
+    configure_downloads(args.download_workers, args.bandwidth)
+    configure_archive(None if args.no_archive else args.archive_dir)
+    manifest = CrawlManifest(OUTPUT_DIR, exists=product_exists)
+    frontier = CrawlFrontier(args.frontier)
+    if frontier.begin(fresh=args.fresh):
+        counts = frontier.counts().get(PRODUCT, {})
+        print(f"Resuming interrupted crawl: {counts.get('done', 0)} products done, {counts.get('pending', 0)} pending")
+    for cat_name, cat_url in CATEGORIES:
+        frontier.add([cat_url], LISTING, cat_name)
+
+    started = time.monotonic()
+    discover_listings(frontier, manifest)
+    manifest.discover(frontier.urls(PRODUCT))
+    jobs = [(link, cat_name) for link, _, cat_name in frontier.pending(PRODUCT)]
+    print(f"{len(jobs)} products to scrape")
+    run_crawl(jobs, args.workers, manifest, args.incremental, args.parser, frontier)
+    # Removal needs a category's full product list: every listing page read
+    listed_categories = [cat_name for cat_name in frontier.complete_categories() if frontier.urls(PRODUCT, cat_name)]
+    removed = manifest.save(listed_categories)
+    manifest.report(removed)
+    if product_store is not None:
+        product_store.remove(removed)
+    retry = frontier.retryable()
+    if retry:
+        print(f"{retry} pages could not be fetched; the next run resumes with them (--fresh starts over)")
+    else:
+        frontier.finish()
+    frontier.close()
+    print(f"Done in {time.monotonic() - started:.1f}s.")
+    metrics.export(args.metrics, args.trace)
 
-    for cat_name, cat_url in categories:
-        print(f"--- Scraping category: {cat_name} ---")
-        scrape_category(cat_url, cat_name)
 
-    print("Done.")
+if __name__ == "__main__":
+    main()
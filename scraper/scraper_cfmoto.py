@@ -0,0 +1,128 @@
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+import vehicle_harvest
+from textnorm import split_dimensions
+
+BASE_URL = "https://cfmoto.ru/"
+INDEX_URL = urljoin(BASE_URL, "catalog/")
+# Model pages sit one level under a catalog section: /catalog/<section>/<model>/
+MODEL_PATH_RE = re.compile(r"^/catalog/[\w-]+/[\w.-]+/?$")
+# Section landing pages, filters and dealer pages share the catalog prefix
+IGNORE_SEGMENTS = ("filter", "compare", "dealers", "accessories", "aksessuary", "zapchasti", "page-")
+
+# Model name prefix -> vehicle type used by frontend/src/data/vehiclesDatabase.json
+TYPE_PREFIXES = (
+    ("CFORCE", "atv"),
+    ("UFORCE", "utv"),
+    ("ZFORCE", "utv"),
+)
+MOTORCYCLE_PREFIXES = ("CL-X", "CLX", "NK", "MT", "SR", "IBEX", "PAPIO")
+
+
+def spec_rows(soup: BeautifulSoup) -> Iterator[Tuple[str, str]]:
+    """(label, value) pairs from two-cell table rows and from dt/dd lists."""
+    for tr in soup.find_all("tr"):
+        cells = tr.find_all(["th", "td"])
+        if len(cells) >= 2:
+            yield cells[0].get_text(" ", strip=True).lower(), cells[-1].get_text(" ", strip=True)
+    for dt in soup.find_all("dt"):
+        dd = dt.find_next_sibling("dd")
+        if dd is not None:
+            yield dt.get_text(" ", strip=True).lower(), dd.get_text(" ", strip=True)
+
+
+def _single(value: str) -> int:
+    # "2 260 мм" -> 2260: thousands are space-separated on this site
+    parts = split_dimensions(value.split(",")[0])
+    return parts[0] if parts else 0
+
+
+def parse_dimensions(soup: BeautifulSoup) -> Dict[str, int]:
+    dims = {"length": 0, "width": 0, "height": 0, "weight": 0}
+    for label, value in spec_rows(soup):
+        if "габарит" in label:
+            # "2 260×1 180×1 350" or "2260/1180/1350"
+            parts = split_dimensions(value.replace("/", "x"))
+            if len(parts) >= 3:
+                dims["length"], dims["width"], dims["height"] = parts[:3]
+        elif "длина" in label and not dims["length"]:
+            dims["length"] = _single(value)
+        elif "ширина" in label and not dims["width"]:
+            dims["width"] = _single(value)
+        elif "высота" in label and "сиден" not in label and not dims["height"]:
+            dims["height"] = _single(value)
+        elif "масса" in label and "груз" not in label and not dims["weight"]:
+            # "Сухая масса, кг"; towing and payload rows mention "груз"
+            dims["weight"] = _single(value)
+    return dims
+
+
+def find_vehicle_links(soup: BeautifulSoup) -> List[Tuple[str, str]]:
+    links: List[Tuple[str, str]] = []
+    seen_urls = set()
+    for a in soup.find_all("a", href=True):
+        url = urljoin(INDEX_URL, a["href"]).split("#")[0]
+        if url in seen_urls or not is_model_url(url):
+            continue
+        name = a.get_text(" ", strip=True)
+        if not name:
+            # Image-only cards carry the model name in alt
+            img = a.find("img")
+            name = img.get("alt", "").strip() if img is not None else ""
+        if len(name) < 3:
+            continue
+        seen_urls.add(url)
+        links.append((url, name))
+    return links
+
+
+def is_model_url(url: str) -> bool:
+    parsed = urlparse(url)
+    if parsed.netloc not in ("cfmoto.ru", "www.cfmoto.ru") or parsed.query:
+        return False
+    return bool(MODEL_PATH_RE.match(parsed.path)) and not any(part in parsed.path for part in IGNORE_SEGMENTS)
+
+
+class CfmotoAdapter(vehicle_harvest.SiteAdapter):
+    name = "cfmoto"
+    brand = "CFMOTO"
+    index_url = INDEX_URL
+
+    def vehicle_links(self, soup: BeautifulSoup) -> List[Tuple[str, str]]:
+        return find_vehicle_links(soup)
+
+    def is_vehicle_url(self, url: str) -> bool:
+        return is_model_url(url)
+
+    def is_vehicle_page(self, url: str, soup: BeautifulSoup) -> bool:
+        # Specs are on the model page itself; section and promo pages have no dimensions row
+        return any("габарит" in label or "длина" in label for label, _ in spec_rows(soup))
+
+    def parse_dimensions(self, soup: BeautifulSoup) -> Dict[str, int]:
+        return parse_dimensions(soup)
+
+    def image_url(self, soup: BeautifulSoup, model: str) -> str:
+        meta = soup.find("meta", attrs={"property": "og:image"})
+        if meta is not None and meta.get("content"):
+            return urljoin(BASE_URL, meta["content"])
+        for img in soup.find_all("img", src=True):
+            if model.lower() in img.get("alt", "").lower():
+                return urljoin(BASE_URL, img["src"])
+        return ""
+
+    def vehicle_type(self, model: str) -> Optional[str]:
+        upper = model.upper()
+        for prefix, vehicle_type in TYPE_PREFIXES:
+            if upper.startswith(prefix):
+                return vehicle_type
+        if upper.startswith(MOTORCYCLE_PREFIXES):
+            return "motorcycle"
+        return None
+
+
+ADAPTER = CfmotoAdapter()
+
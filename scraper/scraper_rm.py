@@ -1,10 +1,12 @@
-import requests
-from bs4 import BeautifulSoup
-import json
-import time
-from urllib.parse import urljoin
+import os
+import sys
+from urllib.parse import urljoin, urlsplit
 import re
 
+import vehicle_harvest
+from metrics import timed
+from textnorm import has_dimension_separator, integers
+
 BASE_URL = 'https://go-rm.ru/'
 IGNORE_PAGES = [
     'contacts.html', 'offers.html', 'warranty.html', 'rm_finservice.html', 
@@ -14,16 +16,7 @@ IGNORE_PAGES = [
     'requisites.html', 'index.html', 'search', 'cargobed.html'
 ]
 
-def get_soup(url):
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        response.encoding = 'utf-8'
-        return BeautifulSoup(response.text, 'html.parser')
-    except Exception as e:
-        print(f"Error fetching {url}: {e}")
-        return None
-
+@timed('parse_dimensions')
 def parse_dimensions(soup):
     # Look for table rows with dimensions
     dims = {'length': 0, 'width': 0, 'height': 0, 'weight': 0}
@@ -41,59 +34,53 @@ def parse_dimensions(soup):
             if len(tds) >= 2:
                 val_text = tds[1].get_text(strip=True)
                 # Parse "2438/1234/1558"
-                parts = re.findall(r'\d+', val_text)
+                parts = integers(val_text)
                 if len(parts) >= 3:
-                    dims['length'] = int(parts[0])
-                    dims['width'] = int(parts[1])
-                    dims['height'] = int(parts[2])
+                    dims['length'] = parts[0]
+                    dims['width'] = parts[1]
+                    dims['height'] = parts[2]
         
         # Handle "3275×1270×1440" format (with x or ×)
-        if ('габаритные размеры' in text or 'габариты' in text) and ('x' in text or '×' in text or 'х' in text):
+        if ('габаритные размеры' in text or 'габариты' in text) and has_dimension_separator(text):
              tds = tr.find_all('td')
              if len(tds) >= 2:
                 val_text = tds[1].get_text(strip=True)
-                parts = re.findall(r'\d+', val_text)
+                parts = integers(val_text)
                 if len(parts) >= 3:
-                    dims['length'] = int(parts[0])
-                    dims['width'] = int(parts[1])
-                    dims['height'] = int(parts[2])
+                    dims['length'] = parts[0]
+                    dims['width'] = parts[1]
+                    dims['height'] = parts[2]
         
         # Separate dimensions (fallback)
         # Length
         if 'длина' in text and 'без стекла' not in text and dims['length'] == 0: 
-             nums = re.findall(r'\d+', text)
+             nums = integers(text)
              if nums:
-                 dims['length'] = int(nums[-1])
+                 dims['length'] = nums[-1]
         
         # Width
         if 'ширина' in text and dims['width'] == 0:
-             nums = re.findall(r'\d+', text)
+             nums = integers(text)
              if nums:
-                 dims['width'] = int(nums[-1])
+                 dims['width'] = nums[-1]
 
         # Height
         if 'высота' in text and dims['height'] == 0:
-             nums = re.findall(r'\d+', text)
+             nums = integers(text)
              if nums:
-                 dims['height'] = int(nums[-1])
+                 dims['height'] = nums[-1]
                  
         # Weight (Dry weight usually)
         if ('сухая масса' in text or 'масса' in text) and 'кг' in text:
              # Avoid "mass of trailer" etc.
-             nums = re.findall(r'\d+', text)
+             nums = integers(text)
              if nums:
                  # Usually the last number is the value
-                 dims['weight'] = int(nums[-1])
+                 dims['weight'] = nums[-1]
 
     return dims
 
-def scrape_product(url, model_name):
-    print(f"Scraping {model_name} ({url})...")
-    soup = get_soup(url)
-    if not soup:
-        return None
-
-    # 1. Image
+def find_image(soup, model_name):
     # Look for side view image or main image
     image_url = ""
     # Try to find image in "ВНЕШНИЙ ВИД" or similar
@@ -126,44 +113,17 @@ def scrape_product(url, model_name):
                 # Actually, let's just take the first one that looks like a product image if we haven't found one with alt text
                 if not image_url: 
                     image_url = urljoin(BASE_URL, src)
-    
-    # 2. Dimensions
-    # Construct data URL
-    data_url = url.replace('.html', '_data.html')
-    data_soup = get_soup(data_url)
-    
-    dims = {'length': 0, 'width': 0, 'height': 0, 'weight': 0}
-    if data_soup:
-        dims = parse_dimensions(data_soup)
-    
-    # If dimensions are missing, try to parse from main page (sometimes they are there)
-    if dims['length'] == 0:
-        dims = parse_dimensions(soup)
-
-    return {
-        "brand": "Русская механика",
-        "model": model_name,
-        "length": dims['length'],
-        "width": dims['width'],
-        "height": dims['height'],
-        "weight": dims['weight'],
-        "image": image_url,
-        "url": url
-    }
-
-def main():
-    soup = get_soup(BASE_URL)
-    if not soup:
-        return
+    return image_url
 
-    products = []
+def find_vehicle_links(soup):
+    links = []
     seen_urls = set()
 
     for a in soup.find_all('a', href=True):
         href = a['href']
         text = a.get_text(strip=True)
         
-        if not href.endswith('.html'):
+        if not href.endswith('.html') or href.endswith('_data.html'):
             continue
             
         if any(ignore in href for ignore in IGNORE_PAGES):
@@ -174,10 +134,6 @@ def main():
         if full_url in seen_urls:
             continue
             
-        # Heuristic: Product links usually have a price or specific model name
-        # And they are at the root level (e.g. https://go-rm.ru/model.html)
-        # We filter out deep links if any, but here they seem to be root
-        
         # Clean up model name (remove price)
         # "Фронтьер 1000 / 20251 500 0001 149 000 ₽" -> "Фронтьер 1000 / 2025"
         # "РМ 800 Т1 200 000 ₽" -> "РМ 800 Т"
@@ -192,18 +148,49 @@ def main():
             continue
 
         seen_urls.add(full_url)
-        
-        product_data = scrape_product(full_url, clean_name)
-        if product_data and product_data['length'] > 0: # Only add if we found dimensions
-            products.append(product_data)
-        
-        time.sleep(0.5) # Be polite
+        links.append((full_url, clean_name))
+    return links
 
-    # Save to JSON
-    with open('scraper/vehicles_rm.json', 'w', encoding='utf-8') as f:
-        json.dump(products, f, ensure_ascii=False, indent=2)
-    
-    print(f"Scraped {len(products)} vehicles.")
+class RussianMechanicsAdapter(vehicle_harvest.SiteAdapter):
+    name = 'rm'
+    brand = 'Русская механика'
+    index_url = BASE_URL
+    legacy_output = os.path.join('scraper', 'vehicles_rm.json')
+
+    def vehicle_links(self, soup):
+        return find_vehicle_links(soup)
+
+    def data_url(self, url):
+        # Specs live on a sibling page: model.html -> model_data.html
+        return url.replace('.html', '_data.html')
+
+    def is_vehicle_url(self, url):
+        # Decided on the URL alone, as the old scraper did: models are
+        # root-level .html pages, service pages are listed in IGNORE_PAGES.
+        # The page markup is not a reliable signal (not every model page
+        # links to its _data.html), so every model still gets its data page.
+        path = urlsplit(url).path
+        return path.endswith('.html') and path.count('/') == 1 and not any(ignore in path for ignore in IGNORE_PAGES)
+
+    def parse_dimensions(self, soup):
+        return parse_dimensions(soup)
+
+    def image_url(self, soup, model):
+        return find_image(soup, model)
+
+    def vehicle_type(self, model):
+        # Same split as frontend/src/data/vehicles.ts
+        if any(key in model for key in ('Фронтьер', 'Тайга', 'ТАЙГА', 'Буран', 'БУРАН', 'Тикси')):
+            return 'snowmobile'
+        if any(key in model for key in ('РМ 800', 'РМ 650', 'РМ 500')):
+            return 'atv'
+        return None
+
+ADAPTER = RussianMechanicsAdapter()
+
+def main():
+    # Kept for `python -m mzsa rm-vehicles`: the harvester limited to this site
+    vehicle_harvest.main(['--adapter', 'rm'] + sys.argv[1:])
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,8 @@
+import os
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+# Scraper modules import each other by bare name, as when run from scraper/;
+# the catalog modules live in the repository root
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+sys.path.insert(0, os.path.dirname(os.path.dirname(TESTS_DIR)))
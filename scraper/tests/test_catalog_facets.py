@@ -0,0 +1,16 @@
+import argparse
+
+import pytest
+
+import catalog_facets
+
+
+def test_cli_fields_are_checked():
+    assert catalog_facets._parse_range("price=50000:") == ("price", (50000.0, None))
+    assert catalog_facets._parse_term("brakes=yes") == ("brakes", "yes")
+    with pytest.raises(argparse.ArgumentTypeError, match="expected one of price, capacity"):
+        catalog_facets._parse_range("weight=1:2")
+    with pytest.raises(argparse.ArgumentTypeError, match="must be numbers"):
+        catalog_facets._parse_range("price=cheap:")
+    with pytest.raises(argparse.ArgumentTypeError, match="expected one of category, brakes, suspension"):
+        catalog_facets._parse_term("color=red")
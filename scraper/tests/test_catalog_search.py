@@ -0,0 +1,40 @@
+import json
+import os
+
+import catalog_search
+
+FIXTURE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "frontend", "src", "services", "catalogSearch.fixture.json"
+)
+
+
+def load_fixture():
+    with open(FIXTURE, "r", encoding="utf-8") as handler:
+        return json.load(handler)
+
+
+def build(records):
+    builder = catalog_search.SearchIndexBuilder()
+    for trailer in records["trailers"]:
+        builder.add_trailer(trailer, trailer["options"])
+    for accessory in records["accessories"]:
+        builder.add_accessory(accessory)
+    return builder.build()
+
+
+def test_fixture_index_matches_builder():
+    # The frontend parity test reads this index; it must be what the builder emits today
+    fixture = load_fixture()
+    assert build(fixture["records"]) == fixture["index"]
+
+
+def test_fixture_queries_match_search():
+    fixture = load_fixture()
+    for query, expected in fixture["queries"].items():
+        assert catalog_search.query_terms(query) == expected["terms"], query
+        assert [doc["id"] for doc, _ in catalog_search.search(fixture["index"], query)] == expected["ids"], query
+
+
+def test_vowel_drop_forms_share_a_stem():
+    for word, stem in (("лодок", "лодк"), ("лодка", "лодк"), ("лодки", "лодк"), ("lodok", "lodk"), ("lodka", "lodk")):
+        assert catalog_search.normalize(word) == stem
@@ -0,0 +1,210 @@
+import hashlib
+import os
+import threading
+
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import http_client
+from blob_store import BlobStore
+from downloader import DownloadError, Downloader
+from throttle import HostThrottle
+
+URL = "https://www.mzsa.ru/netcat_files/multifile/817701.jpg"
+# Starts with the JPEG SOI marker and ends with EOI, so image_complete() accepts it
+IMAGE = b"\xff\xd8\xff\xe0" + bytes(range(256)) * 200 + b"\xff\xd9"
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=b"", headers=None, cut_after=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = CaseInsensitiveDict(headers or {})
+        # Drop the connection after this many bytes, like a reset mid-transfer
+        self.cut_after = cut_after
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def iter_content(self, chunk_size):
+        end = len(self.body) if self.cut_after is None else self.cut_after
+        for start in range(0, end, chunk_size):
+            yield self.body[start : min(start + chunk_size, end)]
+        if self.cut_after is not None:
+            raise requests.exceptions.ChunkedEncodingError("Connection broken")
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error")
+
+
+class FakeSession:
+    """Serves scripted responses in order and keeps the request headers."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, timeout=None, headers=None, stream=False):
+        self.requests.append(dict(headers or {}))
+        response = self.responses.pop(0)
+        return response(headers or {}) if callable(response) else response
+
+
+def full(body=IMAGE, etag='"v1"', content_type="image/jpeg", **kwargs):
+    headers = {"Content-Length": str(len(body)), "ETag": etag, "Content-Type": content_type}
+    return FakeResponse(200, body, headers, **kwargs)
+
+
+def partial(offset, body=IMAGE, etag='"v1"'):
+    headers = {
+        "Content-Range": f"bytes {offset}-{len(body) - 1}/{len(body)}",
+        "Content-Length": str(len(body) - offset),
+        "ETag": etag,
+        "Content-Type": "image/jpeg",
+    }
+    return FakeResponse(206, body[offset:], headers)
+
+
+@pytest.fixture
+def downloader(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_client, "throttle", HostThrottle(rate=1000.0, max_rate=1000.0))
+    store = BlobStore(str(tmp_path / "blobs"))
+    instance = Downloader(store, workers=1)
+    yield instance
+    instance.close()
+
+
+def use_session(monkeypatch, *responses):
+    session = FakeSession(*responses)
+    monkeypatch.setattr(http_client, "session", session)
+    return session
+
+
+def stored_bytes(downloader, entry):
+    with open(downloader.store.path(entry), "rb") as handler:
+        return handler.read()
+
+
+def test_complete_download_is_renamed_into_the_store(downloader, monkeypatch):
+    use_session(monkeypatch, full())
+    entry = downloader.fetch(URL)
+    assert entry.ext == ".jpg"
+    assert entry.sha256 == hashlib.sha256(IMAGE).hexdigest()
+    assert stored_bytes(downloader, entry) == IMAGE
+    assert downloader.store.lookup(URL) == entry
+    # Neither the part file nor its validators are left behind
+    assert os.listdir(downloader.partial_dir) == []
+
+
+def test_dropped_connection_resumes_with_range_and_if_range(downloader, monkeypatch):
+    cut = 20000
+    session = use_session(monkeypatch, full(cut_after=cut), partial(cut))
+    entry = downloader.fetch(URL)
+    assert stored_bytes(downloader, entry) == IMAGE
+    assert session.requests[0] == {}
+    assert session.requests[1] == {"Range": f"bytes={cut}-", "If-Range": '"v1"'}
+
+
+def test_resume_survives_a_restart(downloader, monkeypatch):
+    cut = 20000
+    use_session(monkeypatch, *[full(cut_after=cut)] * (http_client.MAX_RETRIES + 1))
+    # Every attempt of this run is cut short at the same place
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        downloader.fetch(URL)
+
+    # A later run picks up the part file kept on disk
+    session = use_session(monkeypatch, partial(cut))
+    entry = downloader.fetch(URL)
+    assert stored_bytes(downloader, entry) == IMAGE
+    assert session.requests[0]["Range"] == f"bytes={cut}-"
+
+
+def test_changed_image_is_downloaded_again_in_full(downloader, monkeypatch):
+    new_image = IMAGE[:-2] + b"\x00\x00\xff\xd9"
+    # If-Range no longer matches, so the server answers the range request with the whole new file
+    use_session(monkeypatch, full(cut_after=20000), full(new_image, etag='"v2"'))
+    entry = downloader.fetch(URL)
+    assert stored_bytes(downloader, entry) == new_image
+
+
+def test_short_body_without_an_error_is_retried(downloader, monkeypatch):
+    # Content-Length promises more than arrives and the stream just ends
+    short = full()
+    short.body = IMAGE[:1000]
+    session = use_session(monkeypatch, short, partial(1000))
+    entry = downloader.fetch(URL)
+    assert stored_bytes(downloader, entry) == IMAGE
+    assert session.requests[1]["Range"] == "bytes=1000-"
+
+
+def test_resume_at_the_wrong_offset_starts_over(downloader, monkeypatch):
+    wrong = partial(0)
+    wrong.status_code = 206
+    wrong.headers["Content-Range"] = f"bytes 0-{len(IMAGE) - 1}/{len(IMAGE)}"
+    session = use_session(monkeypatch, full(cut_after=20000), wrong, full())
+    entry = downloader.fetch(URL)
+    assert stored_bytes(downloader, entry) == IMAGE
+    # The third request carries no Range: the mismatched part file was dropped
+    assert "Range" not in session.requests[2]
+
+
+def test_html_error_page_is_rejected(downloader, monkeypatch):
+    page = b"<html><body>Not found</body></html>"
+    session = use_session(monkeypatch, full(page, content_type="text/html"))
+    with pytest.raises(DownloadError, match="expected an image"):
+        downloader.fetch(URL)
+    assert len(session.requests) == 1
+    assert downloader.store.lookup(URL) is None
+
+
+def test_truncated_image_data_is_rejected(downloader, monkeypatch):
+    # The length adds up but the JPEG has no end marker
+    body = IMAGE[:-2]
+    use_session(monkeypatch, full(body))
+    with pytest.raises(DownloadError, match="truncated"):
+        downloader.fetch(URL)
+    assert downloader.store.lookup(URL) is None
+    assert os.listdir(downloader.partial_dir) == []
+
+
+def test_octet_stream_gets_its_extension_from_the_bytes(downloader, monkeypatch):
+    png = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64 + b"IEND\xaeB`\x82"
+    use_session(monkeypatch, full(png, content_type="application/octet-stream"))
+    assert downloader.fetch(URL).ext == ".png"
+
+
+def test_slow_body_does_not_block_a_page_fetch(tmp_path, monkeypatch):
+    # One slot per host: a page fetch can only start once the image gives it up
+    monkeypatch.setattr(http_client, "throttle", HostThrottle(rate=1000.0, max_rate=1000.0, concurrency=1))
+    streaming = threading.Event()
+    page_fetched = threading.Event()
+
+    class SlowResponse(FakeResponse):
+        def iter_content(self, chunk_size):
+            yield self.body[:chunk_size]
+            streaming.set()
+            if not page_fetched.wait(5):
+                raise requests.exceptions.ChunkedEncodingError("page fetch never got the host slot")
+            yield self.body[chunk_size:]
+
+    page = requests.Response()
+    page.status_code = 200
+    page._content = b"<html></html>"
+    slow = SlowResponse(200, IMAGE, {"Content-Length": str(len(IMAGE)), "Content-Type": "image/jpeg"})
+    use_session(monkeypatch, slow, page)
+    downloader = Downloader(BlobStore(str(tmp_path / "blobs")), workers=1)
+    try:
+        future = downloader.submit(downloader.fetch, URL)
+        assert streaming.wait(5)
+        response = http_client.fetch("https://www.mzsa.ru/catalog/", use_cache=False)
+        page_fetched.set()
+        assert response.status_code == 200
+        assert stored_bytes(downloader, future.result(timeout=5)) == IMAGE
+    finally:
+        page_fetched.set()
+        downloader.close()
@@ -0,0 +1,33 @@
+from fit_index import FitIndex, VehicleFit, build_fit_index, trailer_fit
+
+TRAILERS = [
+    {"id": "flat_short", "category": "general", "maxVehicleLength": 2000, "maxVehicleWidth": 1200, "maxVehicleWeight": 500},
+    {"id": "flat_long", "category": "general", "maxVehicleLength": 3000, "maxVehicleWidth": 1300},
+    {"id": "boat", "category": "water", "bodyDimensions": "4500 мм судно"},
+    {"id": "van", "category": "commercial", "maxVehicleLength": 3000, "maxVehicleWidth": 1600},
+    {"id": "flat_unknown", "category": "general"},
+]
+VEHICLES = [
+    VehicleFit("atv", "CFMOTO", "CFORCE 600", False, 1900, 1150, 395),
+    VehicleFit("heavy_atv", "CFMOTO", "UFORCE 1000", False, 1950, 1150, 730),
+    VehicleFit("utv", "CFMOTO", "ZFORCE 950", False, 2980, 1570, 680),
+    VehicleFit("boat", "Yamaha", "Boat", True, 4200, 1600, 0),
+]
+
+
+def test_vans_stay_out_of_the_index():
+    payload = build_fit_index(TRAILERS, VEHICLES)
+    assert "van" not in payload["trailers"]
+    assert payload["unknownDimensions"] == ["flat_unknown"]
+    fits = {v["id"]: [payload["trailers"][pos] for pos in row] for v, row in zip(payload["vehicles"], payload["byVehicle"])}
+    assert fits == {"atv": ["flat_long", "flat_short"], "heavy_atv": ["flat_long"], "utv": [], "boat": ["boat"]}
+
+
+def test_lookups_match_an_all_pairs_scan():
+    fits = [trailer_fit(t) for t in TRAILERS if t["category"] != "commercial"]
+    fits = [fit for fit in fits if fit is not None]
+    index = FitIndex(fits, VEHICLES)
+    for vehicle in VEHICLES:
+        assert index.trailers_for(vehicle) == sorted(t.id for t in fits if FitIndex.fits(t, vehicle))
+    for fit in fits:
+        assert index.vehicles_for(fit) == sorted(v.id for v in VEHICLES if FitIndex.fits(fit, v))
@@ -0,0 +1,80 @@
+from frontier import LISTING, MAX_ATTEMPTS, PRODUCT, CrawlFrontier
+
+CATEGORY_URL = "https://www.mzsa.ru/goods/water/"
+
+
+def product_url(number):
+    return f"https://www.mzsa.ru/goods/water/water_{number}.html"
+
+
+def test_add_skips_seen_urls_and_orders_by_priority(tmp_path):
+    with CrawlFrontier(str(tmp_path / "frontier.sqlite")) as frontier:
+        frontier.begin()
+        assert frontier.add([product_url(1), product_url(2)], PRODUCT, "lodochniy", priority=1) == 2
+        assert frontier.add([product_url(2), product_url(3)], PRODUCT, "lodochniy", priority=0) == 1
+        assert [entry.url for entry in frontier.pending(PRODUCT)] == [product_url(3), product_url(1), product_url(2)]
+        assert [entry.url for entry in frontier.pending(PRODUCT, limit=1)] == [product_url(3)]
+
+
+def test_interrupted_crawl_resumes(tmp_path):
+    path = str(tmp_path / "frontier.sqlite")
+    with CrawlFrontier(path) as frontier:
+        assert frontier.begin() is False
+        frontier.add([product_url(1), product_url(2)], PRODUCT, "lodochniy")
+        frontier.complete(product_url(1))
+    # The process dies here: no finish()
+
+    with CrawlFrontier(path) as frontier:
+        assert frontier.begin() is True
+        assert [entry.url for entry in frontier.pending(PRODUCT)] == [product_url(2)]
+        assert frontier.counts()[PRODUCT] == {"done": 1, "pending": 1}
+        frontier.complete(product_url(2))
+        frontier.finish()
+
+    with CrawlFrontier(path) as frontier:
+        # A finished crawl is cleared, not resumed
+        assert frontier.begin() is False
+        assert frontier.counts() == {}
+
+
+def test_fresh_discards_an_interrupted_crawl(tmp_path):
+    path = str(tmp_path / "frontier.sqlite")
+    with CrawlFrontier(path) as frontier:
+        frontier.begin()
+        frontier.add([product_url(1)], PRODUCT, "lodochniy")
+    with CrawlFrontier(path) as frontier:
+        assert frontier.begin(fresh=True) is False
+        assert frontier.pending(PRODUCT) == []
+
+
+def test_failed_urls_are_retried_up_to_max_attempts(tmp_path):
+    path = str(tmp_path / "frontier.sqlite")
+    url = product_url(1)
+    with CrawlFrontier(path) as frontier:
+        frontier.begin()
+        frontier.add([url], PRODUCT, "lodochniy")
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        with CrawlFrontier(path) as frontier:
+            frontier.begin()
+            assert [entry.url for entry in frontier.pending(PRODUCT)] == [url]
+            frontier.complete(url, ok=False)
+            assert frontier.retryable() == (1 if attempt < MAX_ATTEMPTS else 0)
+    with CrawlFrontier(path) as frontier:
+        assert frontier.begin() is True
+        assert frontier.pending(PRODUCT) == []
+        assert frontier.counts()[PRODUCT] == {"failed": 1}
+
+
+def test_complete_categories_needs_every_listing_page(tmp_path):
+    with CrawlFrontier(str(tmp_path / "frontier.sqlite")) as frontier:
+        frontier.begin()
+        frontier.add([CATEGORY_URL, CATEGORY_URL + "?PAGEN_1=2"], LISTING, "lodochniy")
+        frontier.add(["https://www.mzsa.ru/goods/van/"], LISTING, "furgon")
+        frontier.complete(CATEGORY_URL)
+        frontier.complete("https://www.mzsa.ru/goods/van/")
+        assert frontier.complete_categories() == ["furgon"]
+
+        frontier.complete(CATEGORY_URL + "?PAGEN_1=2", ok=False)
+        assert frontier.complete_categories() == ["furgon"]
+        frontier.complete(CATEGORY_URL + "?PAGEN_1=2")
+        assert frontier.complete_categories() == ["furgon", "lodochniy"]
@@ -0,0 +1,29 @@
+import os
+
+import pytest
+
+import image_build
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def test_same_stem_different_extension_keeps_separate_variants(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_build, "VARIANTS_DIR", str(tmp_path / "variants"))
+    src_dir = tmp_path / "trailers" / "p1"
+    src_dir.mkdir(parents=True)
+    Image.new("RGB", (600, 400), (255, 0, 0)).save(src_dir / "a.jpg")
+    Image.new("RGB", (500, 500), (0, 0, 255)).save(src_dir / "a.png")
+
+    metas = [
+        image_build.build_variants((str(src_dir / name), f"/images/trailers/p1/{name}", "trailers/p1"), ["webp"])
+        for name in ("a.jpg", "a.png")
+    ]
+
+    paths = [set(image_build._variant_paths(meta)) for meta in metas]
+    assert not paths[0] & paths[1]
+    assert all(os.path.exists(path) for path in paths[0] | paths[1])
+    with Image.open(image_build._variant_paths(metas[0])[0]) as thumb_jpg, Image.open(
+        image_build._variant_paths(metas[1])[0]
+    ) as thumb_png:
+        assert thumb_jpg.size == (320, 213)
+        assert thumb_png.size == (320, 320)
@@ -0,0 +1,46 @@
+import os
+
+from image_sync import ImageSync
+
+
+def _write(path, data=b"jpeg"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as handler:
+        handler.write(data)
+
+
+def test_finish_removes_only_files_placed_by_an_earlier_run(tmp_path):
+    root = str(tmp_path / "images" / "trailers")
+    manifest = str(tmp_path / ".cache" / "image_sync.json")
+    src_a = str(tmp_path / "output" / "a.jpg")
+    src_b = str(tmp_path / "output" / "b.jpg")
+    _write(src_a, b"a")
+    _write(src_b, b"b")
+    # Written by scripts/transform_scraper_to_db.cjs, never by ImageSync
+    foreign = os.path.join(root, "mzsa_817700_002", "00-foreign.jpg")
+    _write(foreign)
+
+    first = ImageSync([root], manifest_path=manifest)
+    first.place(src_a, os.path.join(root, "p1", "a.jpg"))
+    first.place(src_b, os.path.join(root, "p2", "b.jpg"))
+    assert first.finish()["removed"] == 0
+    assert os.path.exists(foreign)
+
+    second = ImageSync([root], manifest_path=manifest)
+    second.place(src_a, os.path.join(root, "p1", "a.jpg"))
+    stats = second.finish()
+
+    assert stats["removed"] == 1
+    assert not os.path.exists(os.path.join(root, "p2"))
+    assert os.path.exists(os.path.join(root, "p1", "a.jpg"))
+    assert os.path.exists(foreign)
+
+
+def test_first_run_without_manifest_keeps_existing_files(tmp_path):
+    root = str(tmp_path / "images")
+    existing = os.path.join(root, "old.jpg")
+    _write(existing)
+
+    sync = ImageSync([root], manifest_path=str(tmp_path / "sync.json"))
+    assert sync.finish()["removed"] == 0
+    assert os.path.exists(existing)
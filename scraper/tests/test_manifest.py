@@ -0,0 +1,33 @@
+import json
+import os
+
+from manifest import LOG_NAME, MANIFEST_NAME, CrawlManifest
+
+
+def test_recorded_entries_survive_a_kill_before_save(tmp_path):
+    output_dir = str(tmp_path)
+    manifest = CrawlManifest(output_dir)
+    manifest.record("https://www.mzsa.ru/goods/a.html", "fp-a", "bortovoy", "a")
+    manifest.record("https://www.mzsa.ru/goods/b.html", "fp-b", "bortovoy", "b")
+    # No save(): the entries only exist in the append log
+    assert not os.path.exists(os.path.join(output_dir, MANIFEST_NAME))
+    with open(os.path.join(output_dir, LOG_NAME), "a", encoding="utf-8") as handler:
+        handler.write('{"url": "https://www.mzsa.ru/goods/c.html", "ent')
+
+    reloaded = CrawlManifest(output_dir)
+    assert sorted(reloaded.entries) == ["https://www.mzsa.ru/goods/a.html", "https://www.mzsa.ru/goods/b.html"]
+    assert reloaded.entries["https://www.mzsa.ru/goods/b.html"]["fingerprint"] == "fp-b"
+
+
+def test_save_folds_the_log_into_the_manifest(tmp_path):
+    output_dir = str(tmp_path)
+    manifest = CrawlManifest(output_dir)
+    manifest.record("https://www.mzsa.ru/goods/a.html", "fp-a", "bortovoy", "a")
+    manifest.save()
+    assert not os.path.exists(os.path.join(output_dir, LOG_NAME))
+    with open(os.path.join(output_dir, MANIFEST_NAME), "r", encoding="utf-8") as handler:
+        assert json.load(handler)["products"]["https://www.mzsa.ru/goods/a.html"]["slug"] == "a"
+
+    # A later record wins over the saved entry after a reload
+    manifest.record("https://www.mzsa.ru/goods/a.html", "fp-a2", "bortovoy", "a")
+    assert CrawlManifest(output_dir).entries["https://www.mzsa.ru/goods/a.html"]["fingerprint"] == "fp-a2"
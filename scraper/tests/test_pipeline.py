@@ -0,0 +1,50 @@
+import json
+import os
+import shutil
+
+from mzsa import pipeline
+
+REPO_ROOT = pipeline.REPO_ROOT
+TRAILER = "mzsa_817700_002"
+
+
+def _copy(rel_path, dst_root):
+    dst = os.path.join(dst_root, rel_path)
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    src = os.path.join(REPO_ROOT, rel_path)
+    if os.path.isdir(src):
+        shutil.copytree(src, dst)
+    else:
+        shutil.copy2(src, dst)
+
+
+def test_stage_outputs_are_disjoint():
+    owners = {}
+    for stage in pipeline.STAGES.values():
+        for path in stage.outputs:
+            assert path not in owners, f"{path} is an output of both {owners[path]} and {stage.name}"
+            owners[path] = stage.name
+
+
+def test_catalog_keeps_transform_images_for_validate(tmp_path, monkeypatch):
+    with open(os.path.join(REPO_ROOT, "backend", "db.json"), "r", encoding="utf-8") as handler:
+        record = next(trailer for trailer in json.load(handler)["trailers"] if trailer["id"] == TRAILER)
+    _copy(os.path.join("output", "bortovoy", TRAILER), str(tmp_path))
+    for rel_path in ("frontend/src/data/vehiclesDatabase.json", "scraper/vehicles_harvest.json", "scraper/vehicles_rm.json"):
+        _copy(rel_path, str(tmp_path))
+    # What the transform stage left behind: db.json and its NN-<name> copies of the images
+    for src in record["images"]:
+        _copy("frontend/public" + src, str(tmp_path))
+    os.makedirs(tmp_path / "backend")
+    with open(tmp_path / "backend" / "db.json", "w", encoding="utf-8") as handler:
+        json.dump({"trailers": [record], "accessories": []}, handler, ensure_ascii=False)
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("PYTHONPATH", REPO_ROOT)
+    assert pipeline.Pipeline(["catalog", "validate"], jobs=1).run() == 0
+
+    with open(os.path.join("output", ".validation_report.json"), "r", encoding="utf-8") as handler:
+        report = json.load(handler)
+    assert not [issue for issue in report["issues"] if issue["severity"] == "error"]
+    assert all(os.path.exists("frontend/public" + src) for src in record["images"])
+    assert os.path.exists(os.path.join("frontend", "src", "data", "trailers.ts"))
@@ -0,0 +1,37 @@
+from product_store import ProductStore
+
+
+def product(url, slug="mzsa-817701-022", price=74700, **fields):
+    record = {"url": url, "slug": slug, "category": "bortovoy", "title": "МЗСА 817701.022", "price": price}
+    record.update(fields)
+    return record
+
+
+def test_save_reports_added_changed_unchanged(tmp_path):
+    with ProductStore(str(tmp_path / "products.sqlite")) as store:
+        assert store.save(product("https://www.mzsa.ru/goods/a.html")) == "added"
+        assert store.save(product("https://www.mzsa.ru/goods/a.html")) == "unchanged"
+        assert store.save(product("https://www.mzsa.ru/goods/a.html", price=75900)) == "changed"
+        assert [entry["status"] for entry in store.history("https://www.mzsa.ru/goods/a.html")] == [
+            "added",
+            "unchanged",
+            "changed",
+        ]
+
+
+def test_slug_collision_last_writer_wins(tmp_path):
+    # Two product URLs with the same model+version share a slug, as in output/<category>/<slug>/
+    first = product("https://www.mzsa.ru/goods/a.html", options=[{"name": "Тент", "sku": "T-1"}])
+    second = product("https://www.mzsa.ru/goods/b.html", price=79900, options=[{"name": "Опорное колесо", "sku": "K-2"}])
+    with ProductStore(str(tmp_path / "products.sqlite")) as store:
+        store.save(first)
+        assert store.save(second) == "added"
+
+        assert [item["url"] for item in store.products("bortovoy")] == [second["url"]]
+        assert store.by_sku("T-1") == []
+        assert [item["url"] for item in store.by_sku("K-2")] == [second["url"]]
+        assert store.history(first["url"])[-1]["status"] == "removed"
+
+        # The displaced URL can come back and take the slug again
+        assert store.save(first) == "added"
+        assert [item["url"] for item in store.products("bortovoy")] == [first["url"]]
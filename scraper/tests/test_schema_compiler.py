@@ -0,0 +1,49 @@
+import pytest
+
+from schema_compiler import compile_schema
+
+SCHEMA = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "title": "Product",
+    "type": "object",
+    "required": ["title"],
+    "properties": {
+        "title": {"type": "string", "minLength": 1},
+        "price": {"type": "integer", "minimum": 0},
+        "images": {"type": "array", "items": {"type": "string"}, "minItems": 1},
+    },
+}
+
+
+def test_supported_keywords_are_enforced():
+    validate = compile_schema(SCHEMA)
+    assert list(validate({"title": "Прицеп", "price": 100, "images": ["a.jpg"]})) == []
+    assert list(validate({"price": -1, "images": []})) == [
+        "$: missing required field 'title'",
+        "$.price: -1 is less than 0",
+        "$.images: fewer than 1 items",
+    ]
+
+
+@pytest.mark.parametrize(
+    "sub, message",
+    [
+        ({"type": "integer", "maximum": 10}, "Unsupported schema keyword(s) at #/properties/price: maximum"),
+        ({"oneOf": [{"type": "integer"}, {"type": "null"}]}, "Unsupported schema keyword(s) at #/properties/price: oneOf"),
+        ({"type": "array", "uniqueItems": True}, "Unsupported schema keyword(s) at #/properties/price: uniqueItems"),
+        ({"type": "string", "format": "email"}, "Unsupported format 'email' at #/properties/price"),
+        ({"type": "decimal"}, "Unsupported type 'decimal' at #/properties/price"),
+        ({"$ref": "#/definitions/price", "minimum": 0}, "Keywords next to $ref are not applied at #/properties/price"),
+    ],
+)
+def test_unsupported_keywords_fail_at_compile_time(sub, message):
+    schema = {"type": "object", "properties": {"price": sub}, "definitions": {"price": {"type": "integer"}}}
+    with pytest.raises(ValueError) as excinfo:
+        compile_schema(schema)
+    assert str(excinfo.value) == message
+
+
+def test_unsupported_keyword_in_a_referenced_definition_fails_at_compile_time():
+    catalog = {"definitions": {"trailer": {"type": "object", "properties": {"id": {"const": "x"}}}}}
+    with pytest.raises(ValueError, match=r"#/definitions/trailer/properties/id: const"):
+        compile_schema({"$ref": "#/definitions/trailer"}, catalog)
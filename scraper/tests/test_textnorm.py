@@ -0,0 +1,17 @@
+from textnorm import normalize_specs, parse_dimensions
+
+
+def test_spec_dimensions_split_on_latin_x_and_times_sign_only():
+    assert normalize_specs({"Размеры кузова": "2050x1100x300"})["razmery_kuzova_height"] == 300
+    assert normalize_specs({"Размеры кузова": "2050×1100×300"})["razmery_kuzova_length"] == 2050
+    # As before the shared module: a Cyrillic х value is stored as text, with no split fields
+    assert normalize_specs({"Размеры кузова": "3177х1712х1028"}) == {"razmery_kuzova": "3177х1712х1028"}
+
+
+def test_catalog_dimensions_accept_cyrillic_and_times_sign():
+    expected = {"length": 2050, "width": 1100, "height": 300}
+    assert parse_dimensions("2050х1100х300 мм") == expected
+    assert parse_dimensions("2050x1100x300") == expected
+    # The original generate_catalog regex dropped × and returned None here
+    assert parse_dimensions("2050×1100×300") == expected
+    assert parse_dimensions("2050") is None
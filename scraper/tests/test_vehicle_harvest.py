@@ -0,0 +1,122 @@
+from bs4 import BeautifulSoup
+
+import scraper_cfmoto
+import scraper_rm
+import vehicle_harvest
+from vehicle_harvest import Harvester, SiteAdapter, VehicleCache
+
+INDEX = "https://example.test/"
+PAGES = {
+    INDEX: '<a href="/a.html">Model A</a><a href="/news.html">News</a><a href="/skip.html">Skip</a>',
+    "https://example.test/a.html": '<a href="a_data.html">specs</a>',
+    "https://example.test/a_data.html": "<p>length 2400</p>",
+    "https://example.test/news.html": "<p>no specs link</p>",
+}
+
+
+class FakeAdapter(SiteAdapter):
+    name = "fake"
+    brand = "Fake"
+    index_url = INDEX
+
+    def vehicle_links(self, soup):
+        return [(INDEX + a["href"].lstrip("/"), a.get_text()) for a in soup.find_all("a")]
+
+    def is_vehicle_url(self, url):
+        return not url.endswith("skip.html")
+
+    def data_url(self, url):
+        return url.replace(".html", "_data.html")
+
+    def is_vehicle_page(self, url, soup):
+        return soup.find("a") is not None
+
+    def parse_dimensions(self, soup):
+        text = soup.get_text()
+        return {"length": int(text.split()[-1])} if "length" in text else {}
+
+
+def test_data_page_fetched_only_for_vehicle_pages(tmp_path, monkeypatch):
+    fetched = []
+
+    def fake_fetch_soup(url, encoding="utf-8"):
+        fetched.append(url)
+        return BeautifulSoup(PAGES[url], "html.parser")
+
+    monkeypatch.setattr(vehicle_harvest, "fetch_soup", fake_fetch_soup)
+    cache = VehicleCache(str(tmp_path), "fake")
+    vehicles = Harvester(FakeAdapter(), cache, workers=2).harvest()
+
+    assert [vehicle["model"] for vehicle in vehicles] == ["Model A"]
+    assert vehicles[0]["length"] == 2400
+    # news.html is rejected on its own page, skip.html by URL before any request
+    assert sorted(fetched) == sorted(
+        [INDEX, "https://example.test/a.html", "https://example.test/a_data.html", "https://example.test/news.html"]
+    )
+    assert cache.get("https://example.test/news.html")["vehicle"] is None
+
+
+RM_PAGES = {
+    "https://go-rm.ru/": (
+        '<a href="/buran_ae.html">Буран АЕ 450 000 ₽</a>'
+        '<a href="/contacts.html">Контакты</a>'
+        '<a href="/news/aktsiya.html">Акция на снегоходы</a>'
+    ),
+    # No link to buran_ae_data.html on the model page itself
+    "https://go-rm.ru/buran_ae.html": '<h1>Буран АЕ</h1><a href="#specs">Характеристики</a>',
+    "https://go-rm.ru/buran_ae_data.html": (
+        "<table><tr><td>Габаритные размеры, мм</td><td>2760×910×1385</td></tr>"
+        "<tr><td>Сухая масса, кг</td><td>420</td></tr></table>"
+    ),
+}
+
+
+def test_rm_models_are_chosen_by_url(tmp_path, monkeypatch):
+    fetched = []
+
+    def fake_fetch_soup(url, encoding="utf-8"):
+        fetched.append(url)
+        return BeautifulSoup(RM_PAGES[url], "html.parser")
+
+    monkeypatch.setattr(vehicle_harvest, "fetch_soup", fake_fetch_soup)
+    vehicles = Harvester(scraper_rm.ADAPTER, VehicleCache(str(tmp_path), "rm"), workers=1).harvest()
+
+    assert [(vehicle["model"], vehicle["length"], vehicle["weight"]) for vehicle in vehicles] == [("Буран АЕ", 2760, 420)]
+    # The news page is dropped by URL; the model's data page is fetched without a link to it
+    assert fetched == ["https://go-rm.ru/", "https://go-rm.ru/buran_ae.html", "https://go-rm.ru/buran_ae_data.html"]
+
+
+CFMOTO_INDEX = """
+<a href="/catalog/kvadrotsikly/">Квадроциклы</a>
+<a href="/catalog/kvadrotsikly/cforce-600-eps/">CFORCE 600 EPS</a>
+<a href="/catalog/kvadrotsikly/cforce-600-eps/#specs">CFORCE 600 EPS</a>
+<a href="/catalog/motovezdekhody/uforce-1000/"><img alt="UFORCE 1000" src="/u.jpg"></a>
+<a href="/catalog/kvadrotsikly/?filter=eps">EPS</a>
+<a href="https://dealer.example/catalog/x/y/">Dealer</a>
+"""
+
+CFMOTO_MODEL = """
+<meta property="og:image" content="/upload/cforce600.jpg">
+<table>
+<tr><td>Габаритные размеры (Д×Ш×В), мм</td><td>2 260 × 1 180 × 1 350</td></tr>
+<tr><td>Высота по сиденью, мм</td><td>880</td></tr>
+<tr><td>Максимальная масса груза, кг</td><td>90</td></tr>
+<tr><td>Сухая масса, кг</td><td>395</td></tr>
+</table>
+"""
+
+
+def test_cfmoto_links_and_dimensions():
+    links = scraper_cfmoto.find_vehicle_links(BeautifulSoup(CFMOTO_INDEX, "html.parser"))
+    assert links == [
+        ("https://cfmoto.ru/catalog/kvadrotsikly/cforce-600-eps/", "CFORCE 600 EPS"),
+        ("https://cfmoto.ru/catalog/motovezdekhody/uforce-1000/", "UFORCE 1000"),
+    ]
+
+    soup = BeautifulSoup(CFMOTO_MODEL, "html.parser")
+    adapter = scraper_cfmoto.ADAPTER
+    assert adapter.is_vehicle_page(links[0][0], soup)
+    assert not adapter.is_vehicle_page(links[0][0], BeautifulSoup("<p>Акция</p>", "html.parser"))
+    assert adapter.parse_dimensions(soup) == {"length": 2260, "width": 1180, "height": 1350, "weight": 395}
+    assert adapter.image_url(soup, "CFORCE 600 EPS") == "https://cfmoto.ru/upload/cforce600.jpg"
+    assert [adapter.vehicle_type(name) for _, name in links] == ["atv", "utv"]
@@ -0,0 +1,183 @@
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Union
+
+# Text and unit normalization shared by scraper.py, scraper_rm.py and
+# generate_catalog.py. Tables and patterns are built once at import time and
+# per-string results are memoized: a catalog repeats the same few dozen spec
+# labels and values hundreds of times.
+
+TRANSLIT_TABLE = str.maketrans(
+    {
+        "а": "a",
+        "б": "b",
+        "в": "v",
+        "г": "g",
+        "д": "d",
+        "е": "e",
+        "ё": "yo",
+        "ж": "zh",
+        "з": "z",
+        "и": "i",
+        "й": "y",
+        "к": "k",
+        "л": "l",
+        "м": "m",
+        "н": "n",
+        "о": "o",
+        "п": "p",
+        "р": "r",
+        "с": "s",
+        "т": "t",
+        "у": "u",
+        "ф": "f",
+        "х": "kh",
+        "ц": "ts",
+        "ч": "ch",
+        "ш": "sh",
+        "щ": "shch",
+        "ъ": "",
+        "ы": "y",
+        "ь": "",
+        "э": "e",
+        "ю": "yu",
+        "я": "ya",
+        " ": "_",
+        "-": "_",
+    }
+)
+# Every remaining char that is not alphanumeric becomes "_", runs collapse.
+NON_SLUG_RE = re.compile(r"[\W_]+")
+
+# Latin x, multiplication sign and Cyrillic х all separate dimensions in
+# parse_dimensions and scraper_rm. normalize_specs keeps its narrower original
+# set (Latin x and ×) so stored spec fields do not change.
+DIMENSION_SEPARATORS = str.maketrans({"×": "x", "х": "x", "Х": "x", "X": "x"})
+NON_DIMENSION_RE = re.compile(r"[^0-9x]")
+NUMBER_RE = re.compile(r"[\d.,]+")
+INT_RE = re.compile(r"\d+")
+QUANTITY_RE = re.compile(r"^(\d+([.,]\d+)?)\s*([а-яА-Яa-zA-Z]+)?$")
+
+MASS_TOKENS = ("масса", "груз", "нагруз")
+DIMENSION_TOKENS = ("размер", "габарит")
+
+Number = Union[int, float]
+
+
+@lru_cache(maxsize=8192)
+def transliterate(text: str) -> str:
+    return NON_SLUG_RE.sub("_", text.lower().translate(TRANSLIT_TABLE)).strip("_")
+
+
+def has_dimension_separator(text: str) -> bool:
+    return "x" in text.translate(DIMENSION_SEPARATORS)
+
+
+def split_dimensions(text: str) -> List[int]:
+    """``"2050х1100х300 мм"`` -> ``[2050, 1100, 300]`` (any of x, ×, Cyrillic х)."""
+    digits = NON_DIMENSION_RE.sub("", text.translate(DIMENSION_SEPARATORS).lower())
+    return [int(part) for part in digits.split("x") if part]
+
+
+def parse_dimensions(text: Optional[str]) -> Optional[Dict[str, int]]:
+    if not text:
+        return None
+    parts = split_dimensions(text)
+    if len(parts) < 2:
+        return None
+    return {
+        "length": parts[0],
+        "width": parts[1],
+        "height": parts[2] if len(parts) > 2 else 0,
+    }
+
+
+def integers(text: str) -> List[int]:
+    return [int(part) for part in INT_RE.findall(text)]
+
+
+@lru_cache(maxsize=8192)
+def _length_text_to_mm(text: str) -> Optional[int]:
+    match = NUMBER_RE.search(text)
+    if not match:
+        return None
+
+    number_str = match.group(0).replace(",", ".")
+    try:
+        value = float(number_str)
+    except ValueError:
+        return None
+
+    if "мм" in text or "mill" in text or value > 100:
+        return int(round(value))
+    if "см" in text:
+        return int(round(value * 10))
+    if "м" in text:
+        return int(round(value * 1000))
+    return int(round(value))
+
+
+def parse_length_to_mm(raw_value: Optional[object]) -> Optional[int]:
+    if raw_value is None:
+        return None
+    if isinstance(raw_value, (int, float)):
+        value = float(raw_value)
+        if value <= 0:
+            return None
+        if value < 100:  # assume meters
+            return int(round(value * 1000))
+        return int(round(value))
+
+    text = str(raw_value).strip().lower()
+    if not text:
+        return None
+    return _length_text_to_mm(text)
+
+
+@lru_cache(maxsize=4096)
+def _spec_key(key: str) -> Tuple[str, bool, bool]:
+    clean_key = key.strip().rstrip(":")
+    lowered = clean_key.lower()
+    return (
+        transliterate(clean_key),
+        any(token in lowered for token in MASS_TOKENS),
+        any(token in lowered for token in DIMENSION_TOKENS),
+    )
+
+
+@lru_cache(maxsize=8192)
+def _spec_value(value: str) -> Tuple[str, Optional[Number], Optional[str], Tuple[int, ...]]:
+    clean_value = value.strip().replace("×", "x")
+    number: Optional[Number] = None
+    unit: Optional[str] = None
+    match = QUANTITY_RE.match(clean_value)
+    if match:
+        num = match.group(1).replace(",", ".")
+        number = float(num) if "." in num else int(num)
+        unit = match.group(3)
+    dims: Tuple[int, ...] = ()
+    if "x" in clean_value:
+        dims = tuple(int(part) for part in NON_DIMENSION_RE.sub("", clean_value).split("x") if part)
+    return clean_value, number, unit, dims
+
+
+def normalize_specs(specs: Dict[str, str]) -> Dict[str, object]:
+    normalized: Dict[str, object] = {}
+    for key, value in specs.items():
+        transliterated_key, is_mass, is_dimension = _spec_key(key)
+        clean_value, number, unit, dims = _spec_value(value)
+
+        if number is not None and is_mass:
+            normalized[transliterated_key] = number
+            normalized[f"{transliterated_key}_unit"] = unit or "kg"
+        else:
+            normalized[transliterated_key] = clean_value
+
+        if is_dimension:
+            if len(dims) >= 2:
+                normalized[f"{transliterated_key}_length"] = dims[0]
+                normalized[f"{transliterated_key}_width"] = dims[1]
+            if len(dims) >= 3:
+                normalized[f"{transliterated_key}_height"] = dims[2]
+    return normalized
+
@@ -0,0 +1,143 @@
+import email.utils
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+from urllib.parse import urlsplit
+
+# Statuses that mean "slow down" rather than "this page is broken".
+BACKOFF_STATUSES = {429, 503}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class HostBudget:
+    """Token bucket plus concurrency cap for a single host.
+
+    The refill rate adapts to the server: it halves on 429/503 (and stops
+    issuing tokens until ``Retry-After`` has passed), shrinks when responses
+    get slower than ``target_latency`` and creeps back up otherwise.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        concurrency: int,
+        min_rate: float,
+        max_rate: float,
+        target_latency: float,
+    ) -> None:
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.target_latency = target_latency
+        self.burst = max(1.0, float(concurrency))
+        self.tokens = 1.0
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.lock = threading.Lock()
+
+    def _take_token(self) -> float:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self) -> None:
+        self.slots.acquire()
+        while True:
+            wait = self._take_token()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    def release(self) -> None:
+        self.slots.release()
+
+    def record(self, status: int, latency: float, retry_after: Optional[float] = None) -> None:
+        with self.lock:
+            if status in BACKOFF_STATUSES:
+                self.rate = max(self.min_rate, self.rate / 2)
+                self.tokens = 0.0
+                if retry_after:
+                    self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+            elif latency > self.target_latency:
+                self.rate = max(self.min_rate, self.rate * 0.8)
+            else:
+                self.rate = min(self.max_rate, self.rate + 0.25)
+
+
+class HostThrottle:
+    """Registry of per-host budgets shared by all crawler threads."""
+
+    def __init__(
+        self,
+        rate: float = 2.0,
+        concurrency: int = 4,
+        min_rate: float = 0.2,
+        max_rate: float = 8.0,
+        target_latency: float = 2.0,
+    ) -> None:
+        self._budgets: Dict[str, HostBudget] = {}
+        self._lock = threading.Lock()
+        self.configure(rate, concurrency, min_rate, max_rate, target_latency)
+
+    def configure(
+        self,
+        rate: float = 2.0,
+        concurrency: int = 4,
+        min_rate: float = 0.2,
+        max_rate: float = 8.0,
+        target_latency: float = 2.0,
+    ) -> None:
+        with self._lock:
+            self.rate = rate
+            self.concurrency = max(1, concurrency)
+            self.min_rate = min(min_rate, rate)
+            self.max_rate = max(max_rate, rate)
+            self.target_latency = target_latency
+            self._budgets.clear()
+
+    def budget(self, url: str) -> HostBudget:
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            budget = self._budgets.get(host)
+            if budget is None:
+                budget = HostBudget(
+                    self.rate,
+                    self.concurrency,
+                    self.min_rate,
+                    self.max_rate,
+                    self.target_latency,
+                )
+                self._budgets[host] = budget
+            return budget
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[HostBudget]:
+        budget = self.budget(url)
+        budget.acquire()
+        try:
+            yield budget
+        finally:
+            budget.release()
@@ -0,0 +1,285 @@
+import argparse
+import importlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from bs4 import BeautifulSoup
+
+from http_client import fetch
+from metrics import metrics, timed
+from textnorm import transliterate
+
+DEFAULT_OUTPUT = os.path.join("scraper", "vehicles_harvest.json")
+DEFAULT_CACHE_DIR = os.path.join(".cache", "vehicles")
+DEFAULT_TTL_DAYS = 7.0
+DEFAULT_WORKERS = 4
+# Adapter name -> module exposing ADAPTER (a SiteAdapter); imported on demand
+ADAPTERS = {
+    "cfmoto": "scraper_cfmoto",
+    "rm": "scraper_rm",
+}
+# Harvested without --adapter; cfmoto has not been run against the live site yet
+DEFAULT_ADAPTERS = ("rm",)
+DIMENSIONS = ("length", "width", "height", "weight")
+
+
+class SiteAdapter:
+    """Everything site-specific about harvesting one manufacturer's vehicles.
+
+    The engine fetches ``index_url`` and asks for the vehicle links on it.
+    Links failing ``is_vehicle_url`` are dropped without a request; each
+    remaining page is fetched and, only if ``is_vehicle_page`` accepts it,
+    its ``data_url`` sibling after it. ``parse_dimensions`` runs on the data
+    page first and on the main page only if that found no length.
+    """
+
+    name = ""
+    brand = ""
+    index_url = ""
+    encoding: Optional[str] = "utf-8"
+    # Per-site file kept in its original shape for existing consumers
+    legacy_output: Optional[str] = None
+
+    def vehicle_links(self, soup: BeautifulSoup) -> List[Tuple[str, str]]:
+        """(url, model name) pairs found on the index page."""
+        raise NotImplementedError
+
+    def is_vehicle_url(self, url: str) -> bool:
+        return True
+
+    def data_url(self, url: str) -> Optional[str]:
+        return None
+
+    def is_vehicle_page(self, url: str, soup: BeautifulSoup) -> bool:
+        return True
+
+    def parse_dimensions(self, soup: BeautifulSoup) -> Dict[str, int]:
+        raise NotImplementedError
+
+    def image_url(self, soup: BeautifulSoup, model: str) -> str:
+        return ""
+
+    def vehicle_type(self, model: str) -> Optional[str]:
+        return None
+
+
+def load_adapter(name: str) -> SiteAdapter:
+    return importlib.import_module(ADAPTERS[name]).ADAPTER
+
+
+@timed("get_soup")
+def fetch_soup(url: str, encoding: Optional[str] = "utf-8") -> Optional[BeautifulSoup]:
+    try:
+        response = fetch(url)
+        response.raise_for_status()
+    except Exception as exc:
+        print(f"Error fetching {url}: {exc}")
+        return None
+    if encoding:
+        response.encoding = encoding
+    with metrics.span("parse_html"):
+        return BeautifulSoup(response.text, "html.parser")
+
+
+class VehicleCache:
+    """Per-adapter results by page URL, including pages found not to be vehicles.
+
+    Entries younger than the TTL are reused without touching the network;
+    fetch failures are never cached.
+    """
+
+    def __init__(self, cache_dir: str, adapter: str, ttl_days: float = DEFAULT_TTL_DAYS) -> None:
+        self.path = os.path.join(cache_dir, f"{adapter}.json")
+        self.ttl = ttl_days * 86400
+        self.entries: Dict[str, Dict[str, object]] = {}
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, "r", encoding="utf-8") as handler:
+                self.entries = json.load(handler)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def get(self, url: str) -> Optional[Dict[str, object]]:
+        """The cached entry (``{"vehicle": ... or None}``) if still fresh."""
+        with self._lock:
+            entry = self.entries.get(url)
+        if entry and time.time() - float(entry.get("fetched_at", 0)) < self.ttl:
+            return entry
+        return None
+
+    def put(self, url: str, vehicle: Optional[Dict[str, object]]) -> None:
+        with self._lock:
+            self.entries[url] = {"fetched_at": time.time(), "vehicle": vehicle}
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with self._lock, open(tmp_path, "w", encoding="utf-8") as handler:
+            json.dump(self.entries, handler, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+class Harvester:
+    def __init__(
+        self,
+        adapter: SiteAdapter,
+        cache: VehicleCache,
+        workers: int = DEFAULT_WORKERS,
+        refresh: bool = False,
+    ) -> None:
+        self.adapter = adapter
+        self.cache = cache
+        self.workers = max(1, workers)
+        self.refresh = refresh
+
+    def harvest(self) -> List[Dict[str, object]]:
+        index = fetch_soup(self.adapter.index_url, self.adapter.encoding)
+        if index is None:
+            return []
+        links = [(url, model) for url, model in self.adapter.vehicle_links(index) if self.adapter.is_vehicle_url(url)]
+        print(f"{self.adapter.name}: {len(links)} candidate pages on {self.adapter.index_url}")
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = list(executor.map(lambda link: self.vehicle(*link), links))
+        self.cache.save()
+        return [vehicle for vehicle in results if vehicle]
+
+    def vehicle(self, url: str, model: str) -> Optional[Dict[str, object]]:
+        cached = None if self.refresh else self.cache.get(url)
+        if cached is not None:
+            metrics.count("scraper_vehicles_total", site=self.adapter.name, result="cached")
+            return cached["vehicle"]
+
+        with metrics.span("vehicle", url=url):
+            print(f"Scraping {model} ({url})...")
+            soup = fetch_soup(url, self.adapter.encoding)
+            if soup is None:
+                return None
+            if not self.adapter.is_vehicle_page(url, soup):
+                # Checked before the data page is requested: non-vehicle pages cost one fetch
+                self.cache.put(url, None)
+                metrics.count("scraper_vehicles_total", site=self.adapter.name, result="skipped")
+                return None
+
+            data_url = self.adapter.data_url(url)
+            data_soup = fetch_soup(data_url, self.adapter.encoding) if data_url else None
+            dims = self.adapter.parse_dimensions(data_soup) if data_soup is not None else {}
+            if not dims.get("length"):
+                # Some models publish the table on the main page instead
+                dims = self.adapter.parse_dimensions(soup)
+            if not dims.get("length"):
+                self.cache.put(url, None)
+                metrics.count("scraper_vehicles_total", site=self.adapter.name, result="no_dimensions")
+                return None
+
+            vehicle: Dict[str, object] = {"brand": self.adapter.brand, "model": model}
+            vehicle.update({name: int(dims.get(name) or 0) for name in DIMENSIONS})
+            vehicle["image"] = self.adapter.image_url(soup, model)
+            vehicle["url"] = url
+            self.cache.put(url, vehicle)
+            metrics.count("scraper_vehicles_total", site=self.adapter.name, result="harvested")
+            return vehicle
+
+
+def dataset_record(adapter: SiteAdapter, vehicle: Dict[str, object]) -> Dict[str, object]:
+    record = dict(vehicle)
+    # Same id fit_index derives for records without one
+    record["id"] = transliterate(f"{vehicle['brand']} {str(vehicle['model']).strip(' /')}")
+    record["type"] = adapter.vehicle_type(str(vehicle["model"]))
+    record["source"] = adapter.name
+    return record
+
+
+def _write_json(path: str, data: object) -> None:
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handler:
+        json.dump(data, handler, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def merge_dataset(path: str, harvested: Dict[str, List[Dict[str, object]]]) -> Dict[str, object]:
+    """Replace the vehicles of the harvested sources in the merged file; other sources stay."""
+    try:
+        with open(path, "r", encoding="utf-8") as handler:
+            previous = json.load(handler)
+    except (OSError, ValueError):
+        previous = {}
+    now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    sources = dict(previous.get("sources", {}))
+    vehicles = {
+        str(record["id"]): record
+        for record in previous.get("vehicles", [])
+        if record.get("source") not in harvested
+    }
+    for name, records in harvested.items():
+        sources[name] = {"count": len(records), "harvestedAt": now}
+        for record in records:
+            vehicles.setdefault(str(record["id"]), record)
+
+    ordered = [vehicles[vehicle_id] for vehicle_id in sorted(vehicles)]
+    by_brand: Dict[str, List[int]] = {}
+    by_type: Dict[str, List[int]] = {}
+    for pos, record in enumerate(ordered):
+        by_brand.setdefault(str(record.get("brand", "")), []).append(pos)
+        by_type.setdefault(str(record.get("type") or "other"), []).append(pos)
+    dataset = {
+        "version": int(previous.get("version", 0)) + 1,
+        "updatedAt": now,
+        "sources": sources,
+        "vehicles": ordered,
+        # Positions into "vehicles"
+        "index": {"byBrand": by_brand, "byType": by_type},
+    }
+    _write_json(path, dataset)
+    return dataset
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Harvest vehicle dimensions from manufacturer sites into one dataset")
+    parser.add_argument(
+        "--adapter",
+        action="append",
+        choices=sorted(ADAPTERS),
+        help=f"site to harvest (repeatable; default: {', '.join(DEFAULT_ADAPTERS)})",
+    )
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="merged, indexed vehicle dataset")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="vehicles in flight per site")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--ttl-days", type=float, default=DEFAULT_TTL_DAYS, help="reuse per-vehicle results this long")
+    parser.add_argument("--refresh", action="store_true", help="ignore cached per-vehicle results")
+    parser.add_argument("--metrics", metavar="PATH", help="write Prometheus textfile metrics")
+    parser.add_argument("--trace", metavar="PATH", help="write per-vehicle spans as Chrome trace JSON")
+    args = parser.parse_args(argv)
+    if args.metrics or args.trace:
+        metrics.configure(tracing=bool(args.trace))
+
+    started = time.monotonic()
+    harvested: Dict[str, List[Dict[str, object]]] = {}
+    for name in args.adapter or DEFAULT_ADAPTERS:
+        adapter = load_adapter(name)
+        cache = VehicleCache(args.cache_dir, name, args.ttl_days)
+        vehicles = Harvester(adapter, cache, args.workers, args.refresh).harvest()
+        if not vehicles:
+            # An unreachable site keeps its vehicles from the last harvest
+            print(f"{name}: no vehicles harvested, keeping the previous data")
+            continue
+        if adapter.legacy_output:
+            _write_json(adapter.legacy_output, vehicles)
+        harvested[name] = [dataset_record(adapter, vehicle) for vehicle in vehicles]
+        print(f"{name}: {len(vehicles)} vehicles")
+
+    if harvested:
+        dataset = merge_dataset(args.output, harvested)
+        print(f"Vehicle dataset: {len(dataset['vehicles'])} vehicles -> {args.output}")
+    print(f"Done in {time.monotonic() - started:.1f}s.")
+    metrics.export(args.metrics, args.trace)
+
+
+if __name__ == "__main__":
+    main()
@@ -31,7 +31,7 @@ async function main() {
   const existingSet = new Set(existingLinks.map(l => `${l.trailer_id}|${l.option_id}`));
 
   // Структура: output/{category}/{slug}/{slug}.json
-  const outputDirs = ['output/lodochniy', 'output/bortovoy', 'output/furgon'];
+  const outputDirs = ['output/lodochniy', 'output/bortovoy', 'output/furgon', 'output/kommercheskiy'];
   const newLinks = [];
   const notFoundOptions = new Set();
 
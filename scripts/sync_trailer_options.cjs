@@ -40,7 +40,7 @@ async function main() {
   console.log(`📋 Существующих связей: ${existingLinks?.length}\n`);
 
   // Сканируем output директорию
-  const categories = ['bortovoy', 'lodochniy', 'furgon'];
+  const categories = ['bortovoy', 'lodochniy', 'furgon', 'kommercheskiy'];
   const linksToAdd = [];
   let skipped = 0;
   let notFoundTrailer = 0;
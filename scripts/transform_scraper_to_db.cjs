@@ -14,6 +14,7 @@ const SEGMENT_CATEGORY_MAP = {
   bortovoy: 'general',
   lodochniy: 'water',
   furgon: 'commercial',
+  kommercheskiy: 'commercial',
   moto: 'moto',
   evakuator: 'wrecker'
 };
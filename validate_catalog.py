@@ -0,0 +1,293 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+SCRAPER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scraper")
+sys.path.insert(0, SCRAPER_DIR)
+
+from schema_compiler import compile_schema  # noqa: E402
+
+OUTPUT_DIR = "output"
+DB_FILE = "backend/db.json"
+PUBLIC_DIR = "frontend/public"
+REPORT_FILE = os.path.join(OUTPUT_DIR, ".validation_report.json")
+STATE_FILE = os.path.join(".cache", "validation_state.json")
+SCHEMA_FILES = {
+    "product": os.path.join(SCRAPER_DIR, "product_schema.json"),
+    "options": os.path.join(SCRAPER_DIR, "options_schema.json"),
+    "catalog": os.path.join(SCRAPER_DIR, "catalog_schema.json"),
+}
+DB_BATCH_SIZE = 32
+# Bump when the checks below change so incremental runs do not reuse stale results
+CHECKS_VERSION = 1
+
+Issue = Dict[str, str]
+
+_validators = {}
+
+
+def _load_validators() -> Dict[str, object]:
+    # Compiled once per process (the pool initializer runs this in every worker)
+    if not _validators:
+        schemas = {}
+        for name, path in SCHEMA_FILES.items():
+            with open(path, "r", encoding="utf-8") as f:
+                schemas[name] = json.load(f)
+        catalog = schemas["catalog"]
+        sections = {
+            "product": ("product", schemas["product"], None),
+            "options": ("options", schemas["options"], None),
+            "trailers": ("catalog", {"$ref": "#/definitions/trailer"}, catalog),
+            "accessories": ("catalog", {"$ref": "#/definitions/accessory"}, catalog),
+        }
+        for section, (name, schema, root) in sections.items():
+            try:
+                _validators[section] = compile_schema(schema, root)
+            except ValueError as exc:
+                _validators.clear()
+                raise ValueError(f"{SCHEMA_FILES[name]}: {exc}") from exc
+    return _validators
+
+
+def _issue(severity: str, source: str, message: str, record: str = "") -> Issue:
+    return {"severity": severity, "source": source, "record": record, "message": message}
+
+
+def check_product_file(path: str) -> Dict[str, object]:
+    """Schema-check one scraped product and collect the facts cross-record checks need."""
+    validators = _load_validators()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            product = json.load(f)
+    except (OSError, ValueError) as exc:
+        return {"issues": [_issue("error", path, f"unreadable: {exc}")], "facts": []}
+
+    issues = [_issue("error", path, message) for message in validators["product"](product, "$")]
+    options = product.get("options", [])
+    issues += [_issue("error", path, message) for message in validators["options"](options, "$.options")]
+
+    prod_dir = os.path.dirname(path)
+    images = [os.path.join(prod_dir, rel) for rel in product.get("images", []) if isinstance(rel, str)]
+    images += [
+        os.path.join(prod_dir, option["image"])
+        for option in options
+        if isinstance(option, dict) and isinstance(option.get("image"), str)
+    ]
+    prices = [("$.price", product.get("price"))]
+    prices += [(f"$.options[{pos}].price", option.get("price")) for pos, option in enumerate(options) if isinstance(option, dict)]
+    fact = {
+        "kind": "product",
+        "id": product.get("slug"),
+        "url": product.get("url"),
+        "prices": [(where, value) for where, value in prices if isinstance(value, str)],
+        "images": images,
+    }
+    return {"issues": issues, "facts": [fact]}
+
+
+def check_db_records(batch: Tuple[str, int, List[Dict[str, object]]]) -> Dict[str, object]:
+    section, offset, records = batch
+    validator = _load_validators()[section]
+    issues: List[Issue] = []
+    facts = []
+    for pos, record in enumerate(records, start=offset):
+        record_id = str(record.get("id", f"#{pos}")) if isinstance(record, dict) else f"#{pos}"
+        source = f"{DB_FILE}:{section}"
+        issues += [_issue("error", source, message, record_id) for message in validator(record, "$")]
+        if not isinstance(record, dict):
+            continue
+        if section == "trailers":
+            missing = [field for field in ("maxVehicleLength", "maxVehicleWidth", "maxVehicleWeight") if not record.get(field)]
+            if missing:
+                issues.append(_issue("warning", source, f"no {', '.join(missing)}; fit checks will skip it", record_id))
+        images = [record.get("image")] + list(record.get("images") or [])
+        facts.append(
+            {
+                "kind": section,
+                "id": record.get("id"),
+                "prices": [("$.price", record["price"])] if isinstance(record.get("price"), str) else [],
+                "images": [PUBLIC_DIR + src for src in images if isinstance(src, str) and src.startswith("/")],
+            }
+        )
+    return {"issues": issues, "facts": facts}
+
+
+def cross_record_checks(facts_by_source: Dict[str, List[Dict[str, object]]]) -> List[Issue]:
+    """Duplicate ids and URLs, prices stored as strings and images missing on disk, in one pass."""
+    issues: List[Issue] = []
+    seen: Dict[Tuple[str, str, object], str] = {}
+    for source in sorted(facts_by_source):
+        for fact in facts_by_source[source]:
+            record_id = str(fact.get("id") or "")
+            for field in ("id", "url"):
+                value = fact.get(field)
+                if not value:
+                    continue
+                key = (fact["kind"], field, value)
+                if key in seen:
+                    label = "slug" if fact["kind"] == "product" and field == "id" else field
+                    issues.append(_issue("error", source, f"duplicate {label} {value!r} (also in {seen[key]})", record_id))
+                else:
+                    seen[key] = source
+            for where, value in fact["prices"]:
+                issues.append(_issue("error", source, f"{where}: price stored as string {value!r}", record_id))
+            for image in fact["images"]:
+                if not os.path.exists(image):
+                    issues.append(_issue("error", source, f"image missing on disk: {image}", record_id))
+    return issues
+
+
+def product_files(output_dir: str = OUTPUT_DIR) -> List[str]:
+    files = []
+    for category in sorted(os.listdir(output_dir)):
+        cat_path = os.path.join(output_dir, category)
+        if category.startswith(".") or not os.path.isdir(cat_path):
+            continue
+        for slug in sorted(os.listdir(cat_path)):
+            json_file = os.path.join(cat_path, slug, f"{slug}.json")
+            if os.path.exists(json_file):
+                files.append(json_file)
+    return files
+
+
+def _stamp(path: str) -> List[int]:
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _checks_fingerprint() -> str:
+    digest = hashlib.sha256(str(CHECKS_VERSION).encode("ascii"))
+    for path in SCHEMA_FILES.values():
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _load_state(fingerprint: str) -> Dict[str, Dict[str, object]]:
+    try:
+        with open(STATE_FILE, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return state.get("files", {}) if state.get("fingerprint") == fingerprint else {}
+
+
+def _save_state(fingerprint: str, files: Dict[str, Dict[str, object]]) -> None:
+    os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+    tmp_path = f"{STATE_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"fingerprint": fingerprint, "files": files}, f, ensure_ascii=False)
+    os.replace(tmp_path, STATE_FILE)
+
+
+def validate(
+    jobs: Optional[int] = None,
+    incremental: bool = False,
+    db_file: Optional[str] = DB_FILE,
+    report_path: str = REPORT_FILE,
+) -> Dict[str, object]:
+    fingerprint = _checks_fingerprint()
+    previous = _load_state(fingerprint) if incremental else {}
+    results: Dict[str, Dict[str, object]] = {}
+
+    files = product_files()
+    stale = []
+    for path in files:
+        cached = previous.get(path)
+        if cached and cached["stamp"] == _stamp(path):
+            results[path] = cached
+        else:
+            stale.append(path)
+
+    db_batches = []
+    if db_file and os.path.exists(db_file):
+        cached = previous.get(db_file)
+        if cached and cached["stamp"] == _stamp(db_file):
+            results[db_file] = cached
+        else:
+            with open(db_file, "r", encoding="utf-8") as f:
+                db = json.load(f)
+            for section in ("trailers", "accessories"):
+                records = db.get(section, [])
+                for offset in range(0, len(records), DB_BATCH_SIZE):
+                    db_batches.append((section, offset, records[offset:offset + DB_BATCH_SIZE]))
+
+    workers = jobs or os.cpu_count() or 1
+    if workers == 1:
+        product_results = [check_product_file(path) for path in stale]
+        db_results = [check_db_records(batch) for batch in db_batches]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_load_validators) as executor:
+            product_results = list(executor.map(check_product_file, stale, chunksize=16))
+            db_results = list(executor.map(check_db_records, db_batches))
+
+    for path, result in zip(stale, product_results):
+        results[path] = {"stamp": _stamp(path), **result}
+    if db_batches:
+        results[db_file] = {
+            "stamp": _stamp(db_file),
+            "issues": [issue for result in db_results for issue in result["issues"]],
+            "facts": [fact for result in db_results for fact in result["facts"]],
+        }
+
+    issues = [issue for path in sorted(results) for issue in results[path]["issues"]]
+    issues += cross_record_checks({path: result["facts"] for path, result in results.items()})
+    issues.sort(key=lambda issue: (issue["severity"] != "error", issue["source"], issue["record"], issue["message"]))
+
+    counts = defaultdict(int)
+    for issue in issues:
+        counts[issue["severity"]] += 1
+    report = {
+        "summary": {
+            "product_files": len(files),
+            "revalidated": len(stale) + (1 if db_batches else 0),
+            "cached": len(results) - len(stale) - (1 if db_batches else 0),
+            "db_records": len(results[db_file]["facts"]) if db_file in results else 0,
+            "errors": counts["error"],
+            "warnings": counts["warning"],
+        },
+        "issues": issues,
+    }
+    os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    _save_state(fingerprint, results)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Validate scraped products and backend/db.json against the schemas")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--incremental", action="store_true", help="only revalidate files changed since the last run")
+    parser.add_argument("--db", default=DB_FILE, help="db.json to validate ('' to skip)")
+    parser.add_argument("--report", default=REPORT_FILE, help="where to write the JSON report")
+    parser.add_argument("--show", type=int, default=20, help="how many issues to print")
+    args = parser.parse_args()
+
+    try:
+        # Fail on a schema this validator cannot fully enforce before any worker starts
+        _load_validators()
+    except ValueError as exc:
+        sys.exit(f"Schema error: {exc}")
+    report = validate(args.jobs, args.incremental, args.db or None, args.report)
+    summary = report["summary"]
+    print(
+        f"Validated {summary['product_files']} product files and {summary['db_records']} db records "
+        f"({summary['revalidated']} files checked, {summary['cached']} unchanged): "
+        f"{summary['errors']} errors, {summary['warnings']} warnings -> {args.report}"
+    )
+    for issue in report["issues"][: args.show]:
+        record = f" [{issue['record']}]" if issue["record"] else ""
+        print(f"  {issue['severity']}: {issue['source']}{record}: {issue['message']}")
+    if len(report["issues"]) > args.show:
+        print(f"  ... {len(report['issues']) - args.show} more in the report")
+    sys.exit(1 if summary["errors"] else 0)
+
+
+if __name__ == "__main__":
+    main()